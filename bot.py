@@ -4,6 +4,7 @@ Système de gacha avec coffres, inventaire et monnaie.
 """
 import os
 import asyncio
+import logging
 
 from dotenv import load_dotenv
 import discord
@@ -29,6 +30,18 @@ load_dotenv()
 
 TUTORIAL_CHANNEL_ID = 1448261036858806403  # Salon pour le tutoriel
 VIP_USER_ID = 238326044988276738  # Utilisateur VIP à accueillir
+PLAYER_STORAGE = os.getenv("PLAYER_STORAGE", "json")  # Backend joueurs: json, journal, sqlite, sharded
+PLAYER_SHARDS = int(os.getenv("PLAYER_SHARDS", "16"))  # Nombre de partitions (backend sharded)
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "0") == "1"  # Sauvegardes groupées
+FLUSH_INTERVAL = float(os.getenv("FLUSH_INTERVAL", "5"))  # Secondes entre deux écritures groupées
+FLUSH_THRESHOLD = int(os.getenv("FLUSH_THRESHOLD", "100"))  # Joueurs modifiés avant écriture forcée
+LAZY_PLAYERS = os.getenv("LAZY_PLAYERS", "0") == "1"  # Chargement des joueurs à la demande
+PLAYER_CACHE_SIZE = int(os.getenv("PLAYER_CACHE_SIZE", "10000"))  # Joueurs gardés en mémoire
+ARRAY_INVENTORIES = os.getenv("ARRAY_INVENTORIES", "0") == "1"  # Inventaires en tableaux de compteurs
+CATALOG_WATCH_INTERVAL = float(os.getenv("CATALOG_WATCH_INTERVAL", "0"))  # Secondes (0 = pas de surveillance)
+RNG_SEED = int(os.environ["RNG_SEED"]) if os.getenv("RNG_SEED") else None  # Graine des tirages (rejeu)
+RNG_NONCE = int(os.environ["RNG_NONCE"]) if os.getenv("RNG_NONCE") else None  # Nonce de la session à rejouer
+RNG_LOG = os.getenv("RNG_LOG", "0") == "1"  # Journal de chaque tirage aléatoire (rejeu)
 
 
 class EconomyBot(commands.Bot):
@@ -46,11 +59,28 @@ class EconomyBot(commands.Bot):
         )
 
         # Initialiser le gestionnaire de données
-        self.data_manager = DataManager(data_folder="data")
+        self.data_manager = DataManager(
+            data_folder="data",
+            storage=PLAYER_STORAGE,
+            shard_count=PLAYER_SHARDS,
+            write_behind=WRITE_BEHIND,
+            flush_interval=FLUSH_INTERVAL,
+            flush_threshold=FLUSH_THRESHOLD,
+            lazy_loading=LAZY_PLAYERS,
+            cache_size=PLAYER_CACHE_SIZE,
+            array_inventories=ARRAY_INVENTORIES,
+            rng_seed=RNG_SEED,
+            rng_nonce=RNG_NONCE
+        )
         self.tutorial_sent = False  # Pour éviter de renvoyer le tutoriel
 
     async def setup_hook(self):
         """Configuration initiale du bot."""
+        # Démarrer les sauvegardes groupées si activées
+        self.data_manager.start_write_behind()
+        # Recharger le catalogue quand les fichiers JSON changent
+        self.data_manager.start_catalog_watch(CATALOG_WATCH_INTERVAL)
+
         # Charger tous les cogs
         await self.add_cog(Admin(self, self.data_manager))
         await self.add_cog(Chests(self, self.data_manager))
@@ -65,12 +95,18 @@ class EconomyBot(commands.Bot):
         await self.tree.sync()
         print("✅ Commandes synchronisées")
 
+    async def close(self):
+        """Ferme proprement la persistance avant de déconnecter le bot."""
+        self.data_manager.close()
+        await super().close()
+
     async def on_ready(self):
         """Événement déclenché quand le bot est prêt."""
         print(f"{'='*50}")
         print(f"🤖 Bot connecté : {self.user.name}")
         print(f"📊 Serveurs : {len(self.guilds)}")
         print(f"📦 Objets chargés : {len(self.data_manager.get_all_items())}")
+        print(f"🎲 Graine aléatoire : {self.data_manager.rng.seed} (nonce {self.data_manager.rng.nonce})")
         print(f"{'='*50}")
 
         # Définir le statut du bot
@@ -557,6 +593,13 @@ def main():
         print("Créez un fichier .env avec: DISCORD_TOKEN=votre_token")
         return
 
+    if RNG_LOG:
+        # Handler propre au journal des tirages : le reste du journal garde son niveau
+        rng_logger = logging.getLogger("services.rng")
+        rng_logger.setLevel(logging.DEBUG)
+        rng_logger.addHandler(logging.StreamHandler())
+        rng_logger.propagate = False
+
     bot = EconomyBot()
     bot.run(token)
 
@@ -7,7 +7,7 @@ from discord import app_commands
 from discord.ext import commands
 from typing import Optional
 
-from services import DataManager
+from services import DataManager, cached_autocomplete
 
 
 class Admin(commands.Cog):
@@ -47,11 +47,7 @@ class Admin(commands.Cog):
     ):
         """Donne un objet à un joueur."""
         # Chercher l'objet par nom ou ID
-        item = None
-        for i in self.data.get_all_items():
-            if i.name.lower() == objet.lower() or i.item_id == objet:
-                item = i
-                break
+        item = self.data.get_item(objet) or self.data.find_item_by_name(objet)
 
         if not item:
             embed = discord.Embed(
@@ -90,18 +86,20 @@ class Admin(commands.Cog):
         await interaction.response.send_message(embed=embed)
 
     @admin_give.autocomplete('objet')
+    @cached_autocomplete(per_player=False)
     async def give_autocomplete(self, interaction: discord.Interaction, current: str):
         """Autocomplétion pour les objets."""
+        catalog = self.data.catalog
         choices = []
-        for item in self.data.get_all_items():
-            if not current or current.lower() in item.name.lower():
-                choices.append(
-                    app_commands.Choice(
-                        name=f"{item.rarity.emoji} {item.name} ({item.rarity.display_name})",
-                        value=item.item_id
-                    )
+        for item_id in catalog.item_names.complete(current):
+            item = catalog.items[item_id]
+            choices.append(
+                app_commands.Choice(
+                    name=f"{item.rarity.emoji} {item.name} ({item.rarity.display_name})",
+                    value=item.item_id
                 )
-        return choices[:25]
+            )
+        return choices
 
     # ══════════════════════════════════════════════════════════════
     # 🗑️ RETIRER UN OBJET
@@ -125,11 +123,7 @@ class Admin(commands.Cog):
         player = self.data.get_player(joueur.id)
 
         # Chercher l'objet
-        item = None
-        for i in self.data.get_all_items():
-            if i.name.lower() == objet.lower() or i.item_id == objet:
-                item = i
-                break
+        item = self.data.get_item(objet) or self.data.find_item_by_name(objet)
 
         if not item:
             embed = discord.Embed(
@@ -194,7 +188,7 @@ class Admin(commands.Cog):
         page: Optional[int] = 1
     ):
         """Affiche l'inventaire détaillé d'un joueur."""
-        player = self.data.get_player(joueur.id)
+        player = self.data.peek_player(joueur.id)
 
         if not player.inventory:
             embed = discord.Embed(
@@ -208,14 +202,8 @@ class Admin(commands.Cog):
             return
 
         # Préparer les données
-        items_list = []
-        total_value = 0
-
-        for item_id, qty in player.inventory.items():
-            item = self.data.get_item(item_id)
-            if item:
-                items_list.append((item, qty))
-                total_value += item.value * qty
+        items_list = self.data.catalog.inventory_entries(player.inventory)
+        total_value, _ = self.data.catalog.inventory_summary(player.inventory)
 
         # Trier par rareté (mythic en premier)
         from models import Rarity
@@ -358,11 +346,12 @@ class Admin(commands.Cog):
 
         # Reset
         player.coins = 0
-        player.inventory = {}
+        player.inventory.clear()
         player.daily_chests_opened = 0
         player.total_chests_opened = 0
         player.total_items_sold = 0
         player.last_chest_date = ""
+        player.touch()
 
         self.data.save_player(player)
 
@@ -395,7 +384,7 @@ class Admin(commands.Cog):
     async def admin_stats(self, interaction: discord.Interaction):
         """Affiche les statistiques globales."""
         all_items = self.data.get_all_items()
-        all_players = self.data.get_leaderboard(1000)
+        all_players = await self.data.get_leaderboard(1000)
 
         total_coins = sum(p.coins for p in all_players)
         total_items = sum(sum(p.inventory.values()) for p in all_players)
@@ -450,6 +439,65 @@ class Admin(commands.Cog):
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    # ══════════════════════════════════════════════════════════════
+    # 💾 SAUVEGARDE FORCÉE
+    # ══════════════════════════════════════════════════════════════
+
+    @app_commands.command(name="admin-save", description="💾 [ADMIN] Écrire immédiatement les sauvegardes en attente")
+    @is_admin()
+    async def admin_save(self, interaction: discord.Interaction):
+        """Force l'écriture des joueurs modifiés (mode write-behind)."""
+        written = self.data.flush()
+        await self.data.wait_for_writes()
+
+        embed = discord.Embed(
+            title="💾 Sauvegarde Effectuée",
+            description=f"```yml\nJoueurs écrits: {written}\n```",
+            color=0x2ecc71
+        )
+        embed.set_footer(text=f"Par {interaction.user.display_name}")
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ══════════════════════════════════════════════════════════════
+    # 📦 RECHARGEMENT DU CATALOGUE
+    # ══════════════════════════════════════════════════════════════
+
+    @app_commands.command(name="admin-reload", description="📦 [ADMIN] Recharger objets, pets, sets, boss et skills")
+    @is_admin()
+    async def admin_reload(self, interaction: discord.Interaction):
+        """Recharge le catalogue depuis les fichiers JSON sans redémarrer le bot."""
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            reloaded = await self.data.reload_catalog()
+        except Exception as e:
+            embed = discord.Embed(
+                title="❌ Rechargement Impossible",
+                description=f"```\n{e}\n```",
+                color=0xe74c3c
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+
+        catalog = self.data.catalog
+        embed = discord.Embed(
+            title="📦 Catalogue Rechargé" if reloaded else "📦 Catalogue Inchangé",
+            description=(
+                f"```yml\n"
+                f"Version: {catalog.version}\n"
+                f"Objets: {len(catalog.items)}\n"
+                f"Pets: {len(catalog.pets)}\n"
+                f"Boss: {len(catalog.bosses)}\n"
+                f"Skills: {len(catalog.skills)}\n"
+                f"```"
+            ),
+            color=0x2ecc71
+        )
+        embed.set_footer(text=f"Par {interaction.user.display_name}")
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
     # ══════════════════════════════════════════════════════════════
     # 🔒 RESTREINDRE L'ACCÈS D'UN UTILISATEUR
     # ══════════════════════════════════════════════════════════════
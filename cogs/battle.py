@@ -5,13 +5,19 @@ Style tour par tour comme Pokémon avec design moderne.
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Set
 import asyncio
-import random
+import time
 from datetime import datetime, date
 
-from models import Boss, Skill, SkillType, CombatState
-from services import DataManager
+from models import BossInstance, Skill, SkillType, CombatState
+from services import DataManager, Catalog, cached_autocomplete
+from services.combat_engine import (
+    AUTO_HEAL_BELOW, MAX_TURNS, CombatOutcome,
+    combat_skills, new_combat, play_turn, priority_policy, run_combat, turn_stream
+)
+from services.combat_store import COMBAT_SWEEP_INTERVAL, CombatCheckpoint
+from services.economy import apply_victory_rewards
 from utils import COLORS, EMOJIS
 from utils.styles import (
     Colors, Emojis, EmbedTheme,
@@ -27,48 +33,78 @@ from utils.styles import (
 # 🎮 VIEWS MODERNES POUR L'INTERFACE DE COMBAT
 # ═══════════════════════════════════════════════════════════════════════════════
 
+class CombatButton(discord.ui.DynamicItem[discord.ui.Button], template=r"combat:(?P<user_id>[0-9]+):(?P<action>skill:\w+|flee)"):
+    """
+    Bouton d'action d'un combat, persistant : le custom_id porte le joueur
+    et l'action, ce qui suffit à retrouver le combat après un redémarrage.
+    """
+    
+    def __init__(self, user_id: int, action: str, button: Optional[discord.ui.Button] = None):
+        super().__init__(button or discord.ui.Button(custom_id=f"combat:{user_id}:{action}"))
+        self.user_id = user_id
+        self.action = action
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match["user_id"]), match["action"], item)
+    
+    async def callback(self, interaction: discord.Interaction):
+        battle = interaction.client.get_cog("Battle")
+        await battle.handle_combat_action(interaction, self.user_id, self.action)
+
+
 class ModernBattleView(discord.ui.View):
-    """Interface de combat interactive ultra-moderne avec boutons stylisés."""
+    """
+    Interface de combat interactive ultra-moderne avec boutons stylisés.
+    Une seule vue par combat : refresh() met à jour les boutons sur place.
+    """
     
-    def __init__(self, cog, combat: CombatState, player, skills: List[Skill]):
-        super().__init__(timeout=120)
-        self.cog = cog
+    def __init__(self, combat: CombatState, skills: List[Skill]):
+        # Sans expiration : les clics sont traités par CombatButton, même après un redémarrage
+        super().__init__(timeout=None)
         self.combat = combat
-        self.player = player
-        self.skills = skills
-        self.waiting_for_action = True
-        self.selected_skill = None
+        self.skills = skills[:4]
+        self._skill_buttons: List[discord.ui.Button] = []
         
         self._create_modern_buttons()
     
     def _create_modern_buttons(self):
         """Crée des boutons modernes pour chaque action."""
-        for i, skill in enumerate(self.skills[:4]):
-            on_cooldown = self.combat.skill_cooldowns.get(skill.skill_id, 0) > 0
-            cooldown_text = f" ⏱{self.combat.skill_cooldowns.get(skill.skill_id, 0)}" if on_cooldown else ""
-            
-            style = self._get_modern_style(skill.skill_type, on_cooldown)
-            
+        user_id = self.combat.player_id
+        for i, skill in enumerate(self.skills):
             button = discord.ui.Button(
-                label=f"{skill.name}{cooldown_text}",
                 emoji=skill.emoji,
-                style=style,
-                disabled=on_cooldown,
                 row=0 if i < 2 else 1,
-                custom_id=f"skill_{i}"
+                custom_id=f"combat:{user_id}:skill:{skill.skill_id}"
             )
-            button.callback = self._make_skill_callback(skill)
-            self.add_item(button)
+            self._skill_buttons.append(button)
+            self.add_item(CombatButton(user_id, f"skill:{skill.skill_id}", button))
+        self.refresh()
         
         # Bouton de fuite stylisé
         flee_button = discord.ui.Button(
             label="Fuir",
             emoji="💨",
             style=discord.ButtonStyle.secondary,
-            row=2
+            row=2,
+            custom_id=f"combat:{user_id}:flee"
         )
-        flee_button.callback = self._flee_callback
-        self.add_item(flee_button)
+        self.add_item(CombatButton(user_id, "flee", flee_button))
+    
+    def refresh(self) -> bool:
+        """Met les boutons à jour selon les recharges. Retourne True si un bouton a changé."""
+        changed = False
+        for skill, button in zip(self.skills, self._skill_buttons):
+            cooldown = self.combat.skill_cooldowns.get(skill.skill_id, 0)
+            on_cooldown = cooldown > 0
+            label = f"{skill.name} ⏱{cooldown}" if on_cooldown else skill.name
+            style = self._get_modern_style(skill.skill_type, on_cooldown)
+            if button.label != label or button.style != style or button.disabled != on_cooldown:
+                button.label = label
+                button.style = style
+                button.disabled = on_cooldown
+                changed = True
+        return changed
     
     def _get_modern_style(self, skill_type: SkillType, on_cooldown: bool) -> discord.ButtonStyle:
         """Style moderne selon le type de skill."""
@@ -84,39 +120,101 @@ class ModernBattleView(discord.ui.View):
             SkillType.DEBUFF: discord.ButtonStyle.secondary
         }
         return styles.get(skill_type, discord.ButtonStyle.secondary)
+
+
+class CombatDisplay:
+    """
+    Embed et vue d'un combat, gardés pendant tout le combat.
+    À chaque tour, seuls les champs dont l'état a changé sont recalculés,
+    et la vue n'est renvoyée que si un bouton a changé.
+    """
     
-    def _make_skill_callback(self, skill: Skill):
-        """Callback moderne pour un skill."""
-        async def callback(interaction: discord.Interaction):
-            if interaction.user.id != self.combat.player_id:
-                embed = discord.Embed(
-                    description=f"{Emojis.ERROR} **Ce n'est pas ton combat !**",
-                    color=Colors.ERROR
-                )
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-                return
-            
-            self.selected_skill = skill
-            self.waiting_for_action = False
-            self.stop()
-            await interaction.response.defer()
+    def __init__(self, combat: CombatState, skills: List[Skill], user: discord.abc.User):
+        self.combat = combat
+        self.player_name = user.display_name
+        self.embed = discord.Embed(color=Colors.DANGER)
+        self.embed.set_footer(text="⚔️ Choisis ton action ci-dessous !")
+        self.view = ModernBattleView(combat, skills)
+        # Champ -> (état affiché, (nom, valeur, inline))
+        self._fields: Dict[str, tuple] = {}
+        self._layout: List[str] = []
+        self.update()
+    
+    def update(self) -> bool:
+        """Met l'embed et les boutons à jour. Retourne True si la vue doit être renvoyée."""
+        combat = self.combat
+        boss = combat.boss
+        self.embed.title = f"⚔️ Tour {combat.turn}"
+        
+        buffs = tuple(combat.player_buffs.items())
+        stunned = combat.boss_debuffs.get("stun", 0) > 0
+        log = tuple(combat.combat_log[-3:])
+        states = {
+            "boss": boss.current_hp,
+            "versus": None,
+            "player": combat.player_hp,
+            "effects": (buffs, bool(combat.player_dots), stunned),
+            "log": log,
+        }
+        
+        for key, state in states.items():
+            cached = self._fields.get(key)
+            if cached is None or cached[0] != state:
+                self._fields[key] = (state, self._render_field(key))
+        
+        # Champs affichés (les effets et le log seulement s'ils ne sont pas vides)
+        layout = [key for key in states if self._fields[key][1] is not None]
+        if layout != self._layout:
+            self.embed.clear_fields()
+            for key in layout:
+                name, value, inline = self._fields[key][1]
+                self.embed.add_field(name=name, value=value, inline=inline)
+            self._layout = layout
+        else:
+            for index, key in enumerate(layout):
+                name, value, inline = self._fields[key][1]
+                field = self.embed.fields[index]
+                if field.value != value or field.name != name:
+                    self.embed.set_field_at(index, name=name, value=value, inline=inline)
         
-        return callback
+        return self.view.refresh()
     
-    async def _flee_callback(self, interaction: discord.Interaction):
-        """Callback de fuite moderne."""
-        if interaction.user.id != self.combat.player_id:
-            embed = discord.Embed(
-                description=f"{Emojis.ERROR} **Ce n'est pas ton combat !**",
-                color=Colors.ERROR
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
+    def _render_field(self, key: str) -> Optional[tuple]:
+        """Calcule (nom, valeur, inline) d'un champ, None s'il est masqué."""
+        combat = self.combat
+        boss = combat.boss
         
-        self.selected_skill = None
-        self.waiting_for_action = False
-        self.stop()
-        await interaction.response.defer()
+        # Barres de vie modernes
+        if key == "boss":
+            boss_hp_bar = create_hp_bar(boss.current_hp, boss.max_hp, 12)
+            return f"{boss.emoji} {boss.name}", f"{boss_hp_bar}\n`{boss.current_hp}/{boss.max_hp}` PV", True
+        if key == "versus":
+            return "⚡ VS ⚡", "═══════", True
+        if key == "player":
+            player_hp_bar = create_hp_bar(combat.player_hp, combat.player_max_hp, 12)
+            return f"👤 {self.player_name}", f"{player_hp_bar}\n`{combat.player_hp}/{combat.player_max_hp}` PV", True
+        
+        if key == "effects":
+            # Effets actifs
+            effects = []
+            for buff, turns in combat.player_buffs.items():
+                if buff == "attack":
+                    effects.append(f"{Emojis.ATTACK} ATK+ `{turns}t`")
+                elif buff == "defense":
+                    effects.append(f"{Emojis.DEFENSE} DEF+ `{turns}t`")
+            if combat.player_dots:
+                effects.append(f"🔥 Brûlure active")
+            if combat.boss_debuffs.get("stun", 0) > 0:
+                effects.append(f"💫 Boss étourdi")
+            if not effects:
+                return None
+            return "📊 Effets Actifs", " │ ".join(effects), False
+        
+        # Log de combat
+        if not combat.combat_log:
+            return None
+        log_text = "\n".join([f"▸ {entry}" for entry in combat.combat_log[-3:]])
+        return "📜 Actions", f"```\n{log_text}\n```", False
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -129,89 +227,133 @@ class Battle(commands.Cog):
     def __init__(self, bot: commands.Bot, data_manager: DataManager):
         self.bot = bot
         self.data = data_manager
-        self.active_combats: Dict[int, CombatState] = {}
+        # Combats en cours par joueur, sauvegardés à chaque tour (rechargés au démarrage)
+        self.active_combats: Dict[int, CombatCheckpoint] = {}
+        # Joueurs dont un tour est en cours de traitement (double clic ignoré)
+        self._turns_in_progress: Set[int] = set()
+        # Affichage de chaque combat (embed et vue réutilisés d'un tour à l'autre)
+        self._displays: Dict[int, CombatDisplay] = {}
+        self._sweep_task: Optional[asyncio.Task] = None
+    
+    async def cog_load(self):
+        """Recharge les combats sauvegardés, réactive leurs boutons et lance le nettoyage."""
+        self.bot.add_dynamic_items(CombatButton)
+        for checkpoint in self.data.combat_store.load_all(self.data.catalog):
+            if checkpoint.is_expired() or not checkpoint.message_id:
+                self.data.combat_store.delete(checkpoint.user_id)
+                continue
+            self.active_combats[checkpoint.user_id] = checkpoint
+        if self.active_combats:
+            print(f"⚔️ {len(self.active_combats)} combat(s) repris")
+        self._sweep_task = asyncio.get_running_loop().create_task(self._sweep_loop())
+    
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(CombatButton)
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            self._sweep_task = None
+    
+    async def _sweep_loop(self) -> None:
+        """Retire à intervalle régulier les combats abandonnés (mémoire, affichage et fichier)."""
+        while True:
+            await asyncio.sleep(COMBAT_SWEEP_INTERVAL)
+            try:
+                now = time.time()
+                expired = [
+                    user_id for user_id, checkpoint in self.active_combats.items()
+                    if checkpoint.is_expired(now) and user_id not in self._turns_in_progress
+                ]
+                for user_id in expired:
+                    await self._end_combat(user_id)
+            except Exception as e:
+                print(f"⚠️ Erreur lors du nettoyage des combats: {e}")
     
     # ───────────────────────────────────────────────────────────────
     # 🔍 AUTOCOMPLETE FUNCTIONS
     # ───────────────────────────────────────────────────────────────
     
+    @cached_autocomplete()
     async def boss_autocomplete(
         self, interaction: discord.Interaction, current: str
     ) -> List[app_commands.Choice[str]]:
         """Autocomplete pour les noms de boss."""
-        player = self.data.get_player(interaction.user.id)
-        bosses = self.data.get_all_bosses()
+        player = self.data.peek_player(interaction.user.id)
+        catalog = self.data.catalog
         
         choices = []
-        for boss in bosses:
+        for boss_id in catalog.boss_names.complete(current):
+            boss = catalog.bosses[boss_id]
             unlocked = player.level >= boss.level_required
             lock = "" if unlocked else "🔒 "
             display = f"{lock}{boss.emoji} {boss.name} (Niv.{boss.level_required})"
-            
-            if current.lower() in boss.name.lower() or not current:
-                choices.append(app_commands.Choice(name=display[:100], value=boss.name))
+            choices.append(app_commands.Choice(name=display[:100], value=boss.name))
         
-        return choices[:25]
+        return choices
     
+    @cached_autocomplete()
     async def skill_unlock_autocomplete(
         self, interaction: discord.Interaction, current: str
     ) -> List[app_commands.Choice[str]]:
         """Autocomplete pour les skills à débloquer."""
-        player = self.data.get_player(interaction.user.id)
-        all_skills = self.data.get_all_skills()
+        player = self.data.peek_player(interaction.user.id)
+        catalog = self.data.catalog
         
         choices = []
-        for skill in all_skills:
-            if skill.skill_id in player.skills:
-                continue  # Déjà débloqué
-            
+        # Les skills déjà débloqués sont exclus
+        skill_ids = catalog.skill_names.complete(
+            current, accept=lambda skill_id: skill_id not in player.skills
+        )
+        for skill_id in skill_ids:
+            skill = catalog.skills[skill_id]
             unlocked = player.level >= skill.level_required
             lock = "" if unlocked else "🔒 "
             display = f"{lock}{skill.emoji} {skill.name} ({skill.skill_type.value})"
-            
-            if current.lower() in skill.name.lower() or not current:
-                choices.append(app_commands.Choice(name=display[:100], value=skill.name))
+            choices.append(app_commands.Choice(name=display[:100], value=skill.name))
         
-        return choices[:25]
+        return choices
     
+    @cached_autocomplete()
     async def skill_equip_autocomplete(
         self, interaction: discord.Interaction, current: str
     ) -> List[app_commands.Choice[str]]:
         """Autocomplete pour les skills à équiper."""
-        player = self.data.get_player(interaction.user.id)
+        player = self.data.peek_player(interaction.user.id)
+        catalog = self.data.catalog
         
         choices = []
-        for skill_id in player.skills:
-            if skill_id in player.equipped_skills:
-                continue  # Déjà équipé
-            
-            skill = self.data.get_skill(skill_id)
-            if skill:
-                level = player.skills.get(skill_id, 1)
-                display = f"{skill.emoji} {skill.name} Niv.{level}"
-                
-                if current.lower() in skill.name.lower() or not current:
-                    choices.append(app_commands.Choice(name=display[:100], value=skill.name))
+        # Skills débloqués et pas encore équipés
+        skill_ids = catalog.skill_names.complete(
+            current, owned=player.skills,
+            accept=lambda skill_id: skill_id not in player.equipped_skills
+        )
+        for skill_id in skill_ids:
+            skill = catalog.skills[skill_id]
+            level = player.skills.get(skill_id, 1)
+            display = f"{skill.emoji} {skill.name} Niv.{level}"
+            choices.append(app_commands.Choice(name=display[:100], value=skill.name))
         
-        return choices[:25]
+        return choices
     
+    @cached_autocomplete()
     async def skill_unequip_autocomplete(
         self, interaction: discord.Interaction, current: str
     ) -> List[app_commands.Choice[str]]:
         """Autocomplete pour les skills à déséquiper."""
-        player = self.data.get_player(interaction.user.id)
+        player = self.data.peek_player(interaction.user.id)
+        catalog = self.data.catalog
         
         choices = []
-        for skill_id in player.equipped_skills:
-            skill = self.data.get_skill(skill_id)
-            if skill:
-                level = player.skills.get(skill_id, 1)
-                display = f"{skill.emoji} {skill.name} Niv.{level}"
-                
-                if current.lower() in skill.name.lower() or not current:
-                    choices.append(app_commands.Choice(name=display[:100], value=skill.name))
+        skill_ids = catalog.skill_names.complete(
+            current, owned=player.skills,
+            accept=lambda skill_id: skill_id in player.equipped_skills
+        )
+        for skill_id in skill_ids:
+            skill = catalog.skills[skill_id]
+            level = player.skills.get(skill_id, 1)
+            display = f"{skill.emoji} {skill.name} Niv.{level}"
+            choices.append(app_commands.Choice(name=display[:100], value=skill.name))
         
-        return choices[:25]
+        return choices
     
     # ───────────────────────────────────────────────────────────────
     # 📊 COMMANDE NIVEAU - AFFICHAGE MODERNE
@@ -359,23 +501,39 @@ class Battle(commands.Cog):
     # ───────────────────────────────────────────────────────────────
     
     @app_commands.command(name="combat", description="⚔️ Lance un combat contre un boss")
-    @app_commands.describe(boss="Le nom du boss à combattre")
+    @app_commands.describe(
+        boss="Le nom du boss à combattre",
+        auto="Combat automatique : tes compétences équipées dans l'ordre, résultat en un message",
+        soin="Combat automatique : PV (%) sous lesquels tu te soignes en priorité"
+    )
     @app_commands.autocomplete(boss=boss_autocomplete)
-    async def start_combat(self, interaction: discord.Interaction, boss: str):
+    async def start_combat(
+        self,
+        interaction: discord.Interaction,
+        boss: str,
+        auto: bool = False,
+        soin: app_commands.Range[int, 0, 100] = int(AUTO_HEAL_BELOW * 100)
+    ):
         """Lance un combat avec interface moderne."""
         # Defer immédiatement pour éviter les timeout
         await interaction.response.defer()
         
         player = self.data.get_player(interaction.user.id)
         
-        # Vérifications
-        if interaction.user.id in self.active_combats:
+        # Vérifications (un combat abandonné depuis longtemps ne bloque plus)
+        current = self.active_combats.get(interaction.user.id)
+        if current is not None and current.is_expired():
+            await self._end_combat(interaction.user.id)
+            current = None
+        if current is not None:
             await interaction.followup.send(
                 embed=self._error_embed("Combat en cours", "Tu es déjà en combat ! Termine-le d'abord."),
                 ephemeral=True
             )
             return
         
+        # Catalogue du lancement (un combat repris après un redémarrage utilise le catalogue rechargé)
+        catalog = self.data.catalog
         target_boss = self.data.get_boss_by_name(boss)
         if not target_boss:
             await interaction.followup.send(
@@ -399,22 +557,20 @@ class Battle(commands.Cog):
             player.heal_full()
             self.data.save_player(player)
         
-        # Mettre à jour les stats d'équipement avant le combat
-        player.update_equipment_stats(self.data)
-        
         # Initialisation du combat avec stats d'équipement
-        target_boss.reset_hp()
-        combat = CombatState(
-            player_id=interaction.user.id,
-            boss=target_boss,
-            player_hp=player.current_hp,
-            player_max_hp=player.get_max_hp(),
-            player_attack=player.get_attack(),
-            player_defense=player.get_defense()
+        combat = new_combat(
+            player, target_boss, catalog,
+            seed=self.data.rng.player_stream("combat", interaction.user.id).getrandbits(64)
         )
         
-        self.active_combats[interaction.user.id] = combat
-        player_skills = self._get_player_combat_skills(player)
+        player_skills = combat_skills(player, catalog)
+        
+        if auto:
+            await self._run_auto_combat(interaction, combat, player, player_skills, catalog, soin / 100)
+            return
+        
+        checkpoint = CombatCheckpoint(combat, [skill.skill_id for skill in player_skills], catalog=catalog)
+        self.active_combats[interaction.user.id] = checkpoint
         
         # Animation d'apparition moderne
         intro_embed = discord.Embed(
@@ -455,267 +611,196 @@ class Battle(commands.Cog):
             inline=True
         )
         
-        message = await interaction.followup.send(embed=intro_embed)
-        await asyncio.sleep(2)
+        try:
+            message = await interaction.followup.send(embed=intro_embed)
+            await asyncio.sleep(2)
+            
+            # Premier tour : les clics suivants sont traités par handle_combat_action
+            checkpoint.channel_id = message.channel.id
+            checkpoint.message_id = message.id
+            await self._save_combat(checkpoint)
+            display = CombatDisplay(combat, player_skills, interaction.user)
+            self._displays[interaction.user.id] = display
+            await message.edit(embed=display.embed, view=display.view)
+        except BaseException:
+            # Message non envoyé ou non affiché (ou commande annulée) : pas de combat fantôme
+            await self._end_combat(interaction.user.id)
+            raise
+    
+    async def handle_combat_action(self, interaction: discord.Interaction, user_id: int, action: str) -> None:
+        """Joue le tour choisi par un bouton de combat (voir CombatButton)."""
+        if interaction.user.id != user_id:
+            embed = discord.Embed(
+                description=f"{Emojis.ERROR} **Ce n'est pas ton combat !**",
+                color=Colors.ERROR
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        checkpoint = self.active_combats.get(user_id)
+        if checkpoint is None or checkpoint.message_id != interaction.message.id:
+            # Message d'un combat terminé ou remplacé
+            await interaction.response.edit_message(view=None)
+            return
+        if user_id in self._turns_in_progress:
+            await interaction.response.defer()
+            return
+        
+        combat = checkpoint.combat
+        # Version du catalogue du lancement, même après un /admin-reload (l'actuelle pour un combat repris)
+        catalog = checkpoint.catalog or self.data.catalog
+        skill = None
+        if action.startswith("skill:"):
+            skill_id = action[len("skill:"):]
+            skill = catalog.get_skill(skill_id) if skill_id in checkpoint.skill_ids else None
+            if skill is None or combat.skill_cooldowns.get(skill_id, 0) > 0:
+                await interaction.response.send_message(
+                    embed=self._error_embed("Action impossible", "Cette compétence n'est pas disponible."),
+                    ephemeral=True
+                )
+                return
         
-        # Boucle de combat moderne
-        while combat.boss.is_alive() and combat.player_hp > 0:
-            combat_embed = self._create_modern_combat_embed(combat, player, interaction.user)
-            view = ModernBattleView(self, combat, player, player_skills)
+        self._turns_in_progress.add(user_id)
+        try:
+            # Tour du joueur, riposte du boss et effets (aucune compétence : fuite)
+            turn = play_turn(combat, skill)
+            boss = combat.boss
             
-            await message.edit(embed=combat_embed, view=view)
-            await view.wait()
+            if turn.outcome is CombatOutcome.ONGOING:
+                checkpoint.updated_at = time.time()
+                await self._save_combat(checkpoint)
+                display = self._displays.get(user_id)
+                if display is None:
+                    # Combat repris après un redémarrage : affichage recréé une fois
+                    skills = [s for s in map(catalog.get_skill, checkpoint.skill_ids) if s]
+                    display = CombatDisplay(combat, skills, interaction.user)
+                    self._displays[user_id] = display
+                    view_changed = True
+                else:
+                    view_changed = display.update()
+                # Les boutons ne sont renvoyés que si leur état a changé
+                if view_changed:
+                    await interaction.response.edit_message(embed=display.embed, view=display.view)
+                else:
+                    await interaction.response.edit_message(embed=display.embed)
+                return
             
-            if view.selected_skill is None:
-                # Fuite
-                del self.active_combats[interaction.user.id]
-                flee_embed = discord.Embed(
+            # Fin du combat
+            await self._end_combat(user_id)
+            player = self.data.get_player(user_id)
+            if turn.outcome is CombatOutcome.FLED:
+                embed = discord.Embed(
                     title="💨 Retraite Stratégique",
                     description=(
-                        f"Tu as fui le combat contre {target_boss.emoji} **{target_boss.name}** !\n\n"
+                        f"Tu as fui le combat contre {boss.emoji} **{boss.name}** !\n\n"
                         f"```diff\n- Aucune récompense obtenue\n```"
                     ),
                     color=Colors.SECONDARY
                 )
-                await message.edit(embed=flee_embed, view=None)
-                return
-            
-            skill = view.selected_skill
-            
-            # Tour du joueur
-            player_result = await self._execute_player_turn(combat, player, skill)
-            combat.add_log(player_result)
-            
-            if skill.cooldown > 0:
-                combat.skill_cooldowns[skill.skill_id] = skill.cooldown
-            
-            if not combat.boss.is_alive():
-                break
-            
-            # Tour du boss
-            boss_result = await self._execute_boss_turn(combat, player)
-            combat.add_log(boss_result)
-            
-            # Effets DoT
-            dot_damage = combat.apply_dots()
-            if dot_damage > 0:
-                combat.player_hp -= dot_damage
-                combat.add_log(f"🔥 Brûlure: `-{dot_damage}` PV !")
-            
-            combat.tick_cooldowns()
-            combat.tick_buffs()
-            combat.turn += 1
-            
-            await asyncio.sleep(0.5)
+            elif turn.outcome is CombatOutcome.DEFEAT:
+                player.current_hp = 1
+                self.data.save_player(player)
+                embed = self._defeat_embed(boss)
+            else:
+                embed = await self._process_victory(combat, player, boss, interaction.user, catalog)
+            await interaction.response.edit_message(embed=embed, view=None)
+        finally:
+            self._turns_in_progress.discard(user_id)
+    
+    async def _save_combat(self, checkpoint: CombatCheckpoint) -> None:
+        """Sauvegarde le combat : sérialisé ici, écrit sur disque dans un thread."""
+        data = checkpoint.to_dict()
+        await asyncio.to_thread(self.data.combat_store.write, checkpoint.user_id, data)
+    
+    async def _end_combat(self, user_id: int) -> None:
+        """Retire un combat terminé : de la mémoire ici, du disque dans un thread."""
+        self.active_combats.pop(user_id, None)
+        self._displays.pop(user_id, None)
+        await asyncio.to_thread(self.data.combat_store.delete, user_id)
+    
+    async def _run_auto_combat(
+        self,
+        interaction: discord.Interaction,
+        combat: CombatState,
+        player,
+        skills: List[Skill],
+        catalog: Catalog,
+        heal_below: float
+    ) -> None:
+        """Joue tout le combat côté serveur et publie un seul embed récapitulatif."""
+        boss = combat.boss
+        # Priorité : compétences équipées dans l'ordre, puis attaque de base et soin
+        priority = list(player.equipped_skills) + [skill.skill_id for skill in skills]
+        uses: Dict[str, int] = {}
+        
+        def count_use(skill: Skill, turn) -> None:
+            key = f"{skill.emoji} {skill.name}"
+            uses[key] = uses.get(key, 0) + 1
         
-        # Fin du combat
-        del self.active_combats[interaction.user.id]
+        result = run_combat(combat, skills, priority_policy(priority, heal_below), on_turn=count_use)
         
-        if combat.player_hp <= 0:
+        if result is CombatOutcome.VICTORY:
+            embed = await self._process_victory(combat, player, boss, interaction.user, catalog)
+        elif result is CombatOutcome.DEFEAT:
             player.current_hp = 1
             self.data.save_player(player)
-            
-            defeat_embed = discord.Embed(
-                title="💀 DÉFAITE",
+            embed = self._defeat_embed(boss)
+        else:
+            # Limite de tours atteinte : abandon, comme une fuite
+            embed = discord.Embed(
+                title="💨 Combat interminable",
                 description=(
-                    f"```ansi\n"
-                    f"\u001b[1;30m╔{'═' * 36}╗\u001b[0m\n"
-                    f"\u001b[1;30m║\u001b[0m      💀 TU AS ÉTÉ VAINCU... 💀      \u001b[1;30m║\u001b[0m\n"
-                    f"\u001b[1;30m╚{'═' * 36}╝\u001b[0m\n"
-                    f"```\n"
-                    f"{target_boss.emoji} **{target_boss.name}** t'a écrasé...\n\n"
-                    f"```diff\n- Aucune récompense\n```\n"
-                    f"💡 *Améliore ton équipement et réessaie !*"
+                    f"{boss.emoji} **{boss.name}** tient toujours après {MAX_TURNS} tours, tu abandonnes.\n\n"
+                    f"```diff\n- Aucune récompense obtenue\n```"
                 ),
                 color=Colors.SECONDARY
             )
-            await message.edit(embed=defeat_embed, view=None)
-        else:
-            victory_embed = await self._process_victory(combat, player, target_boss, interaction.user)
-            await message.edit(embed=victory_embed, view=None)
-    
-    def _create_modern_combat_embed(self, combat: CombatState, player, user: discord.User) -> discord.Embed:
-        """Crée l'embed de combat moderne."""
-        boss = combat.boss
         
-        embed = discord.Embed(
-            title=f"⚔️ Tour {combat.turn}",
-            color=Colors.DANGER
-        )
-        
-        # Barres de vie modernes
-        boss_hp_bar = create_hp_bar(boss.current_hp, boss.max_hp, 12)
-        player_hp_bar = create_hp_bar(combat.player_hp, combat.player_max_hp, 12)
-        
-        embed.add_field(
-            name=f"{boss.emoji} {boss.name}",
-            value=f"{boss_hp_bar}\n`{boss.current_hp}/{boss.max_hp}` PV",
-            inline=True
+        skills_text = " · ".join(f"{name} ×{count}" for name, count in uses.items())
+        log_text = "\n".join(f"▸ {entry}" for entry in combat.combat_log[-5:])
+        summary = (
+            f"⚔️ **{sum(uses.values())}** tours · {Emojis.HP} `{max(0, combat.player_hp)}/{combat.player_max_hp}` PV\n"
+            f"{skills_text}\n"
+            f"```\n{log_text}\n```"
         )
-        
-        embed.add_field(
-            name=f"⚡ VS ⚡",
-            value="═══════",
-            inline=True
-        )
-        
-        embed.add_field(
-            name=f"👤 {user.display_name}",
-            value=f"{player_hp_bar}\n`{combat.player_hp}/{combat.player_max_hp}` PV",
-            inline=True
-        )
-        
-        # Effets actifs
-        effects = []
-        if combat.player_buffs:
-            for buff, turns in combat.player_buffs.items():
-                if buff == "attack":
-                    effects.append(f"{Emojis.ATTACK} ATK+ `{turns}t`")
-                elif buff == "defense":
-                    effects.append(f"{Emojis.DEFENSE} DEF+ `{turns}t`")
-        
-        if combat.player_dots:
-            effects.append(f"🔥 Brûlure active")
-        
-        if combat.boss_debuffs.get("stun", 0) > 0:
-            effects.append(f"💫 Boss étourdi")
-        
-        if effects:
-            embed.add_field(
-                name="📊 Effets Actifs",
-                value=" │ ".join(effects),
-                inline=False
-            )
-        
-        # Log de combat
-        if combat.combat_log:
-            log_entries = combat.combat_log[-3:]
-            log_text = "\n".join([f"▸ {entry}" for entry in log_entries])
-            embed.add_field(
-                name="📜 Actions",
-                value=f"```\n{log_text}\n```",
-                inline=False
-            )
-        
-        embed.set_footer(text="⚔️ Choisis ton action ci-dessous !")
-        
-        return embed
+        embed.add_field(name="🤖 Combat automatique", value=summary[:1024], inline=False)
+        await interaction.followup.send(embed=embed)
     
-    async def _execute_player_turn(self, combat: CombatState, player, skill: Skill) -> str:
-        """Exécute le tour du joueur."""
-        result = f"{skill.emoji} {skill.name}"
-        
-        if random.randint(1, 100) > skill.accuracy:
-            return result + " → RATÉ !"
-        
-        if skill.base_power > 0:
-            level_bonus = player.level // 5
-            attack_boost = combat.player_buffs.get("attack", 0) * 0.5
-            damage = skill.calculate_damage(combat.player_attack + int(combat.player_attack * attack_boost), level_bonus)
-            
-            actual_damage = combat.boss.take_damage(damage)
-            result += f" → -{actual_damage} PV"
-            
-            if skill.lifesteal > 0:
-                heal = int(actual_damage * skill.lifesteal)
-                combat.player_hp = min(combat.player_max_hp, combat.player_hp + heal)
-                result += f" (+{heal} vol)"
-        
-        if skill.heal_percent > 0:
-            heal = int(combat.player_max_hp * skill.heal_percent)
-            combat.player_hp = min(combat.player_max_hp, combat.player_hp + heal)
-            result += f" → +{heal} PV"
-        
-        if skill.defense_boost > 0:
-            combat.player_buffs["defense"] = 3
-            result += f" [DEF+]"
-        
-        if skill.attack_boost > 0:
-            combat.player_buffs["attack"] = 2
-            result += f" [ATK+]"
-        
-        if skill.dot_damage > 0:
-            combat.boss_debuffs["dot"] = skill.dot_turns
-            result += f" [🔥]"
-        
-        if skill.stun_chance > 0 and random.random() < skill.stun_chance:
-            combat.boss_debuffs["stun"] = 1
-            result += f" [💫]"
-        
-        return result
-    
-    async def _execute_boss_turn(self, combat: CombatState, player) -> str:
-        """Exécute le tour du boss."""
-        boss = combat.boss
-        
-        if combat.boss_debuffs.get("stun", 0) > 0:
-            return f"{boss.emoji} {boss.name} est étourdi !"
-        
-        attack = boss.choose_attack()
-        result = f"{attack.emoji} {boss.name}: {attack.name}"
-        
-        defense_boost = combat.player_buffs.get("defense", 0) * 0.5
-        effective_defense = combat.player_defense + int(combat.player_defense * defense_boost)
-        damage = max(1, attack.damage - effective_defense // 2)
-        
-        combat.player_hp = max(0, combat.player_hp - damage)
-        result += f" → -{damage} PV"
-        
-        if attack.special_effect == "dot":
-            combat.player_dots.append((int(attack.effect_value), 3))
-            result += " [🔥]"
-        elif attack.special_effect == "lifesteal":
-            heal = int(damage * attack.effect_value)
-            boss.current_hp = min(boss.max_hp, boss.current_hp + heal)
-            result += f" (+{heal})"
-        elif attack.special_effect == "heal":
-            heal = int(boss.max_hp * attack.effect_value)
-            boss.current_hp = min(boss.max_hp, boss.current_hp + heal)
-            result += f" [Soin +{heal}]"
-        
-        return result
+    def _defeat_embed(self, boss: BossInstance) -> discord.Embed:
+        """Embed de défaite."""
+        return discord.Embed(
+            title="💀 DÉFAITE",
+            description=(
+                f"```ansi\n"
+                f"\u001b[1;30m╔{'═' * 36}╗\u001b[0m\n"
+                f"\u001b[1;30m║\u001b[0m      💀 TU AS ÉTÉ VAINCU... 💀      \u001b[1;30m║\u001b[0m\n"
+                f"\u001b[1;30m╚{'═' * 36}╝\u001b[0m\n"
+                f"```\n"
+                f"{boss.emoji} **{boss.name}** t'a écrasé...\n\n"
+                f"```diff\n- Aucune récompense\n```\n"
+                f"💡 *Améliore ton équipement et réessaie !*"
+            ),
+            color=Colors.SECONDARY
+        )
     
-    async def _process_victory(self, combat: CombatState, player, boss: Boss, user: discord.User) -> discord.Embed:
-        """Traite la victoire avec design moderne."""
-        # Mettre à jour les stats d'équipement
-        player.update_equipment_stats(self.data)
-        
-        # Calculer les récompenses avec bonus d'équipement
-        base_xp = boss.xp_reward
-        base_coins = boss.coins_reward
-        
-        xp_bonus = player.get_xp_bonus()
-        coin_bonus = player.get_coin_bonus()
+    async def _process_victory(
+        self, combat: CombatState, player, boss: BossInstance, user: discord.User, catalog: Catalog
+    ) -> discord.Embed:
+        """Traite la victoire avec design moderne (avec la version du catalogue du combat)."""
+        # XP, pièces et butin avec bonus d'équipement
+        rewards = apply_victory_rewards(player, boss, catalog, turn_stream(combat, "loot"))
+        player.current_hp = combat.player_hp
+        self.data.save_player(player)
         
-        xp_gained = int(base_xp * (1 + xp_bonus))
-        coins_gained = int(base_coins * (1 + coin_bonus))
+        xp_gained = rewards.xp
+        coins_gained = rewards.coins
+        levels_gained = rewards.levels_gained
+        drops = [f"{item.rarity.emoji} **{item.name}**" for item in rewards.drops]
         
         # Texte bonus si applicable
         bonus_text = ""
-        if xp_bonus > 0 or coin_bonus > 0:
-            bonus_text = f"\n*Bonus équipement: +{int(xp_bonus*100)}% XP, +{int(coin_bonus*100)}% 💰*"
-        
-        levels_gained = player.add_xp(xp_gained)
-        player.add_coins(coins_gained)
-        player.bosses_defeated += 1
-        player.bosses_kills[boss.boss_id] = player.bosses_kills.get(boss.boss_id, 0) + 1
-        player.current_hp = combat.player_hp
-        
-        drops = []
-        for item_id in boss.guaranteed_drops:
-            player.add_item(item_id, 1)
-            item = self.data.get_item(item_id)
-            if item:
-                drops.append(f"{item.rarity.emoji} **{item.name}**")
-        
-        for item_id, chance in boss.drop_items.items():
-            if random.random() < chance:
-                player.add_item(item_id, 1)
-                item = self.data.get_item(item_id)
-                if item:
-                    drops.append(f"{item.rarity.emoji} **{item.name}**")
-        
-        self.data.save_player(player)
+        if rewards.xp_bonus > 0 or rewards.coin_bonus > 0:
+            bonus_text = f"\n*Bonus équipement: +{int(rewards.xp_bonus*100)}% XP, +{int(rewards.coin_bonus*100)}% 💰*"
         
         embed = discord.Embed(color=Colors.SUCCESS)
         
@@ -764,25 +849,6 @@ class Battle(commands.Cog):
         
         return embed
     
-    def _get_player_combat_skills(self, player) -> List[Skill]:
-        """Récupère les skills de combat du joueur."""
-        skills = []
-        
-        basic_attack = self.data.get_skill("basic_attack")
-        if basic_attack:
-            skills.append(basic_attack)
-        
-        heal_skill = self.data.get_skill("heal")
-        if heal_skill and player.level >= heal_skill.level_required:
-            skills.append(heal_skill)
-        
-        for skill_id in player.equipped_skills:
-            skill = self.data.get_skill(skill_id)
-            if skill and skill not in skills:
-                skills.append(skill)
-        
-        return skills[:4]
-    
     # ───────────────────────────────────────────────────────────────
     # ✨ COMMANDES SKILLS MODERNES
     # ───────────────────────────────────────────────────────────────
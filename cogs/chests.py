@@ -28,7 +28,17 @@ class Chests(commands.Cog):
     def __init__(self, bot: commands.Bot, data_manager: DataManager):
         self.bot = bot
         self.data = data_manager
-        self.chest = Chest(self.data.get_all_items())
+        self._chest: Optional[Chest] = None
+        self._chest_catalog = None
+
+    @property
+    def chest(self) -> Chest:
+        """Coffre construit sur la version courante du catalogue (reconstruit après un rechargement)."""
+        catalog = self.data.catalog
+        if self._chest is None or self._chest_catalog is not catalog:
+            self._chest = Chest(list(catalog.items.values()))
+            self._chest_catalog = catalog
+        return self._chest
 
     # ───────────────────────────────────────────────────────────────
     # 🎁 COMMANDE COFFRE - OUVERTURE UNIQUE
@@ -79,7 +89,7 @@ class Chests(commands.Cog):
 
         # Calcul du bonus de drop (pet + sets)
         drop_bonus = self.data.calculate_total_drop_bonus(player)
-        item = self.chest.open(drop_bonus)
+        item = self.chest.open(drop_bonus, self.data.rng.player_stream("chests", interaction.user.id))
         if not item:
             await interaction.response.send_message(embed=self._error_embed("Erreur", "Aucun objet disponible."))
             return
@@ -219,31 +229,36 @@ class Chests(commands.Cog):
         await interaction.response.send_message(embed=opening_embed)
         await asyncio.sleep(2)
 
-        # Ouvrir les coffres
-        items_obtained = []
-        rarity_counts = {r: 0 for r in Rarity}
-        total_value = 0
-        drop_bonus = self.data.calculate_total_drop_bonus(player)
-
+        # Ouvrir les coffres (paiement un par un, tirage groupé)
+        opened = 0
         for i in range(chests_to_open):
             if player.can_open_free_chest():
                 success = player.open_chest(paid=False)
             else:
                 success = player.open_chest(paid=True)
-            
             if success:
-                item = self.chest.open(drop_bonus)
-                if item:
-                    player.add_item(item.item_id)
-                    items_obtained.append(item)
-                    rarity_counts[item.rarity] += 1
-                    total_value += item.value
+                opened += 1
 
+        drop_bonus = self.data.calculate_total_drop_bonus(player)
+        obtained = self.chest.open_many(
+            opened, drop_bonus, self.data.rng.player_stream("chests", interaction.user.id)
+        )
+        player.add_items(obtained)
         self.data.save_player(player)
 
+        # Agrégats pour l'affichage (catalogue du coffre utilisé)
+        catalog = self._chest_catalog
+        obtained_items = [(catalog.items[item_id], qty) for item_id, qty in obtained.items()]
+        items_count = sum(obtained.values())
+        rarity_counts = {r: 0 for r in Rarity}
+        total_value = 0
+        for item, qty in obtained_items:
+            rarity_counts[item.rarity] += qty
+            total_value += item.value * qty
+
         # ═══ RÉSUMÉ MODERNE ═══
         result_embed = discord.Embed(
-            title=f"🎉 {len(items_obtained)} Coffres Ouverts !",
+            title=f"🎉 {items_count} Coffres Ouverts !",
             description=(
                 f"```ansi\n"
                 f"\u001b[1;32m╔{'═' * 36}╗\u001b[0m\n"
@@ -256,7 +271,7 @@ class Chests(commands.Cog):
 
         # Résumé par rareté avec barres visuelles
         rarity_lines = []
-        max_count = max(rarity_counts.values()) if items_obtained else 1
+        max_count = max(rarity_counts.values()) if items_count else 1
         
         for rarity in [Rarity.MYTHIC, Rarity.LEGENDARY, Rarity.EPIC, Rarity.RARE, Rarity.NORMAL]:
             count = rarity_counts[rarity]
@@ -283,11 +298,12 @@ class Chests(commands.Cog):
         result_embed.add_field(name="💰 Économie", value=stats_text, inline=True)
 
         # Meilleurs drops
-        if items_obtained:
-            best_items = sorted(items_obtained, key=lambda x: x.value, reverse=True)[:5]
+        if obtained_items:
+            best_items = sorted(obtained_items, key=lambda x: x[0].value, reverse=True)[:5]
             best_text = "\n".join([
-                f"{item.rarity.emoji} **{item.name}** `{format_number(item.value)}`" 
-                for item in best_items
+                f"{item.rarity.emoji} **{item.name}** `{format_number(item.value)}`"
+                + (f" ×{qty}" if qty > 1 else "")
+                for item, qty in best_items
             ])
             result_embed.add_field(name=f"{Emojis.TROPHY} Top Drops", value=best_text, inline=False)
 
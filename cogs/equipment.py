@@ -7,7 +7,7 @@ from discord import app_commands
 from discord.ext import commands
 from typing import List, Optional
 
-from services import DataManager
+from services import DataManager, cached_autocomplete
 from utils import ModernTheme, ModernEmbed, create_progress_bar
 
 
@@ -338,21 +338,8 @@ class Equipment(commands.Cog):
         
         player = self.data.get_player(interaction.user.id)
         
-        # Chercher l'item dans l'inventaire
-        target_item = None
-        for item_id in player.inventory:
-            item = self.data.get_item(item_id)
-            if item and item.name.lower() == nom.lower():
-                target_item = item
-                break
-        
-        if not target_item:
-            # Recherche partielle
-            for item_id in player.inventory:
-                item = self.data.get_item(item_id)
-                if item and nom.lower() in item.name.lower():
-                    target_item = item
-                    break
+        # Chercher l'item dans l'inventaire (nom exact, puis partiel)
+        target_item = self.data.find_item_by_name(nom, owned=player.inventory, partial=True)
         
         if not target_item:
             embed = ModernEmbed.create(
@@ -432,33 +419,37 @@ class Equipment(commands.Cog):
         await interaction.followup.send(embed=embed)
 
     @equip_item.autocomplete('nom')
+    @cached_autocomplete()
     async def equip_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocomplétion pour les items équipables."""
-        player = self.data.get_player(interaction.user.id)
+        player = self.data.peek_player(interaction.user.id)
+        catalog = self.data.catalog
         choices = []
         seen_names = set()
         
-        for item_id in player.inventory:
-            item = self.data.get_item(item_id)
-            if item and item.is_equipable():
-                if item.name in seen_names:
-                    continue
-                if not current or current.lower() in item.name.lower():
-                    seen_names.add(item.name)
-                    
-                    # Indicateur si déjà équipé
-                    is_equipped = player.equipment.get(item.item_type) == item.item_id
-                    status = " ✓" if is_equipped else ""
-                    
-                    # Slot info
-                    slot_info = SLOT_DISPLAY.get(item.item_type, {"name": ""})
-                    
-                    choices.append(app_commands.Choice(
-                        name=f"{item.rarity.emoji} {item.name} [{slot_info['name']}]{status}"[:100],
-                        value=item.name
-                    ))
+        item_ids = catalog.item_names.complete(
+            current, owned=player.inventory,
+            accept=lambda item_id: catalog.items[item_id].is_equipable()
+        )
+        for item_id in item_ids:
+            item = catalog.items[item_id]
+            if item.name in seen_names:
+                continue
+            seen_names.add(item.name)
+            
+            # Indicateur si déjà équipé
+            is_equipped = player.equipment.get(item.item_type) == item.item_id
+            status = " ✓" if is_equipped else ""
+            
+            # Slot info
+            slot_info = SLOT_DISPLAY.get(item.item_type, {"name": ""})
+            
+            choices.append(app_commands.Choice(
+                name=f"{item.rarity.emoji} {item.name} [{slot_info['name']}]{status}"[:100],
+                value=item.name
+            ))
         
-        return choices[:25]
+        return choices
 
     # ══════════════════════════════════════════════════════════════
     # 🛡️ COMMANDE DESEQUIPER
@@ -14,7 +14,8 @@ from discord.ext import commands
 from typing import Optional, List
 
 from models import Rarity
-from services import DataManager
+from services import DataManager, cached_autocomplete
+from services.economy import sell_items
 from utils import COLORS
 from utils.styles import (
     Colors, Emojis,
@@ -38,28 +39,23 @@ class Inventory(commands.Cog):
     # 🔍 AUTOCOMPLETE FUNCTIONS
     # ───────────────────────────────────────────────────────────────
 
+    @cached_autocomplete()
     async def item_autocomplete(
         self, interaction: discord.Interaction, current: str
     ) -> List[app_commands.Choice[str]]:
         """Autocomplete pour les items de l'inventaire."""
-        player = self.data.get_player(interaction.user.id)
+        player = self.data.peek_player(interaction.user.id)
+        catalog = self.data.catalog
         choices = []
         
-        for item_id, qty in player.inventory.items():
-            item = self.data.get_item(item_id)
-            if item:
-                if current.lower() in item.name.lower() or not current:
-                    display = f"{item.rarity.emoji} {item.name} (×{qty}) - {format_number(item.value)}"
-                    choices.append(app_commands.Choice(name=display[:100], value=item.name))
-        
-        # Trier par rareté (mythic en premier)
-        rarity_order = {"MYTHIC": 0, "LEGENDARY": 1, "EPIC": 2, "RARE": 3, "NORMAL": 4}
-        choices.sort(key=lambda c: rarity_order.get(
-            next((self.data.get_item(iid).rarity.name for iid, _ in player.inventory.items() 
-                  if self.data.get_item(iid) and self.data.get_item(iid).name == c.value), "NORMAL"), 5
-        ))
+        # Classé par correspondance, rareté (mythic en premier) puis quantité
+        for item_id in catalog.item_names.complete(current, owned=player.inventory):
+            item = catalog.items[item_id]
+            qty = player.inventory.get(item_id, 0)
+            display = f"{item.rarity.emoji} {item.name} (×{qty}) - {format_number(item.value)}"
+            choices.append(app_commands.Choice(name=display[:100], value=item.name))
         
-        return choices[:25]
+        return choices
 
     # ───────────────────────────────────────────────────────────────
     # 🎒 COMMANDE INVENTAIRE MODERNE
@@ -102,20 +98,16 @@ class Inventory(commands.Cog):
             await interaction.response.send_message(embed=embed)
             return
 
-        # Préparer les données
-        items_list = []
-        total_value = 0
-        rarity_counts = {r: 0 for r in Rarity}
-        
-        for item_id, quantity in player.inventory.items():
-            item = self.data.get_item(item_id)
-            if item:
-                # Appliquer le filtre de rareté si spécifié
-                if rarete and item.rarity.name != rarete:
-                    continue
-                items_list.append((item, quantity))
-                total_value += item.value * quantity
-                rarity_counts[item.rarity] += quantity
+        # Préparer les données (passes sur l'index dense du catalogue)
+        catalog = self.data.catalog
+        rarity_filter = Rarity[rarete] if rarete else None
+        items_list = catalog.inventory_entries(player.inventory, rarity_filter)
+        if rarity_filter:
+            total_value = sum(item.value * quantity for item, quantity in items_list)
+            rarity_counts = {r: 0 for r in Rarity}
+            rarity_counts[rarity_filter] = sum(quantity for _, quantity in items_list)
+        else:
+            total_value, rarity_counts = catalog.inventory_summary(player.inventory)
 
         if not items_list and rarete:
             embed = self._error_embed(
@@ -222,12 +214,7 @@ class Inventory(commands.Cog):
         player = self.data.get_player(interaction.user.id)
         
         # Rechercher l'objet
-        item = None
-        for item_id in player.inventory:
-            potential = self.data.get_item(item_id)
-            if potential and potential.name.lower() == objet.lower():
-                item = potential
-                break
+        item = self.data.find_item_by_name(objet, owned=player.inventory)
 
         if not item:
             embed = self._error_embed(
@@ -250,16 +237,13 @@ class Inventory(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
 
-        # Calculer les gains avec bonus
-        coin_bonus = self.data.calculate_total_coin_bonus(player)
-        base_total = item.value * quantite
-        bonus_coins = int(base_total * coin_bonus)
-        total = base_total + bonus_coins
-        
+        # Vendre avec le bonus de vente
         old_balance = player.coins
-        player.remove_item(item.item_id, quantite)
-        player.add_coins(total)
-        player.total_items_sold += quantite
+        coin_bonus = self.data.calculate_total_coin_bonus(player)
+        sale = sell_items(player, [(item, quantite)], coin_bonus)
+        base_total = sale.base_coins
+        bonus_coins = sale.bonus_coins
+        total = sale.total_coins
         self.data.save_player(player)
 
         embed = discord.Embed(
@@ -322,11 +306,7 @@ class Inventory(commands.Cog):
         player = self.data.get_player(interaction.user.id)
         target_rarity = Rarity[rarete]
 
-        items_to_sell = []
-        for item_id, qty in list(player.inventory.items()):
-            item = self.data.get_item(item_id)
-            if item and item.rarity == target_rarity:
-                items_to_sell.append((item, qty))
+        items_to_sell = self.data.catalog.inventory_entries(player.inventory, target_rarity)
 
         if not items_to_sell:
             embed = self._error_embed(
@@ -336,22 +316,15 @@ class Inventory(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
 
-        total_items = 0
-        base_coins = 0
         old_balance = player.coins
 
-        for item, qty in items_to_sell:
-            player.remove_item(item.item_id, qty)
-            total_items += qty
-            base_coins += item.value * qty
-
-        # Bonus de vente
+        # Vente groupée avec le bonus de vente
         coin_bonus = self.data.calculate_total_coin_bonus(player)
-        bonus_coins = int(base_coins * coin_bonus)
-        total_coins = base_coins + bonus_coins
-        
-        player.add_coins(total_coins)
-        player.total_items_sold += total_items
+        sale = sell_items(player, items_to_sell, coin_bonus)
+        total_items = sale.items
+        base_coins = sale.base_coins
+        bonus_coins = sale.bonus_coins
+        total_coins = sale.total_coins
         self.data.save_player(player)
 
         embed = discord.Embed(
@@ -404,21 +377,25 @@ class Inventory(commands.Cog):
     # � COMMANDE MANGER/SOIGNER
     # ───────────────────────────────────────────────────────────────
 
+    @cached_autocomplete()
     async def food_autocomplete(
         self, interaction: discord.Interaction, current: str
     ) -> List[app_commands.Choice[str]]:
         """Autocomplete pour la nourriture et potions uniquement."""
-        player = self.data.get_player(interaction.user.id)
+        player = self.data.peek_player(interaction.user.id)
+        catalog = self.data.catalog
         choices = []
         
-        for item_id, qty in player.inventory.items():
-            item = self.data.get_item(item_id)
-            if item and item.category in ["Nourriture", "Potions"]:
-                if current.lower() in item.name.lower() or not current:
-                    display = f"{item.rarity.emoji} {item.name} (×{qty})"
-                    choices.append(app_commands.Choice(name=display[:100], value=item.name))
+        item_ids = catalog.item_names.complete(
+            current, owned=player.inventory,
+            accept=lambda item_id: catalog.items[item_id].category in ["Nourriture", "Potions"]
+        )
+        for item_id in item_ids:
+            item = catalog.items[item_id]
+            display = f"{item.rarity.emoji} {item.name} (×{player.inventory.get(item_id, 0)})"
+            choices.append(app_commands.Choice(name=display[:100], value=item.name))
         
-        return choices[:25]
+        return choices
 
     @app_commands.command(name="manger", description="🍖 Consomme de la nourriture ou une potion pour te soigner")
     @app_commands.describe(item="Nourriture ou potion à consommer")
@@ -428,14 +405,8 @@ class Inventory(commands.Cog):
         player = self.data.get_player(interaction.user.id)
         
         # Trouver l'item par nom
-        target_item = None
-        target_item_id = None
-        for item_id, qty in player.inventory.items():
-            found_item = self.data.get_item(item_id)
-            if found_item and found_item.name.lower() == item.lower():
-                target_item = found_item
-                target_item_id = item_id
-                break
+        target_item = self.data.find_item_by_name(item, owned=player.inventory)
+        target_item_id = target_item.item_id if target_item else None
         
         if not target_item:
             embed = self._error_embed(
@@ -479,9 +450,7 @@ class Inventory(commands.Cog):
         actual_heal = player.current_hp - old_hp
         
         # Retirer l'item de l'inventaire
-        player.inventory[target_item_id] -= 1
-        if player.inventory[target_item_id] <= 0:
-            del player.inventory[target_item_id]
+        player.remove_item(target_item_id, 1)
         
         # Sauvegarder
         self.data.save_player(player)
@@ -6,9 +6,8 @@ from discord import app_commands
 from discord.ext import commands
 from typing import List, Optional
 import asyncio
-import random
 
-from services import DataManager
+from services import DataManager, cached_autocomplete
 from utils import COLORS
 from utils.styles import (
     Colors, Emojis,
@@ -32,22 +31,22 @@ class Pets(commands.Cog):
     # 🔍 AUTOCOMPLETE FUNCTIONS
     # ───────────────────────────────────────────────────────────────
 
+    @cached_autocomplete()
     async def owned_pet_autocomplete(
         self, interaction: discord.Interaction, current: str
     ) -> List[app_commands.Choice[str]]:
         """Autocomplete pour les pets possédés."""
-        player = self.data.get_player(interaction.user.id)
+        player = self.data.peek_player(interaction.user.id)
+        catalog = self.data.catalog
         choices = []
         
-        for pet_id, qty in player.pets.items():
-            pet = self.data.get_pet(pet_id)
-            if pet:
-                if current.lower() in pet.name.lower() or not current:
-                    equipped = " ✓" if player.equipped_pet == pet_id else ""
-                    display = f"{pet.emoji} {pet.name} (+{pet.drop_bonus*100:.1f}%){equipped}"
-                    choices.append(app_commands.Choice(name=display[:100], value=pet.name))
+        for pet_id in catalog.pet_names.complete(current, owned=player.pets):
+            pet = catalog.pets[pet_id]
+            equipped = " ✓" if player.equipped_pet == pet_id else ""
+            display = f"{pet.emoji} {pet.name} (+{pet.drop_bonus*100:.1f}%){equipped}"
+            choices.append(app_commands.Choice(name=display[:100], value=pet.name))
         
-        return choices[:25]
+        return choices
 
     # ───────────────────────────────────────────────────────────────
     # 🥚 COMMANDE OEUF MODERNE
@@ -102,26 +101,8 @@ class Pets(commands.Cog):
         player.coins -= egg_cost
         player.eggs_opened += 1
         
-        # Sélection du pet
-        egg_rates = self.data.get_egg_drop_rates()
-        all_pets = self.data.get_all_pets()
-        
-        # Déterminer la rareté
-        rand = random.random()
-        cumulative = 0.0
-        selected_rarity = "NORMAL"
-        for rarity, rate in egg_rates.items():
-            cumulative += rate
-            if rand < cumulative:
-                selected_rarity = rarity
-                break
-        
-        # Filtrer les pets de cette rareté
-        pets_of_rarity = [p for p in all_pets if p.rarity.name == selected_rarity]
-        if pets_of_rarity:
-            pet = random.choice(pets_of_rarity)
-        else:
-            pet = random.choice(all_pets)
+        # Sélection du pet (rareté puis pet de cette rareté, en un seul tirage)
+        pet = self.data.draw_egg_pet(self.data.rng.player_stream("eggs", interaction.user.id))
         
         # Ajouter le pet au joueur
         is_new = pet.pet_id not in player.pets
@@ -272,20 +253,8 @@ class Pets(commands.Cog):
         
         player = self.data.get_player(interaction.user.id)
         
-        # Chercher le pet par nom
-        all_pets = self.data.get_all_pets()
-        target_pet = None
-        for pet in all_pets:
-            if pet.name.lower() == nom.lower():
-                target_pet = pet
-                break
-        
-        if not target_pet:
-            # Recherche partielle
-            for pet in all_pets:
-                if nom.lower() in pet.name.lower():
-                    target_pet = pet
-                    break
+        # Chercher le pet par nom (exact, puis partiel)
+        target_pet = self.data.get_pet_by_name(nom)
         
         if not target_pet:
             embed = self._error_embed(
@@ -54,19 +54,12 @@ class Profile(commands.Cog):
     async def profile(self, interaction: discord.Interaction, membre: Optional[discord.Member] = None):
         """Affiche le profil avec design ultra-moderne."""
         target = membre or interaction.user
-        player = self.data.get_player(target.id)
+        player = self.data.peek_player(target.id)
 
         # Calculs
         total_items = sum(player.inventory.values())
         unique_items = len(player.inventory)
-        inventory_value = 0
-        rarity_counts = {r: 0 for r in Rarity}
-        
-        for item_id, qty in player.inventory.items():
-            item = self.data.get_item(item_id)
-            if item:
-                inventory_value += item.value * qty
-                rarity_counts[item.rarity] += qty
+        inventory_value, rarity_counts = self.data.catalog.inventory_summary(player.inventory)
 
         total_wealth = player.coins + inventory_value
         rank_emoji, rank_name, rank_color = self._get_rank(total_wealth)
@@ -220,22 +213,23 @@ class Profile(commands.Cog):
     ])
     async def leaderboard(self, interaction: discord.Interaction, type: Optional[str] = "coins"):
         """Affiche le classement avec design moderne."""
+        await interaction.response.defer()
         
         # Déterminer le type de classement
         if type == "collection":
-            players = self.data.get_collection_leaderboard(10)
+            players = await self.data.get_collection_leaderboard(10)
             title = "📦 Top Collectionneurs"
             color = Colors.EPIC
         elif type == "level":
-            players = self.data.get_level_leaderboard(10) if hasattr(self.data, 'get_level_leaderboard') else []
+            players = await self.data.get_level_leaderboard(10)
             title = "⭐ Top Niveaux"
             color = Colors.PRIMARY
         elif type == "bosses":
-            players = self.data.get_boss_leaderboard(10) if hasattr(self.data, 'get_boss_leaderboard') else []
+            players = await self.data.get_boss_leaderboard(10)
             title = "👹 Top Chasseurs de Boss"
             color = Colors.DANGER
         else:
-            players = self.data.get_leaderboard(10)
+            players = await self.data.get_leaderboard(10)
             title = "💰 Top Richesse"
             color = Colors.LEGENDARY
 
@@ -253,7 +247,7 @@ class Profile(commands.Cog):
                 f"```\n"
                 f"💡 Sois le premier à jouer !"
             )
-            await interaction.response.send_message(embed=embed)
+            await interaction.followup.send(embed=embed)
             return
 
         # Header du classement
@@ -340,7 +334,7 @@ class Profile(commands.Cog):
             icon_url=self.bot.user.display_avatar.url
         )
 
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
 
     # ───────────────────────────────────────────────────────────────
     # 📊 COMMANDE STATISTIQUES GLOBALES
@@ -8,7 +8,7 @@ from typing import Optional, List
 from datetime import datetime
 import asyncio
 
-from services import DataManager
+from services import DataManager, cached_autocomplete
 from utils.styles import Colors, Emojis, format_number, create_rarity_indicator
 
 
@@ -64,21 +64,21 @@ class Trading(commands.Cog):
     # 🔍 AUTOCOMPLETE FUNCTIONS
     # ───────────────────────────────────────────────────────────────
 
+    @cached_autocomplete()
     async def own_item_autocomplete(
         self, interaction: discord.Interaction, current: str
     ) -> List[app_commands.Choice[str]]:
         """Autocomplete pour les items du joueur."""
-        player = self.data.get_player(interaction.user.id)
+        player = self.data.peek_player(interaction.user.id)
+        catalog = self.data.catalog
         choices = []
         
-        for item_id, qty in player.inventory.items():
-            item = self.data.get_item(item_id)
-            if item:
-                if current.lower() in item.name.lower() or not current:
-                    display = f"{item.rarity.emoji} {item.name} (×{qty})"
-                    choices.append(app_commands.Choice(name=display[:100], value=item.name))
+        for item_id in catalog.item_names.complete(current, owned=player.inventory):
+            item = catalog.items[item_id]
+            display = f"{item.rarity.emoji} {item.name} (×{player.inventory.get(item_id, 0)})"
+            choices.append(app_commands.Choice(name=display[:100], value=item.name))
         
-        return choices[:25]
+        return choices
 
     # ───────────────────────────────────────────────────────────────
     # 🔄 COMMANDE TRADE MODERNE
@@ -125,12 +125,7 @@ class Trading(commands.Cog):
         target_player = self.data.get_player(joueur.id)
 
         # Vérifier l'objet donné
-        given_item = None
-        for item_id in player.inventory:
-            item = self.data.get_item(item_id)
-            if item and item.name.lower() == ton_objet.lower():
-                given_item = item
-                break
+        given_item = self.data.find_item_by_name(ton_objet, owned=player.inventory)
 
         if not given_item:
             await interaction.response.send_message(
@@ -149,11 +144,7 @@ class Trading(commands.Cog):
         # Vérifier l'objet demandé (si spécifié)
         requested_item = None
         if objet_demande:
-            for item_id in target_player.inventory:
-                item = self.data.get_item(item_id)
-                if item and item.name.lower() == objet_demande.lower():
-                    requested_item = item
-                    break
+            requested_item = self.data.find_item_by_name(objet_demande, owned=target_player.inventory)
 
             if not requested_item:
                 await interaction.response.send_message(
@@ -398,12 +389,7 @@ class Trading(commands.Cog):
         target = self.data.get_player(joueur.id)
 
         # Vérifier l'objet
-        item = None
-        for item_id in player.inventory:
-            potential = self.data.get_item(item_id)
-            if potential and potential.name.lower() == objet.lower():
-                item = potential
-                break
+        item = self.data.find_item_by_name(objet, owned=player.inventory)
 
         if not item:
             await interaction.response.send_message(
@@ -1,10 +1,11 @@
 # Models module for the economy bot
 from .item import Item, Rarity, Pet, EquipmentSet
 from .player import Player
+from .containers import CountMap, ArrayCountMap, EquipmentSlots
 from .chest import Chest
-from .combat import Boss, BossAttack, BossDifficulty, Skill, SkillType, CombatState
+from .combat import BossTemplate, BossInstance, BossAttack, BossDifficulty, Skill, SkillType, CombatState
 
 __all__ = [
-    'Item', 'Rarity', 'Player', 'Chest', 'Pet', 'EquipmentSet',
-    'Boss', 'BossAttack', 'BossDifficulty', 'Skill', 'SkillType', 'CombatState'
+    'Item', 'Rarity', 'Player', 'CountMap', 'ArrayCountMap', 'EquipmentSlots', 'Chest', 'Pet', 'EquipmentSet',
+    'BossTemplate', 'BossInstance', 'BossAttack', 'BossDifficulty', 'Skill', 'SkillType', 'CombatState'
 ]
@@ -2,9 +2,24 @@
 Module gérant le système de coffres et le tirage d'objets.
 """
 import random
-from typing import List, Optional
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
 
 from models.item import Item, Rarity
+from models.sampling import AliasSampler, BonusSamplerCache
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel : tirage groupé en pur Python
+    np = None
+
+
+# Ordre du tirage : du plus rare au moins rare, Normal prend le reste
+_ROLL_ORDER = (Rarity.MYTHIC, Rarity.LEGENDARY, Rarity.EPIC, Rarity.RARE)
+# Poids du bonus de drop par rareté : le bonus augmente les chances des raretés supérieures
+_BONUS_WEIGHTS = {Rarity.MYTHIC: 2, Rarity.LEGENDARY: 1.5, Rarity.EPIC: 1, Rarity.RARE: 0.5}
+# En dessous, le surcoût d'appel de NumPy dépasse le gain (tirage pur Python)
+NUMPY_MIN_CHESTS = 256
 
 
 class Chest:
@@ -19,6 +34,15 @@ class Chest:
         """
         self.items = items
         self._items_by_rarity = self._organize_by_rarity()
+        # Objets tirables par rareté (repli sur Normal si une rareté est vide)
+        fallback = self._items_by_rarity.get(Rarity.NORMAL, [])
+        self._pools: Dict[Rarity, List[Item]] = {
+            rarity: self._items_by_rarity[rarity] or fallback for rarity in Rarity
+        }
+        # Tables de probabilités déjà calculées, par bonus de drop
+        self._rarity_tables: Dict[float, Tuple[Tuple[Rarity, float], ...]] = {}
+        # Tirage d'un objet en O(1) : une table d'alias par bonus de drop
+        self._samplers: BonusSamplerCache[Item] = BonusSamplerCache(self._build_sampler)
 
     def _organize_by_rarity(self) -> dict:
         """Organise les objets par rareté pour un tirage plus efficace."""
@@ -27,59 +51,101 @@ class Chest:
             organized[item.rarity].append(item)
         return organized
 
-    def open(self, drop_bonus: float = 0.0) -> Optional[Item]:
+    def open(self, drop_bonus: float = 0.0, rng: random.Random = random) -> Optional[Item]:
         """
         Ouvre un coffre et retourne un objet aléatoire selon les taux de drop.
         
         Args:
             drop_bonus: Bonus de taux de drop (ex: 0.05 = +5% sur les raretés supérieures)
+            rng: Flux aléatoire (voir RngService), le module random par défaut
         
         Returns:
             L'objet obtenu ou None si erreur
         """
-        # Déterminer la rareté avec le bonus
-        rarity = self._roll_rarity(drop_bonus)
-        
-        # Sélectionner un objet aléatoire de cette rareté
-        items_of_rarity = self._items_by_rarity.get(rarity, [])
-        if not items_of_rarity:
-            # Fallback sur Normal si pas d'items de cette rareté
-            items_of_rarity = self._items_by_rarity.get(Rarity.NORMAL, [])
-        
-        if items_of_rarity:
-            return random.choice(items_of_rarity)
-        return None
+        # Rareté puis objet de cette rareté (ou Normal si elle est vide), en un seul tirage
+        sampler = self._samplers.get(drop_bonus)
+        if sampler is None:
+            return None
+        return sampler.sample(rng)
 
-    def _roll_rarity(self, drop_bonus: float = 0.0) -> Rarity:
+    def open_many(self, count: int, drop_bonus: float = 0.0, rng: random.Random = random) -> Dict[str, int]:
         """
-        Effectue le tirage de rareté basé sur les probabilités.
-        Le bonus augmente les chances des raretés supérieures.
+        Ouvre plusieurs coffres d'un coup, mêmes taux que open().
+        Les raretés sont tirées en un seul échantillon multinomial puis les
+        objets en un seul tirage groupé (NumPy si disponible, à partir de
+        NUMPY_MIN_CHESTS coffres).
         
         Args:
-            drop_bonus: Bonus appliqué aux raretés rares+
+            count: Nombre de coffres à ouvrir
+            drop_bonus: Bonus de taux de drop
+            rng: Flux aléatoire (le tirage NumPy est amorcé depuis ce flux)
         
         Returns:
-            La rareté tirée
+            Les quantités obtenues par item_id
         """
-        roll = random.random()  # Entre 0 et 1
-        cumulative = 0.0
-        
-        # Ordre du plus rare au moins rare pour le tirage
-        # Le bonus augmente les chances des raretés supérieures
-        rarities_data = [
-            (Rarity.MYTHIC, Rarity.MYTHIC.drop_rate * (1 + drop_bonus * 2)),     
-            (Rarity.LEGENDARY, Rarity.LEGENDARY.drop_rate * (1 + drop_bonus * 1.5)),
-            (Rarity.EPIC, Rarity.EPIC.drop_rate * (1 + drop_bonus)),
-            (Rarity.RARE, Rarity.RARE.drop_rate * (1 + drop_bonus * 0.5)),
-            (Rarity.NORMAL, 1.0)  # Le reste va à Normal
-        ]
+        if count <= 0:
+            return {}
+        table = self._rarity_table(drop_bonus)
+        pools = [self._pools[rarity] for rarity, _ in table]
+        if np is not None and count >= NUMPY_MIN_CHESTS:
+            return self._open_many_numpy(count, table, pools, np.random.default_rng(rng.getrandbits(64)))
         
-        for rarity, rate in rarities_data[:-1]:  # Exclure Normal du calcul
-            cumulative += rate
-            if roll < cumulative:
-                return rarity
-        
-        return Rarity.NORMAL  # Fallback
+        sampler = self._samplers.get(drop_bonus)
+        if sampler is None:
+            return {}
+        return dict(Counter(item.item_id for item in sampler.sample_many(count, rng)))
+
+    def _open_many_numpy(self, count: int, table, pools: List[List[Item]], rng) -> Dict[str, int]:
+        probabilities = np.array([p for _, p in table])
+        per_rarity = rng.multinomial(count, probabilities / probabilities.sum())
+        sizes = np.array([len(pool) for pool in pools])
+        # Les raretés sans objet (même en repli) ne donnent rien
+        per_rarity[sizes == 0] = 0
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        # Un seul tirage : chaque coffre choisit un index dans le pool de sa rareté
+        picks = rng.integers(0, np.repeat(sizes, per_rarity))
+        flat = np.repeat(offsets, per_rarity) + picks
+        totals = np.bincount(flat, minlength=int(sizes.sum()))
+        candidates = [item for pool in pools for item in pool]
+        results: Dict[str, int] = {}
+        for position in np.flatnonzero(totals):
+            item_id = candidates[position].item_id
+            results[item_id] = results.get(item_id, 0) + int(totals[position])
+        return results
+
+    def _build_sampler(self, drop_bonus: float) -> Optional[AliasSampler[Item]]:
+        """Distribution des objets pour un bonus : probabilité de la rareté répartie sur son pool."""
+        weights: Dict[int, float] = {}
+        items: Dict[int, Item] = {}
+        for rarity, probability in self._rarity_table(drop_bonus):
+            pool = self._pools[rarity]
+            for item in pool:
+                items[id(item)] = item
+                weights[id(item)] = weights.get(id(item), 0.0) + probability / len(pool)
+        if not items or sum(weights.values()) <= 0:
+            return None
+        return AliasSampler(list(items.values()), list(weights.values()))
+
+    def _rarity_table(self, drop_bonus: float) -> Tuple[Tuple[Rarity, float], ...]:
+        """
+        Probabilités effectives de chaque rareté pour un bonus de drop,
+        dans l'ordre du tirage (Normal en dernier avec le reste).
+        """
+        table = self._rarity_tables.get(drop_bonus)
+        if table is None:
+            entries = []
+            remaining = 1.0
+            for rarity in _ROLL_ORDER:
+                rate = rarity.drop_rate * (1 + drop_bonus * _BONUS_WEIGHTS[rarity])
+                probability = min(rate, remaining)
+                entries.append((rarity, probability))
+                remaining -= probability
+            entries.append((Rarity.NORMAL, remaining))
+            table = tuple(entries)
+            if len(self._rarity_tables) >= 256:  # Bonus très variés : on repart de zéro
+                self._rarity_tables.clear()
+            self._rarity_tables[drop_bonus] = table
+        return table
 
     def get_drop_rates_display(self) -> str:
         """Retourne un affichage formaté des taux de drop."""
@@ -1,10 +1,42 @@
 """
 Module définissant les boss et le système de combat.
 """
+import random
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from enum import Enum
 
+from .sampling import AliasSampler
+
+
+# ==================== FORMULES DE DÉGÂTS ====================
+# Écrites pour des entiers comme pour des tableaux NumPy : le combat et le
+# simulateur d'équilibrage (services.boss_sim) utilisent les mêmes formules.
+
+BOSS_DEFENSE_DIVISOR = 3  # Dégâts subis par un boss : dégâts - défense // 3
+PLAYER_DEFENSE_DIVISOR = 2  # Dégâts subis par un joueur : dégâts - défense // 2
+BUFF_BOOST_PER_TURN = 0.5  # Un buff ajoute 50% de la stat par tour restant
+
+
+def _truncate(value):
+    return value.astype("int64") if hasattr(value, "astype") else int(value)
+
+
+def skill_damage(base_power, attack, level_bonus):
+    """Dégâts bruts d'une compétence (level_bonus : niveau // 5)."""
+    return _truncate((base_power + attack) * (1 + level_bonus * 0.1))
+
+
+def mitigated_damage(damage, defense, divisor):
+    """Dégâts réduits par la défense, au moins 1."""
+    reduced = damage - defense // divisor
+    return reduced.clip(min=1) if hasattr(reduced, "clip") else max(1, reduced)
+
+
+def boosted_stat(stat, buff_turns):
+    """Stat augmentée par un buff actif depuis buff_turns tours restants."""
+    return stat + _truncate(stat * (buff_turns * BUFF_BOOST_PER_TURN))
+
 
 class BossDifficulty(Enum):
     """Difficulté des boss."""
@@ -78,7 +110,7 @@ class Skill:
     
     def calculate_damage(self, attacker_attack: int, level_bonus: int = 0) -> int:
         """Calcule les dégâts de la compétence."""
-        return int((self.base_power + attacker_attack) * (1 + level_bonus * 0.1))
+        return skill_damage(self.base_power, attacker_attack, level_bonus)
     
     def to_dict(self) -> dict:
         return {
@@ -136,9 +168,13 @@ class BossAttack:
     effect_value: float = 0.0
 
 
-@dataclass
-class Boss:
-    """Représente un boss à combattre."""
+@dataclass(frozen=True, slots=True)
+class BossTemplate:
+    """
+    Définition d'un boss chargée depuis le catalogue (stats, attaques, butin).
+    Immuable et partagée par tous les combats : l'état d'un combat est
+    porté par un BossInstance (voir spawn).
+    """
     boss_id: str
     name: str
     description: str
@@ -156,72 +192,42 @@ class Boss:
     level_required: int
     
     # Attaques du boss
-    attacks: List[BossAttack] = field(default_factory=list)
+    attacks: Tuple[BossAttack, ...] = ()
     
     # Récompenses
     xp_reward: int = 100
     coins_reward: int = 1000
-    drop_items: Dict[str, float] = field(default_factory=dict)  # item_id -> drop_chance
-    guaranteed_drops: List[str] = field(default_factory=list)  # items garantis
+    drop_items: Dict[str, float] = field(default_factory=dict)  # item_id -> drop_chance (lecture seule)
+    guaranteed_drops: Tuple[str, ...] = ()  # items garantis
     
-    # Combat actuel
-    current_hp: int = 0
+    # Tirage des attaques, précalculé (voir choose_attack)
+    _attack_sampler: AliasSampler = field(init=False, repr=False, compare=False)
     
     def __post_init__(self):
-        if self.current_hp == 0:
-            self.current_hp = self.max_hp
-    
-    def reset_hp(self) -> None:
-        """Réinitialise les HP du boss."""
-        self.current_hp = self.max_hp
-    
-    def take_damage(self, damage: int) -> int:
-        """Inflige des dégâts au boss. Retourne les dégâts réels."""
-        actual_damage = max(1, damage - self.defense // 3)
-        self.current_hp = max(0, self.current_hp - actual_damage)
-        return actual_damage
+        object.__setattr__(self, "_attack_sampler", AliasSampler(*self.attack_distribution()))
     
-    def is_alive(self) -> bool:
-        """Vérifie si le boss est en vie."""
-        return self.current_hp > 0
-    
-    def get_hp_bar(self, length: int = 20) -> str:
-        """Génère une barre de vie visuelle."""
-        ratio = self.current_hp / self.max_hp
-        filled = int(ratio * length)
-        empty = length - filled
-        
-        if ratio > 0.5:
-            bar_char = "🟩"
-        elif ratio > 0.25:
-            bar_char = "🟨"
-        else:
-            bar_char = "🟥"
-        
-        return bar_char * filled + "⬛" * empty
-    
-    def choose_attack(self) -> BossAttack:
-        """Choisit une attaque aléatoire selon les probabilités."""
-        import random
-        
-        if not self.attacks:
-            return BossAttack(
+    def attack_distribution(self) -> Tuple[Tuple[BossAttack, ...], List[float]]:
+        """Attaques tirables et leurs poids (attaque de base si le boss n'en a aucune)."""
+        attacks = self.attacks
+        if not attacks:
+            attacks = (BossAttack(
                 name="Attaque de base",
                 emoji="👊",
                 damage=self.attack,
                 description="Une attaque normale"
-            )
-        
-        total = sum(a.chance for a in self.attacks)
-        rand = random.uniform(0, total)
-        
-        cumulative = 0
-        for attack in self.attacks:
-            cumulative += attack.chance
-            if rand <= cumulative:
-                return attack
-        
-        return self.attacks[0]
+            ),)
+        weights = [max(0.0, a.chance) for a in attacks]
+        if sum(weights) <= 0:
+            weights = [1.0] + [0.0] * (len(attacks) - 1)  # Aucune chance : première attaque
+        return attacks, weights
+    
+    def spawn(self) -> "BossInstance":
+        """Crée l'état d'un nouveau combat contre ce boss, PV au maximum."""
+        return BossInstance(self, self.max_hp)
+    
+    def choose_attack(self, rng: random.Random = random) -> BossAttack:
+        """Choisit une attaque aléatoire selon les probabilités (tirage en O(1) dans rng)."""
+        return self._attack_sampler.sample(rng)
     
     def to_dict(self) -> dict:
         return {
@@ -249,13 +255,13 @@ class Boss:
             ],
             "xp_reward": self.xp_reward,
             "coins_reward": self.coins_reward,
-            "drop_items": self.drop_items,
-            "guaranteed_drops": self.guaranteed_drops
+            "drop_items": dict(self.drop_items),
+            "guaranteed_drops": list(self.guaranteed_drops)
         }
     
     @classmethod
-    def from_dict(cls, data: dict) -> "Boss":
-        attacks = [
+    def from_dict(cls, data: dict) -> "BossTemplate":
+        attacks = tuple(
             BossAttack(
                 name=a["name"],
                 emoji=a.get("emoji", "⚔️"),
@@ -265,7 +271,7 @@ class Boss:
                 special_effect=a.get("special_effect"),
                 effect_value=a.get("effect_value", 0.0)
             ) for a in data.get("attacks", [])
-        ]
+        )
         
         return cls(
             boss_id=data["boss_id"],
@@ -282,21 +288,67 @@ class Boss:
             attacks=attacks,
             xp_reward=data.get("xp_reward", 100),
             coins_reward=data.get("coins_reward", 1000),
-            drop_items=data.get("drop_items", {}),
-            guaranteed_drops=data.get("guaranteed_drops", [])
+            drop_items=dict(data.get("drop_items", {})),
+            guaranteed_drops=tuple(data.get("guaranteed_drops", []))
         )
 
 
+@dataclass(slots=True)
+class BossInstance:
+    """
+    Boss en cours de combat : seulement l'état propre au combat (PV actuels).
+    Les autres attributs (name, attack, drop_items...) sont lus sur le template.
+    """
+    template: BossTemplate
+    current_hp: int
+    
+    def __getattr__(self, name: str):
+        # Appelé seulement pour les attributs absents de l'instance
+        if name == "template":
+            raise AttributeError(name)
+        return getattr(self.template, name)
+    
+    def reset_hp(self) -> None:
+        """Réinitialise les HP du boss."""
+        self.current_hp = self.template.max_hp
+    
+    def take_damage(self, damage: int) -> int:
+        """Inflige des dégâts au boss. Retourne les dégâts réels."""
+        actual_damage = mitigated_damage(damage, self.template.defense, BOSS_DEFENSE_DIVISOR)
+        self.current_hp = max(0, self.current_hp - actual_damage)
+        return actual_damage
+    
+    def is_alive(self) -> bool:
+        """Vérifie si le boss est en vie."""
+        return self.current_hp > 0
+    
+    def get_hp_bar(self, length: int = 20) -> str:
+        """Génère une barre de vie visuelle."""
+        ratio = self.current_hp / self.template.max_hp
+        filled = int(ratio * length)
+        empty = length - filled
+        
+        if ratio > 0.5:
+            bar_char = "🟩"
+        elif ratio > 0.25:
+            bar_char = "🟨"
+        else:
+            bar_char = "🟥"
+        
+        return bar_char * filled + "⬛" * empty
+
+
 @dataclass
 class CombatState:
     """État d'un combat en cours."""
     player_id: int
-    boss: Boss
+    boss: BossInstance
     turn: int = 1
     player_hp: int = 0
     player_max_hp: int = 0
     player_attack: int = 0
     player_defense: int = 0
+    player_level: int = 1  # Bonus de dégâts des skills (niveau // 5)
     
     # Effets actifs
     player_buffs: Dict[str, int] = field(default_factory=dict)  # buff -> tours restants
@@ -309,6 +361,52 @@ class CombatState:
     # Logs du combat
     combat_log: List[str] = field(default_factory=list)
     
+    # Graine du combat : chaque tour tire dans un flux dérivé de (graine, tour),
+    # voir services.combat_engine.turn_stream
+    seed: int = field(default_factory=lambda: random.getrandbits(64))
+    
+    def to_dict(self) -> dict:
+        """État sérialisable du combat."""
+        return {
+            "player_id": self.player_id,
+            "seed": self.seed,
+            "boss_id": self.boss.boss_id,
+            "boss_hp": self.boss.current_hp,
+            "turn": self.turn,
+            "player_hp": self.player_hp,
+            "player_max_hp": self.player_max_hp,
+            "player_attack": self.player_attack,
+            "player_defense": self.player_defense,
+            "player_level": self.player_level,
+            "player_buffs": self.player_buffs,
+            "boss_debuffs": self.boss_debuffs,
+            "player_dots": self.player_dots,
+            "skill_cooldowns": self.skill_cooldowns,
+            "combat_log": self.combat_log
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict, boss: BossTemplate) -> "CombatState":
+        """Recrée un combat ; boss est le template correspondant à data["boss_id"]."""
+        instance = boss.spawn()
+        instance.current_hp = data["boss_hp"]
+        return cls(
+            player_id=data["player_id"],
+            seed=data["seed"],
+            boss=instance,
+            turn=data.get("turn", 1),
+            player_hp=data["player_hp"],
+            player_max_hp=data["player_max_hp"],
+            player_attack=data["player_attack"],
+            player_defense=data["player_defense"],
+            player_level=data.get("player_level", 1),
+            player_buffs=dict(data.get("player_buffs", {})),
+            boss_debuffs=dict(data.get("boss_debuffs", {})),
+            player_dots=[tuple(dot) for dot in data.get("player_dots", [])],
+            skill_cooldowns=dict(data.get("skill_cooldowns", {})),
+            combat_log=list(data.get("combat_log", []))
+        )
+    
     def add_log(self, message: str) -> None:
         """Ajoute un message au log."""
         self.combat_log.append(f"**Tour {self.turn}**: {message}")
@@ -0,0 +1,352 @@
+"""
+Conteneurs compacts des données joueur.
+Les identifiants du catalogue (item_id, pet_id, skill_id, boss_id) sont
+internés en petits entiers partagés par tous les joueurs ; les conteneurs
+stockent ces entiers mais s'utilisent comme des dicts indexés par chaîne.
+"""
+import sys
+import threading
+from array import array
+from collections.abc import ItemsView, KeysView, MutableMapping, ValuesView
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class IdInterner:
+    """Table chaîne <-> entier, en ajout seul, partagée par tout le processus."""
+
+    __slots__ = ("name", "names", "_index", "_lock")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def intern(self, name: str) -> int:
+        """Retourne l'entier associé à un identifiant (en le créant si besoin)."""
+        index = self._index.get(name)
+        if index is None:
+            with self._lock:
+                index = self._index.get(name)
+                if index is None:
+                    index = len(self.names)
+                    self.names.append(sys.intern(name))
+                    self._index[self.names[index]] = index
+        return index
+
+    def lookup(self, name) -> Optional[int]:
+        """Retourne l'entier d'un identifiant déjà connu, sans rien créer."""
+        return self._index.get(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # Les tables sont uniques : copier ou sérialiser une référence ne les duplique pas
+    def __reduce__(self):
+        return (_get_interner, (self.name,))
+
+    def __copy__(self) -> "IdInterner":
+        return self
+
+    def __deepcopy__(self, memo) -> "IdInterner":
+        return self
+
+
+# Une table par espace d'identifiants du catalogue
+ITEM_IDS = IdInterner("items")
+PET_IDS = IdInterner("pets")
+SKILL_IDS = IdInterner("skills")
+BOSS_IDS = IdInterner("bosses")
+_INTERNERS = {interner.name: interner for interner in (ITEM_IDS, PET_IDS, SKILL_IDS, BOSS_IDS)}
+
+
+def _get_interner(name: str) -> IdInterner:
+    return _INTERNERS[name]
+
+
+class CountMap(MutableMapping):
+    """
+    Dict identifiant -> entier (quantité, niveau, kills) stocké en int -> int.
+    Se comporte comme un dict[str, int] : mêmes clés, mêmes valeurs, même ordre.
+    """
+
+    __slots__ = ("_ids", "_counts")
+
+    def __init__(self, ids: IdInterner, data: Optional[Iterable] = None):
+        self._ids = ids
+        self._counts: Dict[int, int] = {}
+        if data:
+            pairs = data.items() if hasattr(data, "items") else data
+            intern = ids.intern
+            for key, value in pairs:
+                self._counts[intern(key)] = value
+
+    def __getitem__(self, key: str) -> int:
+        index = self._ids.lookup(key)
+        if index is None:
+            raise KeyError(key)
+        return self._counts[index]
+
+    def __setitem__(self, key: str, value: int) -> None:
+        self._counts[self._ids.intern(key)] = value
+
+    def __delitem__(self, key: str) -> None:
+        index = self._ids.lookup(key)
+        if index is None:
+            raise KeyError(key)
+        del self._counts[index]
+
+    def __contains__(self, key) -> bool:
+        index = self._ids.lookup(key)
+        return index is not None and index in self._counts
+
+    def get(self, key, default=None):
+        index = self._ids.lookup(key)
+        if index is None:
+            return default
+        return self._counts.get(index, default)
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self._ids.names.__getitem__, self._counts)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def keys(self) -> KeysView:
+        return KeysView(self)
+
+    def items(self) -> ItemsView:
+        return _CountItemsView(self)
+
+    def values(self) -> ValuesView:
+        return _CountValuesView(self)
+
+    def clear(self) -> None:
+        self._counts.clear()
+
+    def __repr__(self) -> str:
+        return f"CountMap({dict(self.items())!r})"
+
+    def __reduce__(self):
+        # Sérialisé avec les identifiants en chaînes : les entiers sont propres au processus
+        return (self.__class__, (self._ids, dict(self.items())))
+
+
+class _CountItemsView(ItemsView):
+    """Vue (clé, valeur) parcourant directement le stockage interne."""
+
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        names = self._mapping._ids.names
+        for index, value in self._mapping._counts.items():
+            yield names[index], value
+
+
+class _CountValuesView(ValuesView):
+    """Vue des valeurs parcourant directement le stockage interne."""
+
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._mapping._counts.values())
+
+
+class ArrayCountMap(MutableMapping):
+    """
+    Inventaire item_id -> quantité stocké dans un tableau de compteurs indexé
+    par l'index dense des objets (celui de ITEM_IDS). Une quantité nulle
+    équivaut à une absence. Permet des passes vectorisées sur l'inventaire
+    (voir Catalog.inventory_summary) ; plus gros qu'un CountMap pour les
+    petits inventaires, d'où son usage optionnel.
+
+    Comme un dict (et CountMap), l'itération suit l'ordre d'insertion des
+    objets : _order garde les index denses dans l'ordre où leur compteur
+    est devenu non nul. Un retrait ne touche pas _order (O(1)) : l'entrée
+    périmée est écartée au prochain compactage, fait avant une itération
+    ou quand les entrées périmées deviennent majoritaires.
+    """
+
+    __slots__ = ("_counts", "_order", "_size", "_stale")
+
+    def __init__(self, data: Optional[Iterable] = None):
+        self._counts = array("q")
+        self._order = array("i")
+        self._size = 0  # Nombre de compteurs non nuls
+        self._stale = 0  # Entrées périmées dans _order
+        if data:
+            pairs = data.items() if hasattr(data, "items") else data
+            for key, value in pairs:
+                self[key] = value
+
+    @property
+    def counts(self) -> array:
+        """Tableau brut des compteurs (peut être plus court que l'index des objets)."""
+        return self._counts
+
+    def _position(self, key) -> Optional[int]:
+        index = ITEM_IDS.lookup(key)
+        if index is None or index >= len(self._counts) or not self._counts[index]:
+            return None
+        return index
+
+    def __getitem__(self, key: str) -> int:
+        index = self._position(key)
+        if index is None:
+            raise KeyError(key)
+        return self._counts[index]
+
+    def __setitem__(self, key: str, value: int) -> None:
+        index = ITEM_IDS.intern(key)
+        counts = self._counts
+        if index >= len(counts):
+            if not value:
+                return
+            # Agrandi jusqu'à la taille actuelle de l'index (zéros)
+            counts.frombytes(bytes(counts.itemsize * (len(ITEM_IDS) - len(counts))))
+        if not counts[index] and value:
+            self._order.append(index)
+            self._size += 1
+        elif counts[index] and not value:
+            self._forget()
+        counts[index] = value
+
+    def __delitem__(self, key: str) -> None:
+        index = self._position(key)
+        if index is None:
+            raise KeyError(key)
+        self._counts[index] = 0
+        self._forget()
+
+    def _forget(self) -> None:
+        """Compte un retrait ; compacte _order quand il contient surtout des entrées périmées."""
+        self._size -= 1
+        self._stale += 1
+        if self._stale > max(16, self._size):
+            self._compact()
+
+    def _compact(self) -> None:
+        """
+        Retire de _order les entrées périmées : compteur nul, ou objet
+        retiré puis remis (seule sa dernière insertion compte).
+        """
+        if not self._stale:
+            return
+        counts, seen, kept = self._counts, set(), []
+        for index in reversed(self._order):
+            if counts[index] and index not in seen:
+                seen.add(index)
+                kept.append(index)
+        kept.reverse()
+        self._order = array("i", kept)
+        self._stale = 0
+
+    def _ordered(self) -> array:
+        """Index denses des compteurs non nuls, dans l'ordre d'insertion."""
+        self._compact()
+        return self._order
+
+    def __contains__(self, key) -> bool:
+        return self._position(key) is not None
+
+    def get(self, key, default=None):
+        index = self._position(key)
+        return default if index is None else self._counts[index]
+
+    def __iter__(self) -> Iterator[str]:
+        names = ITEM_IDS.names
+        return (names[index] for index in self._ordered())
+
+    def __len__(self) -> int:
+        return self._size
+
+    def items(self) -> ItemsView:
+        return _ArrayItemsView(self)
+
+    def values(self) -> ValuesView:
+        return _ArrayValuesView(self)
+
+    def clear(self) -> None:
+        self._counts = array("q")
+        self._order = array("i")
+        self._size = 0
+        self._stale = 0
+
+    def __repr__(self) -> str:
+        return f"ArrayCountMap({dict(self.items())!r})"
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self.items()),))
+
+
+class _ArrayItemsView(ItemsView):
+    """Vue (clé, valeur) des compteurs non nuls, dans l'ordre d'insertion."""
+
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        names, counts = ITEM_IDS.names, self._mapping._counts
+        for index in self._mapping._ordered():
+            yield names[index], counts[index]
+
+
+class _ArrayValuesView(ValuesView):
+    """Vue des compteurs non nuls, dans l'ordre d'insertion."""
+
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator[int]:
+        counts = self._mapping._counts
+        return (counts[index] for index in self._mapping._ordered())
+
+
+# Emplacements d'équipement, dans l'ordre du format sauvegardé
+EQUIPMENT_SLOTS = ("HELMET", "CHESTPLATE", "LEGGINGS", "BOOTS", "WEAPON", "ACCESSORY")
+_SLOT_INDEX = {slot: index for index, slot in enumerate(EQUIPMENT_SLOTS)}
+
+
+class EquipmentSlots(MutableMapping):
+    """
+    Équipement d'un joueur : tableau fixe de six emplacements contenant
+    l'item interné (ou None). S'utilise comme le dict slot -> item_id.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, data: Optional[dict] = None):
+        self._items: List[Optional[int]] = [None] * len(EQUIPMENT_SLOTS)
+        if data:
+            for slot, item_id in data.items():
+                # Les emplacements inconnus sont ignorés
+                if slot in _SLOT_INDEX:
+                    self[slot] = item_id
+
+    def __getitem__(self, slot: str) -> Optional[str]:
+        index = self._items[_SLOT_INDEX[slot]]
+        return None if index is None else ITEM_IDS.names[index]
+
+    def __setitem__(self, slot: str, item_id: Optional[str]) -> None:
+        position = _SLOT_INDEX[slot]
+        self._items[position] = None if item_id is None else ITEM_IDS.intern(item_id)
+
+    def __delitem__(self, slot: str) -> None:
+        raise TypeError("Les emplacements d'équipement sont fixes, utilise None pour vider")
+
+    def __contains__(self, slot) -> bool:
+        return slot in _SLOT_INDEX
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(EQUIPMENT_SLOTS)
+
+    def __len__(self) -> int:
+        return len(EQUIPMENT_SLOTS)
+
+    def fingerprint(self) -> Tuple[Optional[int], ...]:
+        """Empreinte hashable de l'équipement (items internés, par slot)."""
+        return tuple(self._items)
+
+    def __repr__(self) -> str:
+        return f"EquipmentSlots({dict(self.items())!r})"
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self.items()),))
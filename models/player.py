@@ -3,34 +3,46 @@ Module définissant les joueurs et leur inventaire.
 """
 from dataclasses import dataclass, field
 from datetime import datetime, date
-from typing import Dict, Optional, List
+from itertools import count
+from typing import Dict, Optional, List, Mapping
 
+from .containers import (
+    ArrayCountMap, CountMap, EquipmentSlots, ITEM_IDS, PET_IDS, SKILL_IDS, BOSS_IDS
+)
+from .stats import default_item_stats
+from .combat import PLAYER_DEFENSE_DIVISOR, mitigated_damage
 
-@dataclass
+# Source commune des versions : deux instances (ex. un joueur rechargé
+# après éviction) n'ont jamais la même version
+_VERSIONS = count(1)
+
+
+@dataclass(slots=True, weakref_slot=True)
 class Player:
-    """Représente un joueur avec son inventaire et ses statistiques."""
+    """
+    Représente un joueur avec son inventaire et ses statistiques.
+    Représentation compacte : pas de __dict__, identifiants internés en
+    entiers (CountMap) et équipement en tableau fixe (EquipmentSlots).
+    Des dicts classiques passés au constructeur sont convertis.
+    L'inventaire peut aussi être un ArrayCountMap (voir from_dict).
+    `version` change à chaque modification passant par les méthodes
+    (objets, pets, équipement, compétences, niveau) : voir touch().
+    """
     user_id: int
     coins: int = 0
-    inventory: Dict[str, int] = field(default_factory=dict)  # item_id -> quantité
+    inventory: CountMap = field(default_factory=lambda: CountMap(ITEM_IDS))  # item_id -> quantité
     daily_chests_opened: int = 0
     last_chest_date: str = ""
     total_chests_opened: int = 0
     total_items_sold: int = 0
     
     # Système de pets
-    pets: Dict[str, int] = field(default_factory=dict)  # pet_id -> quantité
+    pets: CountMap = field(default_factory=lambda: CountMap(PET_IDS))  # pet_id -> quantité
     equipped_pet: Optional[str] = None  # pet_id équipé
     eggs_opened: int = 0  # Total d'oeufs ouverts
     
     # Système d'équipement
-    equipment: Dict[str, Optional[str]] = field(default_factory=lambda: {
-        "HELMET": None,
-        "CHESTPLATE": None,
-        "LEGGINGS": None,
-        "BOOTS": None,
-        "WEAPON": None,
-        "ACCESSORY": None
-    })
+    equipment: EquipmentSlots = field(default_factory=EquipmentSlots)  # slot -> item_id
     
     # ═══════════════════════════════════════════════════════════
     # 📊 SYSTÈME DE NIVEAU ET COMBAT
@@ -49,21 +61,49 @@ class Player:
     current_hp: int = 100
     
     # Compétences débloquées (skill_id -> niveau)
-    skills: Dict[str, int] = field(default_factory=dict)
+    skills: CountMap = field(default_factory=lambda: CountMap(SKILL_IDS))
     equipped_skills: List[str] = field(default_factory=list)  # Max 4 skills
     
     # Stats de boss
     bosses_defeated: int = 0
-    bosses_kills: Dict[str, int] = field(default_factory=dict)  # boss_id -> kills
+    bosses_kills: CountMap = field(default_factory=lambda: CountMap(BOSS_IDS))  # boss_id -> kills
     last_boss_fight: str = ""  # Date du dernier combat
     
     # Skill points disponibles
     skill_points: int = 0
 
+    # Stats d'équipement calculées par update_equipment_stats (non sauvegardées, partagées : lecture seule)
+    _equipment_stats_cache: Optional[Dict[str, float]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Version du contenu (non sauvegardée), sert de clé aux caches dérivés
+    version: int = field(default=0, init=False, repr=False, compare=False)
+
     # Constantes de jeu
     MAX_DAILY_CHESTS = 50
     CHEST_COST = 3500  # Coût pour ouvrir un coffre supplémentaire
 
+    def __post_init__(self) -> None:
+        """Convertit les dicts reçus en conteneurs compacts."""
+        if not isinstance(self.inventory, (CountMap, ArrayCountMap)):
+            self.inventory = CountMap(ITEM_IDS, self.inventory)
+        if not isinstance(self.pets, CountMap):
+            self.pets = CountMap(PET_IDS, self.pets)
+        if not isinstance(self.equipment, EquipmentSlots):
+            self.equipment = EquipmentSlots(self.equipment)
+        if not isinstance(self.skills, CountMap):
+            self.skills = CountMap(SKILL_IDS, self.skills)
+        if not isinstance(self.bosses_kills, CountMap):
+            self.bosses_kills = CountMap(BOSS_IDS, self.bosses_kills)
+        self.version = next(_VERSIONS)
+
+    def touch(self) -> None:
+        """
+        Change la version du joueur. Appelé par les méthodes de modification ;
+        à appeler après une modification directe des conteneurs.
+        """
+        self.version = next(_VERSIONS)
+
     def can_open_free_chest(self) -> bool:
         """Vérifie si le joueur peut ouvrir un coffre gratuitement."""
         self._reset_daily_if_needed()
@@ -97,19 +137,29 @@ class Player:
 
     def add_item(self, item_id: str, quantity: int = 1) -> None:
         """Ajoute un objet à l'inventaire."""
-        if item_id in self.inventory:
-            self.inventory[item_id] += quantity
-        else:
-            self.inventory[item_id] = quantity
+        self.inventory[item_id] = self.inventory.get(item_id, 0) + quantity
+        self.touch()
+
+    def add_items(self, quantities: Mapping[str, int]) -> None:
+        """Ajoute plusieurs objets d'un coup (item_id -> quantité), ex. résultat de Chest.open_many."""
+        inventory = self.inventory
+        for item_id, quantity in quantities.items():
+            inventory[item_id] = inventory.get(item_id, 0) + quantity
+        if quantities:
+            self.touch()
 
     def remove_item(self, item_id: str, quantity: int = 1) -> bool:
         """Retire un objet de l'inventaire. Retourne True si réussi."""
-        if item_id not in self.inventory or self.inventory[item_id] < quantity:
+        current = self.inventory.get(item_id)
+        if current is None or current < quantity:
             return False
         
-        self.inventory[item_id] -= quantity
-        if self.inventory[item_id] <= 0:
+        remaining = current - quantity
+        if remaining <= 0:
             del self.inventory[item_id]
+        else:
+            self.inventory[item_id] = remaining
+        self.touch()
         return True
 
     def add_coins(self, amount: int) -> None:
@@ -130,17 +180,20 @@ class Player:
             self.pets[pet_id] += quantity
         else:
             self.pets[pet_id] = quantity
+        self.touch()
 
     def equip_pet(self, pet_id: str) -> bool:
         """Équipe un pet. Retourne True si réussi."""
         if pet_id in self.pets and self.pets[pet_id] > 0:
             self.equipped_pet = pet_id
+            self.touch()
             return True
         return False
 
     def unequip_pet(self) -> None:
         """Déséquipe le pet actuel."""
         self.equipped_pet = None
+        self.touch()
 
     def equip_item(self, item_id: str, slot: str) -> Optional[str]:
         """
@@ -152,6 +205,7 @@ class Player:
         
         old_item = self.equipment[slot]
         self.equipment[slot] = item_id
+        self.touch()
         return old_item
 
     def unequip_item(self, slot: str) -> Optional[str]:
@@ -161,6 +215,7 @@ class Player:
         
         old_item = self.equipment[slot]
         self.equipment[slot] = None
+        self.touch()
         return old_item
 
     def get_equipped_items(self) -> List[str]:
@@ -208,6 +263,8 @@ class Player:
             self.base_defense += 1
             self.base_speed += 1
         
+        if levels_gained:
+            self.touch()
         return levels_gained
     
     def get_max_hp(self) -> int:
@@ -245,57 +302,21 @@ class Player:
         """
         # Cette méthode sera appelée avec le contexte du DataManager
         # Pour l'instant, on utilise les stats stockées localement
-        if not hasattr(self, '_equipment_stats_cache'):
+        if self._equipment_stats_cache is None:
             return 0
         return self._equipment_stats_cache.get(stat_name, 0)
     
     def update_equipment_stats(self, data_manager) -> None:
-        """Met à jour le cache des stats d'équipement."""
-        self._equipment_stats_cache = {
-            "hp": 0,
-            "attack": 0,
-            "defense": 0,
-            "speed": 0,
-            "coin_bonus": 0.0,
-            "xp_bonus": 0.0,
-            "drop_bonus": 0.0
-        }
-        
-        for slot, item_id in self.equipment.items():
-            if item_id:
-                item = data_manager.get_item(item_id)
-                if item:
-                    # TOUJOURS générer des stats selon la rareté et le slot
-                    # Les stats dans items.json sont ignorées pour le combat
-                    default_stats = self._get_default_item_stats(item, slot)
-                    for stat, value in default_stats.items():
-                        if stat in self._equipment_stats_cache:
-                            self._equipment_stats_cache[stat] += value
+        """
+        Met à jour le cache des stats d'équipement.
+        data_manager peut aussi être un Catalog : les stats viennent de son
+        moteur de stats dérivées, mémorisées par équipement.
+        """
+        self._equipment_stats_cache = data_manager.derived_stats(self).equipment
     
     def _get_default_item_stats(self, item, slot: str) -> dict:
         """Génère des stats par défaut selon la rareté et le slot."""
-        # Multiplicateurs BEAUCOUP plus élevés pour que l'équipement compte vraiment
-        rarity_multipliers = {
-            "NORMAL": 2,
-            "RARE": 5,
-            "EPIC": 15,
-            "LEGENDARY": 40,
-            "MYTHIC": 100  # Mythique = écrase tout
-        }
-        
-        multiplier = rarity_multipliers.get(item.rarity.name, 1)
-        
-        # Stats selon le type de slot - valeurs de base plus élevées
-        slot_stats = {
-            "HELMET": {"defense": 8 * multiplier, "hp": 25 * multiplier},
-            "CHESTPLATE": {"defense": 15 * multiplier, "hp": 50 * multiplier},
-            "LEGGINGS": {"defense": 10 * multiplier, "hp": 35 * multiplier},
-            "BOOTS": {"defense": 6 * multiplier, "speed": 5 * multiplier, "hp": 15 * multiplier},
-            "WEAPON": {"attack": 20 * multiplier, "speed": 3 * multiplier},  # Arme = gros dégâts
-            "ACCESSORY": {"coin_bonus": 0.05 * multiplier, "xp_bonus": 0.05 * multiplier, "hp": 20 * multiplier}
-        }
-        
-        return slot_stats.get(slot, {})
+        return default_item_stats(item.rarity.name, slot)
     
     def heal_full(self) -> None:
         """Restaure tous les HP."""
@@ -304,7 +325,7 @@ class Player:
     def take_damage(self, damage: int) -> int:
         """Inflige des dégâts. Retourne les dégâts réels."""
         # Réduction par la défense
-        actual_damage = max(1, damage - self.get_defense() // 2)
+        actual_damage = mitigated_damage(damage, self.get_defense(), PLAYER_DEFENSE_DIVISOR)
         self.current_hp = max(0, self.current_hp - actual_damage)
         return actual_damage
     
@@ -321,12 +342,14 @@ class Player:
         if skill_id not in self.skills:
             return False
         self.equipped_skills.append(skill_id)
+        self.touch()
         return True
     
     def unequip_skill(self, skill_id: str) -> bool:
         """Déséquipe une compétence."""
         if skill_id in self.equipped_skills:
             self.equipped_skills.remove(skill_id)
+            self.touch()
             return True
         return False
     
@@ -340,6 +363,7 @@ class Player:
         else:
             self.skills[skill_id] = 1
         self.skill_points -= 1
+        self.touch()
         return True
 
     def _reset_daily_if_needed(self) -> None:
@@ -350,19 +374,23 @@ class Player:
             self.last_chest_date = today
 
     def to_dict(self) -> dict:
-        """Convertit le joueur en dictionnaire pour la sauvegarde."""
+        """
+        Convertit le joueur en dictionnaire pour la sauvegarde.
+        Les conteneurs sont copiés : le résultat est un snapshot indépendant
+        du joueur, qui peut être sérialisé depuis un autre thread.
+        """
         return {
             "user_id": self.user_id,
             "coins": self.coins,
-            "inventory": self.inventory,
+            "inventory": dict(self.inventory),
             "daily_chests_opened": self.daily_chests_opened,
             "last_chest_date": self.last_chest_date,
             "total_chests_opened": self.total_chests_opened,
             "total_items_sold": self.total_items_sold,
-            "pets": self.pets,
+            "pets": dict(self.pets),
             "equipped_pet": self.equipped_pet,
             "eggs_opened": self.eggs_opened,
-            "equipment": self.equipment,
+            "equipment": dict(self.equipment),
             # Nouvelles données niveau/combat
             "level": self.level,
             "xp": self.xp,
@@ -372,29 +400,28 @@ class Player:
             "base_defense": self.base_defense,
             "base_speed": self.base_speed,
             "current_hp": self.current_hp,
-            "skills": self.skills,
-            "equipped_skills": self.equipped_skills,
+            "skills": dict(self.skills),
+            "equipped_skills": list(self.equipped_skills),
             "bosses_defeated": self.bosses_defeated,
-            "bosses_kills": self.bosses_kills,
+            "bosses_kills": dict(self.bosses_kills),
             "last_boss_fight": self.last_boss_fight,
             "skill_points": self.skill_points
         }
 
     @classmethod
-    def from_dict(cls, data: dict) -> "Player":
-        """Crée un Player à partir d'un dictionnaire."""
-        default_equipment = {
-            "HELMET": None,
-            "CHESTPLATE": None,
-            "LEGGINGS": None,
-            "BOOTS": None,
-            "WEAPON": None,
-            "ACCESSORY": None
-        }
+    def from_dict(cls, data: dict, array_inventory: bool = False) -> "Player":
+        """
+        Crée un Player à partir d'un dictionnaire.
+        Avec array_inventory, l'inventaire est un tableau de compteurs
+        indexé par l'index dense des objets (ArrayCountMap).
+        """
+        inventory = data.get("inventory", {})
+        if array_inventory:
+            inventory = ArrayCountMap(inventory)
         player = cls(
             user_id=data["user_id"],
             coins=data.get("coins", 0),
-            inventory=data.get("inventory", {}),
+            inventory=inventory,
             daily_chests_opened=data.get("daily_chests_opened", 0),
             last_chest_date=data.get("last_chest_date", ""),
             total_chests_opened=data.get("total_chests_opened", 0),
@@ -402,7 +429,7 @@ class Player:
             pets=data.get("pets", {}),
             equipped_pet=data.get("equipped_pet"),
             eggs_opened=data.get("eggs_opened", 0),
-            equipment=data.get("equipment", default_equipment),
+            equipment=data.get("equipment"),
             # Nouvelles données niveau/combat
             level=data.get("level", 1),
             xp=data.get("xp", 0),
@@ -413,7 +440,7 @@ class Player:
             base_speed=data.get("base_speed", 10),
             current_hp=data.get("current_hp", 100),
             skills=data.get("skills", {}),
-            equipped_skills=data.get("equipped_skills", []),
+            equipped_skills=list(data.get("equipped_skills", [])),
             bosses_defeated=data.get("bosses_defeated", 0),
             bosses_kills=data.get("bosses_kills", {}),
             last_boss_fight=data.get("last_boss_fight", ""),
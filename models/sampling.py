@@ -0,0 +1,95 @@
+"""
+Tirages pondérés en temps constant (méthode des alias de Walker).
+La table d'une distribution est calculée une fois ; chaque tirage coûte
+ensuite un nombre aléatoire et deux accès à des listes, sans allocation.
+"""
+import random
+from typing import Callable, Dict, Generic, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Distributions gardées par BonusSamplerCache (bonus de drop distincts)
+SAMPLER_CACHE_SIZE = 256
+
+
+class AliasSampler(Generic[T]):
+    """Tire un élément selon des poids positifs ou nuls, en O(1)."""
+
+    __slots__ = ("outcomes", "_thresholds", "_aliases", "_size")
+
+    def __init__(self, outcomes: Sequence[T], weights: Sequence[float]):
+        """
+        Args:
+            outcomes: Éléments tirables
+            weights: Poids associés (non normalisés)
+        """
+        total = float(sum(weights))
+        if not outcomes or len(outcomes) != len(weights) or total <= 0:
+            raise ValueError("Distribution vide ou sans poids positif")
+        size = len(outcomes)
+        self.outcomes: List[T] = list(outcomes)
+        self._size = size
+
+        # Poids ramenés à une moyenne de 1, répartis entre cases pleines et cases à compléter
+        scaled = [weight * size / total for weight in weights]
+        thresholds = [1.0] * size
+        aliases = list(range(size))
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            low = small.pop()
+            high = large[-1]
+            thresholds[low] = scaled[low]
+            aliases[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            if scaled[high] < 1.0:
+                small.append(large.pop())
+        # Les restes (arrondis flottants) sont des cases pleines
+        self._thresholds = thresholds
+        self._aliases = aliases
+
+    def sample(self, rng=random) -> T:
+        """Tire un élément (rng : objet fournissant random(), le module random par défaut)."""
+        position = rng.random() * self._size
+        index = int(position)
+        if position - index < self._thresholds[index]:
+            return self.outcomes[index]
+        return self.outcomes[self._aliases[index]]
+
+    def sample_many(self, count: int, rng=random) -> List[T]:
+        """Tire count éléments indépendants."""
+        draw = rng.random
+        size, thresholds, aliases, outcomes = self._size, self._thresholds, self._aliases, self.outcomes
+        results = []
+        for _ in range(count):
+            position = draw() * size
+            index = int(position)
+            results.append(outcomes[index] if position - index < thresholds[index] else outcomes[aliases[index]])
+        return results
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class BonusSamplerCache(Generic[T]):
+    """
+    Samplers d'une distribution paramétrée par un bonus de drop, construits
+    à la première demande de chaque valeur puis réutilisés.
+    """
+
+    __slots__ = ("_build", "_samplers", "max_size")
+
+    def __init__(self, build: Callable[[float], AliasSampler[T]], max_size: int = SAMPLER_CACHE_SIZE):
+        self._build = build
+        self._samplers: Dict[float, AliasSampler[T]] = {}
+        self.max_size = max_size
+
+    def get(self, bonus: float) -> AliasSampler[T]:
+        """Retourne le sampler pour ce bonus (construit si besoin)."""
+        sampler = self._samplers.get(bonus)
+        if sampler is None:
+            if len(self._samplers) >= self.max_size:  # Bonus très variés : on repart de zéro
+                self._samplers.clear()
+            sampler = self._build(bonus)
+            self._samplers[bonus] = sampler
+        return sampler
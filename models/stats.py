@@ -0,0 +1,45 @@
+"""
+Formules des stats d'équipement.
+Les stats d'une pièce ne dépendent que de sa rareté et du slot où elle est
+équipée (les stats dans items.json sont ignorées pour le combat).
+"""
+from typing import Dict, Tuple
+
+
+# Stats dérivées de l'équipement, dans l'ordre des vecteurs de stats
+STAT_NAMES = ("hp", "attack", "defense", "speed", "coin_bonus", "xp_bonus", "drop_bonus")
+
+# Valeurs de départ (les bonus en pourcentage sont des flottants)
+EMPTY_STATS: Tuple[float, ...] = (0, 0, 0, 0, 0.0, 0.0, 0.0)
+
+# Multiplicateurs BEAUCOUP plus élevés pour que l'équipement compte vraiment
+RARITY_STAT_MULTIPLIERS = {
+    "NORMAL": 2,
+    "RARE": 5,
+    "EPIC": 15,
+    "LEGENDARY": 40,
+    "MYTHIC": 100  # Mythique = écrase tout
+}
+
+
+def default_item_stats(rarity_name: str, slot: str) -> Dict[str, float]:
+    """Génère les stats d'une pièce selon sa rareté et le slot."""
+    multiplier = RARITY_STAT_MULTIPLIERS.get(rarity_name, 1)
+
+    # Stats selon le type de slot - valeurs de base plus élevées
+    slot_stats = {
+        "HELMET": {"defense": 8 * multiplier, "hp": 25 * multiplier},
+        "CHESTPLATE": {"defense": 15 * multiplier, "hp": 50 * multiplier},
+        "LEGGINGS": {"defense": 10 * multiplier, "hp": 35 * multiplier},
+        "BOOTS": {"defense": 6 * multiplier, "speed": 5 * multiplier, "hp": 15 * multiplier},
+        "WEAPON": {"attack": 20 * multiplier, "speed": 3 * multiplier},  # Arme = gros dégâts
+        "ACCESSORY": {"coin_bonus": 0.05 * multiplier, "xp_bonus": 0.05 * multiplier, "hp": 20 * multiplier}
+    }
+
+    return slot_stats.get(slot, {})
+
+
+def item_stat_vector(rarity_name: str, slot: str) -> Tuple[float, ...]:
+    """Stats d'une pièce sous forme de vecteur aligné sur STAT_NAMES."""
+    stats = default_item_stats(rarity_name, slot)
+    return tuple(stats.get(name, 0) for name in STAT_NAMES)
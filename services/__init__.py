@@ -1,4 +1,6 @@
 # Services module
 from services.data_manager import DataManager
+from services.catalog import Catalog
+from services.search import cached_autocomplete
 
-__all__ = ['DataManager']
+__all__ = ['DataManager', 'Catalog', 'cached_autocomplete']
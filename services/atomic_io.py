@@ -0,0 +1,57 @@
+"""
+Écritures de fichiers résistantes aux crashs.
+Le contenu est écrit dans un fichier temporaire, synchronisé sur disque
+puis renommé atomiquement à la place du fichier cible.
+"""
+import json
+import os
+import tempfile
+
+
+def atomic_write_json(path: str, data, **dump_kwargs) -> None:
+    """
+    Écrit un objet JSON de façon atomique.
+
+    Args:
+        path: Fichier cible
+        data: Objet sérialisable en JSON
+        **dump_kwargs: Options passées à json.dump (indent, separators...)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_temp_file(path: str, data: bytes) -> str:
+    """
+    Écrit et synchronise un fichier temporaire à côté de path.
+    L'appelant le renomme avec os.replace (ou le supprime en cas d'échec),
+    par exemple pour faire le renommage sous un verrou.
+
+    Returns:
+        Le chemin du fichier temporaire
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path
@@ -0,0 +1,361 @@
+"""
+Simulateur d'équilibrage des boss, vectorisé avec NumPy.
+Pour chaque archétype de joueur (niveau, rareté de l'équipement par slot,
+compétences équipées) et chaque boss, des milliers de combats avancent en
+parallèle, un tour à la fois, avec les mêmes formules de dégâts que le jeu
+(skill_damage, mitigated_damage, boosted_stat de models.combat) et la même
+politique que le combat automatique (priority_policy).
+
+Usage:
+    python -m services.boss_sim --lanes 10000
+    python -m services.boss_sim --archetypes archetypes.json --json equilibrage.json
+"""
+import argparse
+import dataclasses
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+from models.combat import (
+    BOSS_DEFENSE_DIVISOR, PLAYER_DEFENSE_DIVISOR, BossTemplate, Skill,
+    boosted_stat, mitigated_damage, skill_damage
+)
+from models.containers import EQUIPMENT_SLOTS
+from models.player import Player
+from services.catalog import Catalog, load_catalog
+from services.combat_engine import AUTO_HEAL_BELOW, MAX_TURNS, combat_skills, new_combat
+from services.rng import derive_seed
+
+try:
+    import numpy as np
+except ImportError:  # Requis seulement pour lancer le simulateur
+    np = None
+
+
+# Durée d'un combat manuel : animation d'apparition puis un tour par clic
+INTRO_SECONDS = 2.0
+SECONDS_PER_TURN = 3.0
+
+
+@dataclass
+class Archetype:
+    """Profil de joueur simulé."""
+    name: str
+    level: int
+    equipment: Dict[str, str] = field(default_factory=dict)  # slot -> rareté (ex. "WEAPON": "EPIC")
+    skills: List[str] = field(default_factory=list)  # skill_id équipés, par ordre de priorité
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Archetype":
+        return cls(
+            name=data["name"],
+            level=data.get("level", 1),
+            equipment=dict(data.get("equipment", {})),
+            skills=list(data.get("skills", []))
+        )
+
+
+def _full_set(rarity_name: str) -> Dict[str, str]:
+    return {slot: rarity_name for slot in EQUIPMENT_SLOTS}
+
+
+DEFAULT_ARCHETYPES = [
+    Archetype("Débutant", 5, _full_set("NORMAL"), ["quick_slash"]),
+    Archetype("Aventurier", 15, _full_set("RARE"), ["power_strike", "quick_slash"]),
+    Archetype("Vétéran", 30, _full_set("EPIC"), ["power_strike", "vampiric_strike", "berserk"]),
+    Archetype("Champion", 50, _full_set("LEGENDARY"), ["fire_blast", "life_drain", "shadow_strike"]),
+    Archetype("Légende", 75, _full_set("MYTHIC"), ["apocalypse", "void_slash", "life_drain"]),
+]
+
+
+@dataclass
+class MatchupResult:
+    """Résultats d'un archétype contre un boss."""
+    archetype: str
+    boss_id: str
+    boss_name: str
+    fights: int
+    win_rate: float
+    fled_rate: float  # Combats abandonnés à la limite de tours
+    mean_turns: float
+    mean_damage_taken: float
+    xp_per_minute: float
+    coins_per_minute: float
+
+
+def build_player(archetype: Archetype, catalog: Catalog) -> Player:
+    """Joueur de l'archétype : montée de niveau, équipement et compétences réels."""
+    player = Player(user_id=0)
+    while player.level < archetype.level:
+        player.add_xp(player.get_xp_to_next_level() - player.xp)
+
+    # Les stats d'une pièce ne dépendent que de sa rareté et du slot
+    by_rarity: Dict[str, str] = {}
+    by_slot: Dict[tuple, str] = {}
+    for item in catalog.items.values():
+        by_rarity.setdefault(item.rarity.name, item.item_id)
+        if item.item_type:
+            by_slot.setdefault((item.rarity.name, item.item_type), item.item_id)
+    for slot, rarity_name in archetype.equipment.items():
+        item_id = by_slot.get((rarity_name, slot)) or by_rarity.get(rarity_name)
+        if item_id is None:
+            raise ValueError(f"{archetype.name}: aucun objet de rareté {rarity_name}")
+        player.equip_item(item_id, slot)
+
+    for skill_id in archetype.skills:
+        if skill_id not in catalog.skills:
+            raise ValueError(f"{archetype.name}: compétence inconnue {skill_id}")
+        player.skills[skill_id] = 1
+        player.equip_skill(skill_id)
+    player.update_equipment_stats(catalog)
+    player.heal_full()
+    return player
+
+
+def simulate_matchup(
+    player: Player,
+    skills: Sequence[Skill],
+    boss: BossTemplate,
+    catalog: Catalog,
+    lanes: int,
+    rng,
+    heal_below: float = AUTO_HEAL_BELOW,
+    max_turns: int = MAX_TURNS,
+    seconds_per_turn: float = SECONDS_PER_TURN
+) -> MatchupResult:
+    """
+    Joue `lanes` combats en parallèle (tableaux NumPy, une ligne par combat).
+    Chaque tour reproduit services.combat_engine.play_turn avec la politique
+    priority_policy : compétences équipées d'abord, soins sous heal_below.
+
+    Args:
+        player: Joueur de l'archétype (voir build_player)
+        skills: Compétences de combat (voir combat_skills)
+        boss: Boss affronté
+        catalog: Catalogue (stats d'équipement)
+        lanes: Nombre de combats
+        rng: numpy.random.Generator
+    """
+    state = new_combat(player, boss.spawn(), catalog)
+    max_hp, attack, defense = state.player_max_hp, state.player_attack, state.player_defense
+    level_bonus = state.player_level // 5
+
+    # Compétences triées par priorité : la première éligible de chaque ligne est choisie
+    priority = list(player.equipped_skills) + [skill.skill_id for skill in skills]
+    rank = {}
+    for skill_id in priority:
+        rank.setdefault(skill_id, len(rank))
+    ordered = sorted(skills, key=lambda skill: rank.get(skill.skill_id, len(rank)))
+
+    def column(getter, dtype=float):
+        return np.array([getter(skill) for skill in ordered], dtype=dtype)
+
+    power = column(lambda s: s.base_power, np.int64)
+    accuracy = column(lambda s: s.accuracy, np.int64)
+    cooldown = column(lambda s: s.cooldown, np.int64)
+    heal_percent = column(lambda s: s.heal_percent)
+    lifesteal = column(lambda s: s.lifesteal)
+    stun_chance = column(lambda s: s.stun_chance)
+    skill_heal = (max_hp * heal_percent).astype(np.int64)
+    heals = (heal_percent > 0) | (lifesteal > 0)
+    pure_heal = (heal_percent > 0) & (power <= 0)
+    pure_attack_buff = column(lambda s: s.attack_boost > 0 and s.base_power <= 0, bool)
+    pure_defense_buff = column(lambda s: s.defense_boost > 0 and s.base_power <= 0, bool)
+    attack_buff_skill = column(lambda s: s.attack_boost > 0, bool)
+    defense_buff_skill = column(lambda s: s.defense_boost > 0, bool)
+
+    attacks, weights = boss.attack_distribution()
+    weights = np.array(weights, dtype=float) / sum(weights)
+    attack_damage = np.array([a.damage for a in attacks], dtype=np.int64)
+    effect_value = np.array([a.effect_value for a in attacks])
+    effect_dot = np.array([a.special_effect == "dot" for a in attacks])
+    effect_lifesteal = np.array([a.special_effect == "lifesteal" for a in attacks])
+    effect_heal = np.array([a.special_effect == "heal" for a in attacks])
+    boss_heal = (boss.max_hp * effect_value).astype(np.int64)
+
+    boss_hp = np.full(lanes, boss.max_hp, dtype=np.int64)
+    hp = np.full(lanes, state.player_hp, dtype=np.int64)
+    cooldowns = np.zeros((lanes, len(ordered)), dtype=np.int64)
+    attack_buff = np.zeros(lanes, dtype=np.int64)
+    defense_buff = np.zeros(lanes, dtype=np.int64)
+    stun = np.zeros(lanes, dtype=np.int64)
+    dots = np.zeros((lanes, 3), dtype=np.int64)  # Brûlures des 3 prochains tours
+    taken = np.zeros(lanes, dtype=np.int64)
+    turns = np.zeros(lanes, dtype=np.int64)
+    won = np.zeros(lanes, dtype=bool)
+    active = np.ones(lanes, dtype=bool)
+    rows = np.arange(lanes)
+
+    turn = 1
+    while turn <= max_turns and active.any():
+        # Choix de la compétence (priority_policy)
+        available = cooldowns <= 0
+        low = (hp < max_hp * heal_below)[:, None]
+        first = available & heals & low
+        second = (
+            available & ~pure_heal
+            & ~(pure_attack_buff & (attack_buff > 0)[:, None])
+            & ~(pure_defense_buff & (defense_buff > 0)[:, None])
+        )
+        choice = np.where(
+            first.any(axis=1), first.argmax(axis=1),
+            np.where(second.any(axis=1), second.argmax(axis=1), available.argmax(axis=1))
+        )
+        active &= available.any(axis=1)  # Aucune compétence utilisable : fuite
+
+        # Action du joueur
+        hit = active & (rng.integers(1, 101, lanes) <= accuracy[choice])
+        striking = hit & (power[choice] > 0)
+        damage = skill_damage(power[choice], boosted_stat(attack, attack_buff), level_bonus)
+        dealt = np.where(striking, mitigated_damage(damage, boss.defense, BOSS_DEFENSE_DIVISOR), 0)
+        boss_hp = np.maximum(0, boss_hp - dealt)
+        hp = np.where(striking, np.minimum(max_hp, hp + (dealt * lifesteal[choice]).astype(np.int64)), hp)
+        hp = np.where(hit & (heal_percent[choice] > 0), np.minimum(max_hp, hp + skill_heal[choice]), hp)
+        defense_buff = np.where(hit & defense_buff_skill[choice], 3, defense_buff)
+        attack_buff = np.where(hit & attack_buff_skill[choice], 2, attack_buff)
+        stunned = hit & (stun_chance[choice] > 0) & (rng.random(lanes) < stun_chance[choice])
+        stun = np.where(stunned, 1, stun)
+        cooling = active & (cooldown[choice] > 0)
+        cooldowns[rows[cooling], choice[cooling]] = cooldown[choice[cooling]]
+
+        victory = active & (boss_hp <= 0)
+        won |= victory
+        turns[victory] = turn
+        active &= ~victory
+
+        # Riposte du boss
+        acting = active & (stun <= 0)
+        picked = rng.choice(len(attacks), size=lanes, p=weights)
+        hit_damage = mitigated_damage(
+            attack_damage[picked], boosted_stat(defense, defense_buff), PLAYER_DEFENSE_DIVISOR
+        )
+        hit_damage = np.where(acting, hit_damage, 0)
+        hp = np.maximum(0, hp - hit_damage)
+        taken += hit_damage
+        dots += np.where(acting & effect_dot[picked], effect_value[picked].astype(np.int64), 0)[:, None]
+        boss_hp = np.where(
+            acting & effect_lifesteal[picked],
+            np.minimum(boss.max_hp, boss_hp + (hit_damage * effect_value[picked]).astype(np.int64)),
+            boss_hp
+        )
+        boss_hp = np.where(acting & effect_heal[picked], np.minimum(boss.max_hp, boss_hp + boss_heal[picked]), boss_hp)
+
+        # Brûlures, recharges et effets
+        burn = np.where(active, dots[:, 0], 0)
+        hp -= burn
+        taken += burn
+        dots[:, :-1] = dots[:, 1:]
+        dots[:, -1] = 0
+        np.subtract(cooldowns, 1, out=cooldowns, where=cooldowns > 0)
+        attack_buff = np.maximum(0, attack_buff - 1)
+        defense_buff = np.maximum(0, defense_buff - 1)
+        stun = np.maximum(0, stun - 1)
+
+        defeat = active & (hp <= 0)
+        turns[defeat] = turn
+        active &= ~defeat
+        turn += 1
+
+    fled = active | (turns == 0)
+    turns[active] = max_turns
+    xp_bonus, coin_bonus = player.get_xp_bonus(), player.get_coin_bonus()
+    wins = int(won.sum())
+    minutes = (lanes * INTRO_SECONDS + turns.sum() * seconds_per_turn) / 60
+    return MatchupResult(
+        archetype="",
+        boss_id=boss.boss_id,
+        boss_name=boss.name,
+        fights=lanes,
+        win_rate=wins / lanes,
+        fled_rate=float(fled.mean()),
+        mean_turns=float(turns.mean()),
+        mean_damage_taken=float(taken.mean()),
+        xp_per_minute=wins * int(boss.xp_reward * (1 + xp_bonus)) / minutes,
+        coins_per_minute=wins * int(boss.coins_reward * (1 + coin_bonus)) / minutes
+    )
+
+
+def run_balance(
+    catalog: Catalog,
+    archetypes: Sequence[Archetype],
+    lanes: int = 10000,
+    seed: int = 0,
+    heal_below: float = AUTO_HEAL_BELOW,
+    max_turns: int = MAX_TURNS,
+    seconds_per_turn: float = SECONDS_PER_TURN
+) -> List[MatchupResult]:
+    """Simule chaque archétype contre chaque boss (flux NumPy dérivé de (seed, archétype, boss))."""
+    results = []
+    for archetype in archetypes:
+        player = build_player(archetype, catalog)
+        skills = combat_skills(player, catalog)
+        for boss in catalog.bosses_by_level:
+            rng = np.random.default_rng(derive_seed(seed, archetype.name, boss.boss_id))
+            result = simulate_matchup(
+                player, skills, boss, catalog, lanes, rng, heal_below, max_turns, seconds_per_turn
+            )
+            result.archetype = archetype.name
+            results.append(result)
+    return results
+
+
+def format_report(results: Sequence[MatchupResult], elapsed: float) -> str:
+    """Tableau texte : une ligne par (archétype, boss)."""
+    fights = sum(result.fights for result in results)
+    lines = [
+        f"⚔️ Équilibrage : {fights:,} combats ({fights / max(elapsed, 1e-9):,.0f} combats/s, {elapsed:.1f}s)",
+        "",
+        f"{'Archétype':<12} {'Boss':<24} {'Victoire':>9} {'Tours':>6} {'Dégâts subis':>13} "
+        f"{'XP/min':>9} {'💰/min':>9}",
+    ]
+    previous = None
+    for result in results:
+        if previous is not None and result.archetype != previous:
+            lines.append("")
+        previous = result.archetype
+        fled = f" ({result.fled_rate * 100:.0f}% abandons)" if result.fled_rate >= 0.005 else ""
+        lines.append(
+            f"{result.archetype:<12} {result.boss_name[:24]:<24} {result.win_rate * 100:>8.1f}% "
+            f"{result.mean_turns:>6.1f} {result.mean_damage_taken:>13,.0f} "
+            f"{result.xp_per_minute:>9,.0f} {result.coins_per_minute:>9,.0f}{fled}"
+        )
+    return "\n".join(lines)
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m services.boss_sim", description="Simulation d'équilibrage des boss"
+    )
+    parser.add_argument("--data", dest="data_folder", default="data")
+    parser.add_argument("--archetypes", help="Fichier JSON : liste de {name, level, equipment, skills}")
+    parser.add_argument("--lanes", type=int, default=10000, help="Combats par (archétype, boss)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--heal-below", type=int, default=int(AUTO_HEAL_BELOW * 100), help="PV (%%) déclenchant un soin")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--seconds-per-turn", type=float, default=SECONDS_PER_TURN)
+    parser.add_argument("--json", dest="json_path", help="Écrit aussi les résultats en JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if np is None:
+        raise SystemExit("❌ NumPy est requis pour le simulateur : pip install numpy")
+
+    archetypes = DEFAULT_ARCHETYPES
+    if args.archetypes:
+        with open(args.archetypes, "r", encoding="utf-8") as f:
+            archetypes = [Archetype.from_dict(entry) for entry in json.load(f)]
+
+    catalog = load_catalog(args.data_folder)
+    started = time.perf_counter()
+    results = run_balance(
+        catalog, archetypes, args.lanes, args.seed,
+        args.heal_below / 100, args.max_turns, args.seconds_per_turn
+    )
+    print(format_report(results, time.perf_counter() - started))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([dataclasses.asdict(result) for result in results], f, ensure_ascii=False, indent=2)
+        print(f"\n✅ Résultats écrits dans {args.json_path}")
@@ -0,0 +1,367 @@
+"""
+Catalogue du jeu (objets, pets, sets, boss, skills) et son cache compilé.
+Le catalogue construit, index dérivés compris, est sérialisé dans un
+snapshot binaire unique, indexé par l'empreinte SHA-256 des fichiers JSON
+sources : tant qu'ils ne changent pas, le démarrage se fait en une lecture.
+Un catalogue n'est jamais modifié une fois construit : un rechargement
+produit une nouvelle version qui remplace l'ancienne d'un bloc.
+"""
+import hashlib
+import json
+import os
+import pickle
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models.item import Item, Pet, EquipmentSet, Rarity
+from models.combat import BossTemplate, Skill
+from models.containers import ITEM_IDS, ArrayCountMap, CountMap
+from models.sampling import AliasSampler
+from services.atomic_io import write_temp_file
+from services.search import AutocompleteIndex
+from services.stats import DerivedStats, StatsEngine
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel : les passes se font alors en Python pur
+    np = None
+
+
+# À incrémenter quand la structure du catalogue ou des modèles change
+CATALOG_FORMAT_VERSION = 6
+
+# Fichiers sources du catalogue, relatifs au dossier de données
+CATALOG_SOURCES = ("items.json", "pets.json", "sets.json", "bosses.json", "skills.json")
+
+CATALOG_CACHE_FILE = "catalog.cache"
+
+# Codes de rareté utilisés par l'index dense (-1 = objet inconnu)
+RARITIES = list(Rarity)
+_RARITY_CODES = {rarity: code for code, rarity in enumerate(RARITIES)}
+
+# Index dense des objets et moteur de stats : propres au processus, donc recalculés au chargement
+_RUNTIME_FIELDS = ("items_by_index", "item_values", "item_rarities", "stats", "egg_sampler")
+
+
+class Catalog:
+    """Catalogue complet construit depuis les fichiers JSON, avec ses index."""
+
+    def __init__(self):
+        self.fingerprint: str = ""
+        self.version: int = 0  # Numéro attribué par le DataManager à chaque rechargement
+        self.items: Dict[str, Item] = {}
+        self.pets: Dict[str, Pet] = {}
+        self.sets: Dict[str, EquipmentSet] = {}
+        self.bosses: Dict[str, BossTemplate] = {}
+        self.skills: Dict[str, Skill] = {}
+        self.egg_cost: int = 5000
+        self.egg_drop_rates: Dict[str, float] = {}
+
+        # Index dérivés
+        self.bosses_by_level: List[BossTemplate] = []
+        self.skills_by_level: List[Skill] = []
+        # Noms normalisés (sans casse ni accents) -> identifiants, avec autocomplétion
+        self.item_names = AutocompleteIndex(())
+        self.pet_names = AutocompleteIndex(())
+        self.boss_names = AutocompleteIndex(())
+        self.skill_names = AutocompleteIndex(())
+
+        # Index dense des objets (position = entier interné de ITEM_IDS)
+        self.items_by_index: List[Optional[Item]] = []
+        self.item_values = array("q")
+        self.item_rarities = array("b")
+        # Stats dérivées de l'équipement, mémorisées (voir derived_stats)
+        self.stats = StatsEngine(self)
+        # Tirage des œufs en O(1), voir _build_egg_sampler
+        self.egg_sampler: Optional[AliasSampler[Pet]] = None
+
+    @classmethod
+    def build(cls, data_folder: str) -> "Catalog":
+        """Construit le catalogue en parsant les fichiers JSON."""
+        catalog = cls()
+
+        data = _read_json(os.path.join(data_folder, "items.json"))
+        for item_data in data.get("items", []):
+            item = Item.from_dict(item_data)
+            catalog.items[item.item_id] = item
+
+        data = _read_json(os.path.join(data_folder, "pets.json"))
+        catalog.egg_cost = data.get("egg_cost", 5000)
+        catalog.egg_drop_rates = data.get("egg_drop_rates", {})
+        for pet_data in data.get("pets", []):
+            pet = Pet.from_dict(pet_data)
+            catalog.pets[pet.pet_id] = pet
+
+        data = _read_json(os.path.join(data_folder, "sets.json"))
+        for set_data in data.get("sets", []):
+            equipment_set = EquipmentSet.from_dict(set_data)
+            catalog.sets[equipment_set.set_id] = equipment_set
+
+        data = _read_json(os.path.join(data_folder, "bosses.json"))
+        for boss_data in data.get("bosses", []):
+            boss = BossTemplate.from_dict(boss_data)
+            catalog.bosses[boss.boss_id] = boss
+
+        data = _read_json(os.path.join(data_folder, "skills.json"))
+        for skill_data in data.get("skills", []):
+            skill = Skill.from_dict(skill_data)
+            catalog.skills[skill.skill_id] = skill
+
+        catalog._build_indexes()
+        catalog._bind_runtime()
+        return catalog
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        for name in _RUNTIME_FIELDS:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._bind_runtime()
+
+    def get_item(self, item_id: str) -> Optional[Item]:
+        """Récupère un objet de cette version du catalogue."""
+        return self.items.get(item_id)
+
+    def get_skill(self, skill_id: str) -> Optional[Skill]:
+        """Récupère un skill de cette version du catalogue."""
+        return self.skills.get(skill_id)
+
+    def derived_stats(self, player) -> DerivedStats:
+        """Stats dérivées de l'équipement et du pet d'un joueur (mémorisées)."""
+        return self.stats.derive(player)
+
+    def item_index(self, item_id: str) -> Optional[int]:
+        """Retourne l'index dense d'un objet du catalogue."""
+        index = ITEM_IDS.lookup(item_id)
+        if index is None or index >= len(self.items_by_index) or self.items_by_index[index] is None:
+            return None
+        return index
+
+    # ==================== PASSES SUR LES INVENTAIRES ====================
+
+    def inventory_entries(
+        self, inventory: Mapping, rarity: Optional[Rarity] = None
+    ) -> List[Tuple[Item, int]]:
+        """
+        Retourne les (objet, quantité) d'un inventaire, objets inconnus exclus,
+        éventuellement filtrés par rareté. Aucune recherche par chaîne.
+        """
+        by_index = self.items_by_index
+        if np is not None and isinstance(inventory, ArrayCountMap):
+            counts, codes, _ = self._numpy_views(inventory)
+            mask = counts != 0
+            mask &= codes >= 0 if rarity is None else codes == _RARITY_CODES[rarity]
+            return [(by_index[index], int(counts[index])) for index in np.flatnonzero(mask)]
+
+        entries = []
+        for index, quantity in self._indexed_counts(inventory):
+            item = by_index[index]
+            if item is not None and (rarity is None or item.rarity is rarity):
+                entries.append((item, quantity))
+        return entries
+
+    def inventory_summary(self, inventory: Mapping) -> Tuple[int, Dict[Rarity, int]]:
+        """
+        Calcule en une passe la valeur totale d'un inventaire et ses
+        quantités par rareté (objets inconnus ignorés).
+        """
+        if np is not None and isinstance(inventory, ArrayCountMap):
+            counts, codes, values = self._numpy_views(inventory)
+            known = codes >= 0
+            total_value = int(counts[known] @ values[known])
+            per_rarity = np.bincount(codes[known], weights=counts[known], minlength=len(RARITIES))
+            return total_value, {rarity: int(per_rarity[code]) for code, rarity in enumerate(RARITIES)}
+
+        total_value = 0
+        per_rarity = [0] * len(RARITIES)
+        values, codes = self.item_values, self.item_rarities
+        for index, quantity in self._indexed_counts(inventory):
+            code = codes[index]
+            if code >= 0:
+                total_value += values[index] * quantity
+                per_rarity[code] += quantity
+        return total_value, dict(zip(RARITIES, per_rarity))
+
+    def _indexed_counts(self, inventory: Mapping) -> Iterator[Tuple[int, int]]:
+        """Parcourt (index dense, quantité) des objets connus de ce catalogue."""
+        size = len(self.items_by_index)
+        if isinstance(inventory, ArrayCountMap):
+            counts = inventory.counts
+            for index in range(min(size, len(counts))):
+                if counts[index]:
+                    yield index, counts[index]
+        elif isinstance(inventory, CountMap) and inventory._ids is ITEM_IDS:
+            for index, quantity in inventory._counts.items():
+                if index < size:
+                    yield index, quantity
+        else:
+            for item_id, quantity in inventory.items():
+                index = self.item_index(item_id)
+                if index is not None:
+                    yield index, quantity
+
+    def _numpy_views(self, inventory: ArrayCountMap):
+        """Vues NumPy (sans copie) alignées des compteurs, raretés et valeurs."""
+        counts = np.frombuffer(inventory.counts, dtype=np.int64)
+        size = min(len(counts), len(self.items_by_index))
+        codes = np.frombuffer(self.item_rarities, dtype=np.int8)[:size]
+        values = np.frombuffer(self.item_values, dtype=np.int64)[:size]
+        return counts[:size], codes, values
+
+    def _bind_runtime(self) -> None:
+        """Reconstruit les structures propres au processus (index dense, stats, tirages)."""
+        self._bind_item_index()
+        self.stats = StatsEngine(self)
+        self.egg_sampler = self._build_egg_sampler()
+
+    def _build_egg_sampler(self) -> Optional[AliasSampler[Pet]]:
+        """
+        Distribution des pets d'un œuf : la probabilité de chaque rareté
+        (le reste va à Normal) est répartie sur les pets de cette rareté,
+        ou sur tous les pets si aucun n'a cette rareté.
+        """
+        pets = list(self.pets.values())
+        if not pets:
+            return None
+        probabilities: Dict[str, float] = {}
+        remaining = 1.0
+        for rarity_name, rate in self.egg_drop_rates.items():
+            probability = min(rate, remaining)
+            probabilities[rarity_name] = probabilities.get(rarity_name, 0.0) + probability
+            remaining -= probability
+        probabilities["NORMAL"] = probabilities.get("NORMAL", 0.0) + remaining
+
+        weights = [0.0] * len(pets)
+        for rarity_name, probability in probabilities.items():
+            positions = [i for i, pet in enumerate(pets) if pet.rarity.name == rarity_name]
+            positions = positions or range(len(pets))
+            for position in positions:
+                weights[position] += probability / len(positions)
+        return AliasSampler(pets, weights)
+
+    def _bind_item_index(self) -> None:
+        """
+        Attribue à chaque objet son index dense (entier interné de ITEM_IDS) et
+        construit les tableaux de valeurs et de raretés alignés sur cet index.
+        Chargé avant les joueurs, le catalogue occupe les index 0..N-1.
+        """
+        for item_id in self.items:
+            ITEM_IDS.intern(item_id)
+        size = len(ITEM_IDS)
+        self.items_by_index = [None] * size
+        self.item_values = array("q", bytes(8 * size))
+        self.item_rarities = array("b", [-1]) * size
+        for item_id, item in self.items.items():
+            index = ITEM_IDS.lookup(item_id)
+            self.items_by_index[index] = item
+            self.item_values[index] = item.value
+            self.item_rarities[index] = _RARITY_CODES[item.rarity]
+
+    def _build_indexes(self) -> None:
+        """Calcule les index dérivés (tris et recherches par nom)."""
+        self.bosses_by_level = sorted(self.bosses.values(), key=lambda b: b.level_required)
+        self.skills_by_level = sorted(self.skills.values(), key=lambda s: s.level_required)
+        # Rang d'autocomplétion : raretés les plus hautes d'abord, boss et skills par niveau
+        rarity_rank = {rarity: len(RARITIES) - 1 - code for rarity, code in _RARITY_CODES.items()}
+        self.item_names = AutocompleteIndex(
+            (item.name, item_id, rarity_rank[item.rarity]) for item_id, item in self.items.items()
+        )
+        self.pet_names = AutocompleteIndex(
+            (pet.name, pet_id, rarity_rank[pet.rarity]) for pet_id, pet in self.pets.items()
+        )
+        self.boss_names = AutocompleteIndex(
+            (boss.name, boss_id, boss.level_required) for boss_id, boss in self.bosses.items()
+        )
+        self.skill_names = AutocompleteIndex(
+            (skill.name, skill_id, skill.level_required) for skill_id, skill in self.skills.items()
+        )
+
+
+def catalog_sources_stat(data_folder: str) -> tuple:
+    """Signature peu coûteuse (taille, date) des fichiers sources, pour la surveillance."""
+    signature = []
+    for name in CATALOG_SOURCES:
+        try:
+            stat = os.stat(os.path.join(data_folder, name))
+            signature.append((stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _read_json(path: str) -> dict:
+    """Lit un fichier JSON source (dict vide s'il n'existe pas)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def catalog_fingerprint(data_folder: str) -> str:
+    """Empreinte SHA-256 du contenu des fichiers sources et du format."""
+    digest = hashlib.sha256(f"catalog-v{CATALOG_FORMAT_VERSION}".encode())
+    for name in CATALOG_SOURCES:
+        path = os.path.join(data_folder, name)
+        digest.update(name.encode())
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        else:
+            digest.update(b"\0missing")
+    return digest.hexdigest()
+
+
+def load_catalog(data_folder: str, cache_path: Optional[str] = None) -> Catalog:
+    """
+    Charge le catalogue depuis le snapshot compilé s'il est à jour,
+    sinon le reconstruit depuis les JSON et réécrit le snapshot.
+
+    Args:
+        data_folder: Dossier contenant les fichiers sources
+        cache_path: Chemin du snapshot (par défaut data/catalog.cache)
+    """
+    cache_path = cache_path or os.path.join(data_folder, CATALOG_CACHE_FILE)
+    fingerprint = catalog_fingerprint(data_folder)
+
+    catalog = _read_snapshot(cache_path, fingerprint)
+    if catalog is not None:
+        return catalog
+
+    catalog = Catalog.build(data_folder)
+    catalog.fingerprint = fingerprint
+    try:
+        _write_snapshot(cache_path, fingerprint, catalog)
+    except OSError as e:
+        print(f"⚠️ Impossible d'écrire le cache du catalogue: {e}")
+    return catalog
+
+
+def _read_snapshot(cache_path: str, fingerprint: str) -> Optional[Catalog]:
+    """Lit le snapshot s'il correspond à l'empreinte attendue."""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'rb') as f:
+            stored_fingerprint, catalog = pickle.load(f)
+    except Exception:
+        # Snapshot corrompu ou produit par une autre version du code : on reconstruit
+        return None
+    if stored_fingerprint != fingerprint:
+        return None
+    return catalog
+
+
+def _write_snapshot(cache_path: str, fingerprint: str, catalog: Catalog) -> None:
+    """Écrit le snapshot de façon atomique (fichier temporaire synchronisé puis renommé)."""
+    data = pickle.dumps((fingerprint, catalog), protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path = write_temp_file(cache_path, data)
+    try:
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,305 @@
+"""
+Moteur de combat synchrone, sans Discord.
+Un tour prend un CombatState et la compétence choisie, tire dans le flux
+aléatoire du tour, fait avancer l'état et retourne les événements du tour. Le cog
+Battle ne fait qu'afficher ; simulations et combats automatiques
+utilisent les mêmes règles.
+"""
+import random
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, List, Optional, Sequence
+
+from models.combat import (
+    PLAYER_DEFENSE_DIVISOR, BossInstance, CombatState, Skill, boosted_stat, mitigated_damage
+)
+from services.rng import derive_seed
+
+
+class CombatOutcome(Enum):
+    """Issue d'un combat après un tour."""
+    ONGOING = "en cours"
+    VICTORY = "victoire"
+    DEFEAT = "défaite"
+    FLED = "fuite"
+
+
+@dataclass(slots=True)
+class CombatEvent:
+    """Une action du tour, avec le texte ajouté au log du combat."""
+    actor: str  # "player", "boss" ou "dot"
+    message: str
+
+
+@dataclass(slots=True)
+class TurnResult:
+    """Résultat d'un tour : l'état (modifié sur place), ses événements et l'issue."""
+    state: CombatState
+    outcome: CombatOutcome
+    events: List[CombatEvent] = field(default_factory=list)
+
+
+# Choix d'une compétence parmi celles utilisables (None = fuite)
+SkillPolicy = Callable[[CombatState, Sequence[Skill]], Optional[Skill]]
+
+# Garde-fou des combats joués jusqu'au bout (boss qui se soigne plus vite qu'il ne perd de PV)
+MAX_TURNS = 200
+# Combat automatique : PV (en fraction des PV max) sous lesquels un soin passe en priorité
+AUTO_HEAL_BELOW = 0.35
+
+
+def new_combat(player, boss: BossInstance, catalog, seed: Optional[int] = None) -> CombatState:
+    """
+    Prépare l'état d'un combat avec les stats d'équipement du joueur.
+
+    Args:
+        player: Joueur (ses PV actuels sont ceux du début du combat)
+        boss: Boss du combat (voir BossTemplate.spawn)
+        catalog: Catalogue ou DataManager fournissant les stats d'équipement
+        seed: Graine du combat (aléatoire si None), voir turn_stream
+    """
+    player.update_equipment_stats(catalog)
+    state = CombatState(
+        player_id=player.user_id,
+        boss=boss,
+        player_hp=player.current_hp,
+        player_max_hp=player.get_max_hp(),
+        player_attack=player.get_attack(),
+        player_defense=player.get_defense(),
+        player_level=player.level
+    )
+    if seed is not None:
+        state.seed = seed
+    return state
+
+
+def turn_stream(combat: CombatState, stage: str = "turn") -> random.Random:
+    """
+    Flux aléatoire du tour en cours, dérivé de (graine du combat, joueur,
+    tour, étape) : un combat repris après un redémarrage tire exactement
+    les mêmes valeurs sans sauvegarder d'état de générateur.
+
+    Args:
+        stage: Étape du tour ("turn" pour les actions, "loot" pour le butin de victoire)
+    """
+    return random.Random(derive_seed(combat.seed, "combat", combat.player_id, combat.turn, stage))
+
+
+def combat_skills(player, catalog) -> List[Skill]:
+    """Compétences utilisables en combat (attaque de base, soin, skills équipés ; 4 au plus)."""
+    skills = []
+
+    basic_attack = catalog.get_skill("basic_attack")
+    if basic_attack:
+        skills.append(basic_attack)
+
+    heal_skill = catalog.get_skill("heal")
+    if heal_skill and player.level >= heal_skill.level_required:
+        skills.append(heal_skill)
+
+    for skill_id in player.equipped_skills:
+        skill = catalog.get_skill(skill_id)
+        if skill and skill not in skills:
+            skills.append(skill)
+
+    return skills[:4]
+
+
+def available_skills(combat: CombatState, skills: Sequence[Skill]) -> List[Skill]:
+    """Compétences qui ne sont pas en recharge."""
+    return [skill for skill in skills if combat.skill_cooldowns.get(skill.skill_id, 0) <= 0]
+
+
+def outcome(combat: CombatState) -> CombatOutcome:
+    """Issue du combat dans son état actuel."""
+    if not combat.boss.is_alive():
+        return CombatOutcome.VICTORY
+    if combat.player_hp <= 0:
+        return CombatOutcome.DEFEAT
+    return CombatOutcome.ONGOING
+
+
+def play_turn(combat: CombatState, skill: Optional[Skill], rng: Optional[random.Random] = None) -> TurnResult:
+    """
+    Joue un tour complet : action du joueur, riposte du boss, brûlures,
+    puis recharges et effets. L'état est modifié sur place.
+
+    Args:
+        combat: Combat en cours
+        skill: Compétence utilisée, None pour fuir
+        rng: Flux aléatoire (turn_stream du tour par défaut)
+
+    Raises:
+        ValueError: Combat terminé ou compétence en recharge
+    """
+    if outcome(combat) is not CombatOutcome.ONGOING:
+        raise ValueError("Le combat est terminé")
+    if skill is None:
+        return TurnResult(combat, CombatOutcome.FLED)
+    if combat.skill_cooldowns.get(skill.skill_id, 0) > 0:
+        raise ValueError(f"{skill.name} est en recharge")
+    if rng is None:
+        rng = turn_stream(combat)
+
+    result = TurnResult(combat, CombatOutcome.ONGOING)
+    _log(result, "player", player_action(combat, skill, rng))
+
+    if skill.cooldown > 0:
+        combat.skill_cooldowns[skill.skill_id] = skill.cooldown
+
+    if not combat.boss.is_alive():
+        result.outcome = CombatOutcome.VICTORY
+        return result
+
+    _log(result, "boss", boss_action(combat, rng))
+
+    # Effets DoT
+    dot_damage = combat.apply_dots()
+    if dot_damage > 0:
+        combat.player_hp -= dot_damage
+        _log(result, "dot", f"🔥 Brûlure: `-{dot_damage}` PV !")
+
+    combat.tick_cooldowns()
+    combat.tick_buffs()
+    combat.turn += 1
+
+    result.outcome = outcome(combat)
+    return result
+
+
+def run_combat(
+    combat: CombatState,
+    skills: Sequence[Skill],
+    policy: SkillPolicy,
+    max_turns: int = MAX_TURNS,
+    on_turn: Optional[Callable[[Skill, TurnResult], None]] = None
+) -> CombatOutcome:
+    """
+    Joue le combat jusqu'au bout en laissant policy choisir chaque compétence.
+    Au-delà de max_turns tours, le joueur abandonne (FLED).
+
+    Args:
+        on_turn: Appelé après chaque tour joué avec la compétence et son résultat
+    """
+    while combat.turn <= max_turns:
+        skill = policy(combat, available_skills(combat, skills))
+        result = play_turn(combat, skill)
+        if on_turn is not None and skill is not None:
+            on_turn(skill, result)
+        if result.outcome is not CombatOutcome.ONGOING:
+            return result.outcome
+    return CombatOutcome.FLED
+
+
+def priority_policy(priority: Sequence[str], heal_below: float = AUTO_HEAL_BELOW) -> SkillPolicy:
+    """
+    Politique du combat automatique : la première compétence disponible
+    dans l'ordre de priorité (skill_id), en gardant les soins pour les PV
+    bas et sans relancer un buff encore actif.
+
+    Args:
+        priority: skill_id du plus au moins prioritaire (les autres passent après)
+        heal_below: Fraction des PV max sous laquelle un soin est utilisé en premier
+    """
+    rank = {}
+    for skill_id in priority:
+        rank.setdefault(skill_id, len(rank))
+
+    def choose(combat: CombatState, available: Sequence[Skill]) -> Optional[Skill]:
+        ordered = sorted(available, key=lambda skill: rank.get(skill.skill_id, len(rank)))
+        if combat.player_hp < combat.player_max_hp * heal_below:
+            for skill in ordered:
+                if skill.heal_percent > 0 or skill.lifesteal > 0:
+                    return skill
+        for skill in ordered:
+            if skill.heal_percent > 0 and skill.base_power <= 0:
+                continue  # Soin pur : inutile avec des PV hauts
+            if skill.attack_boost > 0 and skill.base_power <= 0 and "attack" in combat.player_buffs:
+                continue
+            if skill.defense_boost > 0 and skill.base_power <= 0 and "defense" in combat.player_buffs:
+                continue
+            return skill
+        return ordered[0] if ordered else None
+
+    return choose
+
+
+def player_action(combat: CombatState, skill: Skill, rng: random.Random) -> str:
+    """Applique la compétence du joueur et retourne le texte de l'action."""
+    result = f"{skill.emoji} {skill.name}"
+
+    if rng.randint(1, 100) > skill.accuracy:
+        return result + " → RATÉ !"
+
+    if skill.base_power > 0:
+        level_bonus = combat.player_level // 5
+        attack = boosted_stat(combat.player_attack, combat.player_buffs.get("attack", 0))
+        damage = skill.calculate_damage(attack, level_bonus)
+
+        actual_damage = combat.boss.take_damage(damage)
+        result += f" → -{actual_damage} PV"
+
+        if skill.lifesteal > 0:
+            heal = int(actual_damage * skill.lifesteal)
+            combat.player_hp = min(combat.player_max_hp, combat.player_hp + heal)
+            result += f" (+{heal} vol)"
+
+    if skill.heal_percent > 0:
+        heal = int(combat.player_max_hp * skill.heal_percent)
+        combat.player_hp = min(combat.player_max_hp, combat.player_hp + heal)
+        result += f" → +{heal} PV"
+
+    if skill.defense_boost > 0:
+        combat.player_buffs["defense"] = 3
+        result += f" [DEF+]"
+
+    if skill.attack_boost > 0:
+        combat.player_buffs["attack"] = 2
+        result += f" [ATK+]"
+
+    if skill.dot_damage > 0:
+        combat.boss_debuffs["dot"] = skill.dot_turns
+        result += f" [🔥]"
+
+    if skill.stun_chance > 0 and rng.random() < skill.stun_chance:
+        combat.boss_debuffs["stun"] = 1
+        result += f" [💫]"
+
+    return result
+
+
+def boss_action(combat: CombatState, rng: random.Random) -> str:
+    """Joue l'attaque du boss et retourne le texte de l'action."""
+    boss = combat.boss
+
+    if combat.boss_debuffs.get("stun", 0) > 0:
+        return f"{boss.emoji} {boss.name} est étourdi !"
+
+    attack = boss.choose_attack(rng)
+    result = f"{attack.emoji} {boss.name}: {attack.name}"
+
+    # Même réduction que Player.take_damage, avec la défense du combat (buffs compris)
+    effective_defense = boosted_stat(combat.player_defense, combat.player_buffs.get("defense", 0))
+    damage = mitigated_damage(attack.damage, effective_defense, PLAYER_DEFENSE_DIVISOR)
+
+    combat.player_hp = max(0, combat.player_hp - damage)
+    result += f" → -{damage} PV"
+
+    if attack.special_effect == "dot":
+        combat.player_dots.append((int(attack.effect_value), 3))
+        result += " [🔥]"
+    elif attack.special_effect == "lifesteal":
+        heal = int(damage * attack.effect_value)
+        boss.current_hp = min(boss.max_hp, boss.current_hp + heal)
+        result += f" (+{heal})"
+    elif attack.special_effect == "heal":
+        heal = int(boss.max_hp * attack.effect_value)
+        boss.current_hp = min(boss.max_hp, boss.current_hp + heal)
+        result += f" [Soin +{heal}]"
+
+    return result
+
+
+def _log(result: TurnResult, actor: str, message: str) -> None:
+    result.state.add_log(message)
+    result.events.append(CombatEvent(actor, message))
@@ -0,0 +1,124 @@
+"""
+Sauvegarde des combats en cours.
+Chaque combat est réécrit à chaque tour dans son propre fichier JSON
+compact (data/combats/<user_id>.json), de façon atomique : après un
+redémarrage, les combats sont rechargés et reprennent au même tour. Les
+tirages de chaque tour dérivent de la graine du combat et du numéro du
+tour (voir combat_engine.turn_stream) : seule la graine est sauvegardée.
+"""
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from models.combat import CombatState
+from services.atomic_io import atomic_write_json
+from services.catalog import Catalog
+
+
+# Combat sans action depuis ce délai (secondes) : considéré comme abandonné
+COMBAT_IDLE_TIMEOUT = 15 * 60
+# Intervalle (secondes) entre deux nettoyages des combats abandonnés
+COMBAT_SWEEP_INTERVAL = 60
+
+# Format des fichiers de combat (incrémenté si le contenu change)
+CHECKPOINT_FORMAT_VERSION = 2
+
+
+@dataclass
+class CombatCheckpoint:
+    """Un combat en cours et le message Discord qui l'affiche."""
+    combat: CombatState
+    skill_ids: List[str]  # Compétences proposées pendant le combat
+    channel_id: int = 0
+    message_id: int = 0  # 0 tant que le message du combat n'est pas envoyé
+    updated_at: float = field(default_factory=time.time)
+    # Catalogue du lancement (non sauvegardé) : None pour un combat repris après un redémarrage
+    catalog: Optional[Catalog] = field(default=None, repr=False, compare=False)
+
+    @property
+    def user_id(self) -> int:
+        return self.combat.player_id
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """Vérifie si le combat est resté sans action plus de COMBAT_IDLE_TIMEOUT."""
+        return (now if now is not None else time.time()) - self.updated_at > COMBAT_IDLE_TIMEOUT
+
+    def to_dict(self) -> dict:
+        return {
+            "format": CHECKPOINT_FORMAT_VERSION,
+            "combat": self.combat.to_dict(),
+            "skill_ids": self.skill_ids,
+            "channel_id": self.channel_id,
+            "message_id": self.message_id,
+            "updated_at": self.updated_at
+        }
+
+
+class CombatStore:
+    """Fichiers des combats en cours, un par joueur."""
+
+    def __init__(self, folder: str):
+        """
+        Args:
+            folder: Dossier des fichiers de combat (créé si besoin)
+        """
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, user_id: int) -> str:
+        return os.path.join(self.folder, f"{user_id}.json")
+
+    def save(self, checkpoint: CombatCheckpoint) -> None:
+        """Écrit l'état du combat (à appeler après chaque tour)."""
+        self.write(checkpoint.user_id, checkpoint.to_dict())
+
+    def write(self, user_id: int, data: dict) -> None:
+        """
+        Écrit un état déjà sérialisé (CombatCheckpoint.to_dict).
+        Permet de sérialiser sur la boucle asyncio et d'écrire dans un thread.
+        """
+        atomic_write_json(self._path(user_id), data, separators=(",", ":"))
+
+    def delete(self, user_id: int) -> None:
+        """Supprime le combat terminé."""
+        try:
+            os.remove(self._path(user_id))
+        except FileNotFoundError:
+            pass
+
+    def load_all(self, catalog) -> List[CombatCheckpoint]:
+        """
+        Recharge les combats sauvegardés.
+        Les fichiers illisibles, d'un autre format ou dont le boss n'existe
+        plus dans le catalogue sont supprimés.
+
+        Args:
+            catalog: Catalogue courant (templates des boss)
+        """
+        checkpoints = []
+        for filename in os.listdir(self.folder):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.folder, filename)
+            checkpoint = None
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                boss = catalog.bosses.get(data["combat"]["boss_id"])
+                if data.get("format") == CHECKPOINT_FORMAT_VERSION and boss is not None:
+                    checkpoint = CombatCheckpoint(
+                        combat=CombatState.from_dict(data["combat"], boss),
+                        skill_ids=list(data.get("skill_ids", [])),
+                        channel_id=data.get("channel_id", 0),
+                        message_id=data.get("message_id", 0),
+                        updated_at=data.get("updated_at", 0.0)
+                    )
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"⚠️ Combat illisible ignoré ({filename}): {e}")
+            if checkpoint is None:
+                os.remove(path)
+            else:
+                checkpoints.append(checkpoint)
+        return checkpoints
@@ -2,113 +2,266 @@
 Module de gestion des données persistantes (JSON).
 Gère la sauvegarde et le chargement des joueurs et objets.
 """
-import json
+import asyncio
+import heapq
 import os
-from typing import Dict, List, Optional
+import random
+import threading
+import weakref
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Set
 
 from models.item import Item, Pet, EquipmentSet
 from models.player import Player
-from models.combat import Boss, Skill, SkillType
+from models.combat import BossInstance, BossTemplate, Skill, SkillType
+from services.player_store import PlayerStore, JsonPlayerStore
+from services.journal_store import JournalPlayerStore
+from services.sharded_store import ShardedPlayerStore
+from services.catalog import Catalog, catalog_sources_stat, load_catalog
+from services.combat_store import CombatStore
+from services.rng import RngService
+from services.search import AutocompleteCache
+from services.stats import DerivedStats
+
+
+# Vue partagée d'un joueur vierge, retournée par peek_player pour les inconnus
+_DEFAULT_PLAYER_VIEW = Player(user_id=0)
 
 
 class DataManager:
     """Gestionnaire de données pour la persistance JSON."""
 
-    def __init__(self, data_folder: str = "data"):
+    STORAGE_BACKENDS = ("json", "journal", "sqlite", "sharded")
+
+    # Clés de tri des classements en mémoire (même ordre que les backends)
+    RANKING_KEYS = {
+        "coins": lambda p: p.coins,
+        "collection": lambda p: len(p.inventory),
+        "level": lambda p: (p.level, p.total_xp),
+        "bosses": lambda p: p.bosses_defeated,
+    }
+
+    def __init__(
+        self,
+        data_folder: str = "data",
+        storage: str = "json",
+        shard_count: int = 16,
+        write_behind: bool = False,
+        flush_interval: float = 5.0,
+        flush_threshold: int = 100,
+        lazy_loading: bool = False,
+        cache_size: int = 10000,
+        array_inventories: bool = False,
+        rng_seed: Optional[int] = None,
+        rng_nonce: Optional[int] = None
+    ):
         """
         Initialise le gestionnaire de données.
         
         Args:
             data_folder: Dossier contenant les fichiers de données
+            storage: Backend de persistance des joueurs ("json", "journal", "sqlite" ou "sharded")
+            shard_count: Nombre de partitions du backend "sharded"
+            write_behind: Regroupe les sauvegardes au lieu d'écrire à chaque appel
+            flush_interval: Intervalle (secondes) entre deux écritures groupées
+            flush_threshold: Nombre de joueurs modifiés déclenchant une écriture immédiate
+            lazy_loading: Charge les joueurs à la demande au lieu de tout charger au démarrage
+            cache_size: Nombre maximum de joueurs gardés en mémoire en chargement à la demande
+            array_inventories: Inventaires en tableaux de compteurs sur l'index dense des objets
+            rng_seed: Graine des tirages aléatoires (aléatoire si None), voir RngService
+            rng_nonce: Nonce de la session à rejouer (aléatoire si None), voir RngService
         """
         self.data_folder = data_folder
         self.players_file = os.path.join(data_folder, "players.json")
+        self.players_db = os.path.join(data_folder, "players.db")
+        self.players_shards_folder = os.path.join(data_folder, "players")
+        self.shard_count = shard_count
         self.items_file = os.path.join(data_folder, "items.json")
         self.pets_file = os.path.join(data_folder, "pets.json")
         self.sets_file = os.path.join(data_folder, "sets.json")
         self.bosses_file = os.path.join(data_folder, "bosses.json")
         self.skills_file = os.path.join(data_folder, "skills.json")
+        self.combats_folder = os.path.join(data_folder, "combats")
         
         self._ensure_data_folder()
-        self._items_cache: Dict[str, Item] = {}
-        self._players_cache: Dict[int, Player] = {}
-        self._pets_cache: Dict[str, Pet] = {}
-        self._sets_cache: Dict[str, EquipmentSet] = {}
-        self._bosses_cache: Dict[str, Boss] = {}
-        self._skills_cache: Dict[str, Skill] = {}
-        self._egg_cost: int = 5000
-        self._egg_drop_rates: Dict[str, float] = {}
+        self._store = self._create_store(storage)
+        if lazy_loading and not self._store.supports_lazy_loading:
+            raise ValueError(f"Le backend {storage!r} ne supporte pas le chargement à la demande")
+        self.lazy_loading = lazy_loading
+        self.cache_size = cache_size
+        self.array_inventories = array_inventories
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._dirty_players: Dict[int, Player] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Thread unique dédié aux écritures : conserve l'ordre des sauvegardes
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="players-writer")
+        # Joueurs dont une écriture est encore en file : ils ne doivent pas être évincés
+        self._inflight_writes: Counter = Counter()
+        self._inflight_lock = threading.Lock()
+        # En chargement à la demande : LRU des joueurs résidents (les plus récents à la fin)
+        self._players_cache: "OrderedDict[int, Player]" = OrderedDict()
+        # Joueurs évincés encore référencés ailleurs (combat en cours...) : même objet rendu
+        self._evicted_players: "weakref.WeakValueDictionary[int, Player]" = weakref.WeakValueDictionary()
+        self._known_ids: Optional[Set[int]] = None
+        self.catalog: Catalog = Catalog()
+        # Flux aléatoires reproductibles par sous-système et par joueur
+        self.rng = RngService(rng_seed, rng_nonce)
+        # Choix d'autocomplétion par (commande, joueur, saisie), voir cached_autocomplete
+        self.autocomplete_cache = AutocompleteCache()
+        self._catalog_watch_task: Optional[asyncio.Task] = None
+        self._catalog_reload_lock: Optional[asyncio.Lock] = None
+        # Combats en cours, sauvegardés à chaque tour
+        self.combat_store = CombatStore(self.combats_folder)
         
-        self._load_items()
+        self._load_catalog()
         self._load_players()
-        self._load_pets()
-        self._load_sets()
-        self._load_bosses()
-        self._load_skills()
 
     def _ensure_data_folder(self) -> None:
         """Crée le dossier de données s'il n'existe pas."""
         if not os.path.exists(self.data_folder):
             os.makedirs(self.data_folder)
 
-    # ==================== GESTION DES OBJETS ====================
+    def _create_store(self, storage: str) -> PlayerStore:
+        """Instancie le backend de persistance des joueurs."""
+        if storage == "json":
+            return JsonPlayerStore(self.players_file)
+        if storage == "journal":
+            return JournalPlayerStore(self.players_file)
+        if storage == "sqlite":
+            from services.sqlite_store import SqlitePlayerStore
+            return SqlitePlayerStore(self.players_db, legacy_json_path=self.players_file)
+        if storage == "sharded":
+            return ShardedPlayerStore(
+                self.players_shards_folder,
+                shard_count=self.shard_count,
+                legacy_json_path=self.players_file
+            )
+        raise ValueError(
+            f"Backend de stockage inconnu: {storage!r} "
+            f"(attendu: {', '.join(self.STORAGE_BACKENDS)})"
+        )
 
-    def _load_items(self) -> None:
-        """Charge les objets depuis le fichier JSON."""
-        if os.path.exists(self.items_file):
-            with open(self.items_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for item_data in data.get("items", []):
-                    item = Item.from_dict(item_data)
-                    self._items_cache[item.item_id] = item
+    # ==================== CATALOGUE ====================
+
+    def _load_catalog(self) -> None:
+        """
+        Charge le catalogue (objets, pets, sets, boss, skills) depuis le
+        snapshot compilé, reconstruit automatiquement si un JSON a changé.
+        """
+        self._apply_catalog(load_catalog(self.data_folder))
+
+    def _apply_catalog(self, catalog: Catalog) -> None:
+        """Publie une nouvelle version du catalogue (simple réaffectation, donc atomique)."""
+        catalog.version = self.catalog.version + 1
+        self.catalog = catalog
+        self._items_cache = catalog.items
+        self._pets_cache = catalog.pets
+        self._sets_cache = catalog.sets
+        self._bosses_cache = catalog.bosses
+        self._skills_cache = catalog.skills
+
+    async def reload_catalog(self) -> bool:
+        """
+        Reconstruit le catalogue hors de la boucle d'événements puis le publie.
+        Ceux qui ont gardé une référence à l'ancienne version (combats en
+        cours...) continuent de l'utiliser.
+
+        Returns:
+            True si une nouvelle version a été publiée, False si rien n'a changé
+        """
+        if self._catalog_reload_lock is None:
+            self._catalog_reload_lock = asyncio.Lock()
+        async with self._catalog_reload_lock:
+            loop = asyncio.get_running_loop()
+            catalog = await loop.run_in_executor(None, load_catalog, self.data_folder)
+            if catalog.fingerprint == self.catalog.fingerprint:
+                return False
+            self._apply_catalog(catalog)
+            return True
+
+    def start_catalog_watch(self, interval: float) -> None:
+        """Surveille les fichiers du catalogue et le recharge quand ils changent."""
+        if interval > 0 and self._catalog_watch_task is None:
+            signature = catalog_sources_stat(self.data_folder)
+            self._catalog_watch_task = asyncio.get_running_loop().create_task(
+                self._catalog_watch_loop(interval, signature)
+            )
+
+    async def _catalog_watch_loop(self, interval: float, signature: tuple) -> None:
+        """Compare périodiquement la taille et la date des fichiers sources."""
+        while True:
+            await asyncio.sleep(interval)
+            current = catalog_sources_stat(self.data_folder)
+            if current == signature:
+                continue
+            signature = current
+            try:
+                if await self.reload_catalog():
+                    print(f"📦 Catalogue rechargé (version {self.catalog.version})")
+            except Exception as e:
+                # JSON en cours d'édition ou invalide : on garde la version actuelle
+                print(f"⚠️ Rechargement du catalogue impossible: {e}")
+
+    # ==================== GESTION DES OBJETS ====================
 
     def get_item(self, item_id: str) -> Optional[Item]:
         """Récupère un objet par son ID."""
         return self._items_cache.get(item_id)
 
+    def find_item_by_name(
+        self, name: str, owned: Optional[Mapping] = None, partial: bool = False
+    ) -> Optional[Item]:
+        """
+        Résout un nom d'objet saisi (casse et accents ignorés).
+
+        Args:
+            name: Nom saisi
+            owned: Inventaire auquel restreindre la recherche
+            partial: Accepte aussi un nom contenant la saisie
+        """
+        accept = None if owned is None else owned.__contains__
+        item_id = self.catalog.item_names.resolve(name, accept=accept, partial=partial)
+        return self._items_cache.get(item_id) if item_id else None
+
     def get_all_items(self) -> List[Item]:
         """Retourne la liste de tous les objets."""
         return list(self._items_cache.values())
 
     # ==================== GESTION DES PETS ====================
 
-    def _load_pets(self) -> None:
-        """Charge les pets depuis le fichier JSON."""
-        if os.path.exists(self.pets_file):
-            with open(self.pets_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self._egg_cost = data.get("egg_cost", 5000)
-                self._egg_drop_rates = data.get("egg_drop_rates", {})
-                for pet_data in data.get("pets", []):
-                    pet = Pet.from_dict(pet_data)
-                    self._pets_cache[pet.pet_id] = pet
-
     def get_pet(self, pet_id: str) -> Optional[Pet]:
         """Récupère un pet par son ID."""
         return self._pets_cache.get(pet_id)
 
+    def get_pet_by_name(self, name: str) -> Optional[Pet]:
+        """Récupère un pet par son nom (exact, puis partiel)."""
+        pet_id = self.catalog.pet_names.resolve(name, partial=True)
+        return self._pets_cache.get(pet_id) if pet_id else None
+
     def get_all_pets(self) -> List[Pet]:
         """Retourne la liste de tous les pets."""
         return list(self._pets_cache.values())
 
     def get_egg_cost(self) -> int:
         """Retourne le coût d'un œuf."""
-        return self._egg_cost
+        return self.catalog.egg_cost
 
     def get_egg_drop_rates(self) -> Dict[str, float]:
         """Retourne les taux de drop des œufs."""
-        return self._egg_drop_rates
+        return self.catalog.egg_drop_rates
 
-    # ==================== GESTION DES SETS ====================
+    def draw_egg_pet(self, rng: random.Random = random) -> Pet:
+        """Tire le pet d'un œuf selon les taux de drop (table d'alias précalculée) dans rng."""
+        sampler = self.catalog.egg_sampler
+        if sampler is None:
+            raise IndexError("Aucun pet dans le catalogue")
+        return sampler.sample(rng)
 
-    def _load_sets(self) -> None:
-        """Charge les sets d'équipement depuis le fichier JSON."""
-        if os.path.exists(self.sets_file):
-            with open(self.sets_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for set_data in data.get("sets", []):
-                    equipment_set = EquipmentSet.from_dict(set_data)
-                    self._sets_cache[equipment_set.set_id] = equipment_set
+    # ==================== GESTION DES SETS ====================
 
     def get_set(self, set_id: str) -> Optional[EquipmentSet]:
         """Récupère un set par son ID."""
@@ -118,206 +271,336 @@ class DataManager:
         """Retourne la liste de tous les sets."""
         return list(self._sets_cache.values())
 
+    def derived_stats(self, player: Player) -> DerivedStats:
+        """
+        Stats dérivées de l'équipement et du pet équipé d'un joueur.
+        Mémorisées par le catalogue : recalculées seulement quand l'équipement change.
+        """
+        return self.catalog.derived_stats(player)
+
     def get_equipped_set_pieces(self, player: Player) -> Dict[str, int]:
         """
         Compte le nombre de pièces équipées par set.
-        Retourne un dict {set_id: nombre_de_pièces}.
+        Retourne un dict {set_id: nombre_de_pièces} (partagé : lecture seule).
         """
-        set_counts: Dict[str, int] = {}
-        for item_id in player.get_equipped_items():
-            item = self.get_item(item_id)
-            if item and item.set_id:
-                set_counts[item.set_id] = set_counts.get(item.set_id, 0) + 1
-        return set_counts
+        return self.catalog.derived_stats(player).set_pieces
 
     def get_set_bonuses(self, player: Player) -> Dict[str, dict]:
         """
         Calcule les bonus de set actifs pour un joueur.
-        Retourne un dict {set_id: bonus_actif}.
+        Retourne un dict {set_id: bonus_actif} (partagé : lecture seule).
         """
-        set_pieces = self.get_equipped_set_pieces(player)
-        active_bonuses: Dict[str, dict] = {}
-        
-        for set_id, count in set_pieces.items():
-            equipment_set = self.get_set(set_id)
-            if equipment_set:
-                if count >= 4:
-                    active_bonuses[set_id] = {
-                        "set_name": equipment_set.name,
-                        "pieces": count,
-                        "bonus": equipment_set.bonus_4
-                    }
-                elif count >= 2:
-                    active_bonuses[set_id] = {
-                        "set_name": equipment_set.name,
-                        "pieces": count,
-                        "bonus": equipment_set.bonus_2
-                    }
-        
-        return active_bonuses
+        return self.catalog.derived_stats(player).set_bonuses
 
     def calculate_total_drop_bonus(self, player: Player) -> float:
         """
         Calcule le bonus total de taux de drop pour un joueur.
         Inclut: pet équipé + bonus de sets.
         """
-        total_bonus = 0.0
-        
-        # Bonus du pet équipé
-        if player.equipped_pet:
-            pet = self.get_pet(player.equipped_pet)
-            if pet:
-                total_bonus += pet.drop_bonus
-        
-        # Bonus des sets
-        set_bonuses = self.get_set_bonuses(player)
-        for set_id, bonus_info in set_bonuses.items():
-            bonus = bonus_info.get("bonus", {})
-            total_bonus += bonus.get("drop_bonus", 0.0)
-        
-        return total_bonus
+        return self.catalog.derived_stats(player).drop_bonus
 
     def calculate_total_coin_bonus(self, player: Player) -> float:
         """
         Calcule le bonus total de pièces pour un joueur.
         Inclut: bonus de sets.
         """
-        total_bonus = 0.0
-        
-        # Bonus des sets
-        set_bonuses = self.get_set_bonuses(player)
-        for set_id, bonus_info in set_bonuses.items():
-            bonus = bonus_info.get("bonus", {})
-            total_bonus += bonus.get("coin_bonus", 0.0)
-        
-        return total_bonus
+        return self.catalog.derived_stats(player).coin_bonus
 
     # ==================== GESTION DES JOUEURS ====================
 
     def _load_players(self) -> None:
-        """Charge les joueurs depuis le fichier JSON."""
-        if os.path.exists(self.players_file):
-            with open(self.players_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for player_data in data.get("players", []):
-                    player = Player.from_dict(player_data)
-                    self._players_cache[player.user_id] = player
-
-    def _save_players(self) -> None:
-        """Sauvegarde tous les joueurs dans le fichier JSON."""
-        players_data = {
-            "players": [player.to_dict() for player in self._players_cache.values()]
-        }
-        with open(self.players_file, 'w', encoding='utf-8') as f:
-            json.dump(players_data, f, ensure_ascii=False, indent=2)
+        """
+        Charge les joueurs depuis le backend de persistance.
+        En chargement à la demande, seul l'index des user_id est chargé.
+        """
+        if self.lazy_loading:
+            self._known_ids = self._store.open_lazy()
+            return
+        for player_data in self._store.load():
+            player = Player.from_dict(player_data, array_inventory=self.array_inventories)
+            self._players_cache[player.user_id] = player
+
+    def _save_players(self, players: Optional[List[Player]] = None) -> Future:
+        """
+        Sauvegarde des joueurs via le backend de persistance.
+        Sans argument, tous les joueurs en mémoire sont sauvegardés.
+
+        Un snapshot des joueurs est pris immédiatement, puis la sérialisation
+        et l'écriture sont faites par le thread d'écriture. Depuis la boucle
+        asyncio l'appel ne bloque pas ; hors boucle il attend la fin de l'écriture.
+        """
+        if players is None:
+            players = list(self._players_cache.values())
+        records = [player.to_dict() for player in players]
+        user_ids = [record["user_id"] for record in records]
+        with self._inflight_lock:
+            self._inflight_writes.update(user_ids)
+
+        future = self._writer.submit(self._store.save, records)
+        future.add_done_callback(self._report_write_error)
+        future.add_done_callback(lambda _: self._release_inflight(user_ids))
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            future.result()
+        return future
+
+    def _release_inflight(self, user_ids: List[int]) -> None:
+        """Marque les écritures de ces joueurs comme terminées."""
+        with self._inflight_lock:
+            self._inflight_writes.subtract(user_ids)
+            for user_id in user_ids:
+                if self._inflight_writes[user_id] <= 0:
+                    del self._inflight_writes[user_id]
+
+    @staticmethod
+    def _report_write_error(future: Future) -> None:
+        """Affiche les erreurs survenues dans le thread d'écriture."""
+        if not future.cancelled() and future.exception() is not None:
+            print(f"❌ Erreur lors de la sauvegarde des joueurs: {future.exception()}")
+
+    async def wait_for_writes(self) -> None:
+        """Attend que toutes les écritures déjà soumises soient terminées."""
+        await asyncio.wrap_future(self._writer.submit(lambda: None))
 
     def get_player(self, user_id: int) -> Player:
         """
         Récupère un joueur par son ID Discord.
-        Crée un nouveau joueur si inexistant.
+        Crée un nouveau joueur si inexistant ; il n'est persisté qu'au
+        premier save_player, c'est-à-dire quand une commande le modifie.
         """
-        if user_id not in self._players_cache:
-            self._players_cache[user_id] = Player(user_id=user_id)
-            self._save_players()
-        return self._players_cache[user_id]
+        player = self._lookup_player(user_id)
+        if player is None:
+            player = Player.from_dict({"user_id": user_id}, array_inventory=self.array_inventories)
+            self._remember(player)
+        return player
 
-    def save_player(self, player: Player) -> None:
-        """Sauvegarde un joueur spécifique."""
+    def peek_player(self, user_id: int) -> Player:
+        """
+        Récupère un joueur en lecture seule (autocomplétions, affichages).
+        Pour un joueur inconnu, retourne une vue par défaut partagée sans
+        rien créer ni écrire : l'objet retourné ne doit jamais être modifié.
+        """
+        player = self._lookup_player(user_id)
+        return player if player is not None else _DEFAULT_PLAYER_VIEW
+
+    def _lookup_player(self, user_id: int) -> Optional[Player]:
+        """
+        Retourne un joueur existant sans le créer.
+        En chargement à la demande, le matérialise depuis le backend si besoin.
+        """
+        player = self._players_cache.get(user_id)
+        if player is not None:
+            if self.lazy_loading:
+                self._players_cache.move_to_end(user_id)
+            return player
+        if not self.lazy_loading:
+            return None
+
+        player = self._evicted_players.get(user_id)
+        if player is None:
+            if self._known_ids is not None and user_id not in self._known_ids:
+                return None
+            record = self._store.load_one(user_id)
+            if record is None:
+                return None
+            player = Player.from_dict(record, array_inventory=self.array_inventories)
+        self._remember(player)
+        return player
+
+    def _remember(self, player: Player) -> None:
+        """Place un joueur dans le cache (en tête du LRU en chargement à la demande)."""
         self._players_cache[player.user_id] = player
-        self._save_players()
+        if not self.lazy_loading:
+            return
+        self._players_cache.move_to_end(player.user_id)
+        if self._known_ids is not None:
+            self._known_ids.add(player.user_id)
+        self._evict_cold_players()
+
+    def _evict_cold_players(self) -> None:
+        """Évince les joueurs les moins récemment utilisés qui n'ont rien à écrire."""
+        excess = len(self._players_cache) - self.cache_size
+        if excess <= 0:
+            return
+
+        with self._inflight_lock:
+            busy = set(self._inflight_writes)
+        victims = []
+        for user_id in self._players_cache:
+            if user_id in self._dirty_players or user_id in busy:
+                continue
+            victims.append(user_id)
+            if len(victims) >= excess:
+                break
+
+        for user_id in victims:
+            self._evicted_players[user_id] = self._players_cache.pop(user_id)
+
+    def save_player(self, player: Player) -> None:
+        """
+        Sauvegarde un joueur spécifique.
+        En mode write-behind, le joueur est seulement marqué comme modifié
+        et sera écrit lors du prochain flush.
+        """
+        self._remember(player)
+        if not self.write_behind:
+            self._save_players([player])
+            return
+
+        self._dirty_players[player.user_id] = player
+        if len(self._dirty_players) >= self.flush_threshold:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Écrit immédiatement tous les joueurs modifiés en attente.
+        Retourne le nombre de joueurs écrits.
+        """
+        if not self._dirty_players:
+            return 0
+        players = list(self._dirty_players.values())
+        self._dirty_players.clear()
+        self._save_players(players)
+        return len(players)
+
+    def get_pending_saves(self) -> int:
+        """Retourne le nombre de joueurs modifiés pas encore écrits."""
+        return len(self._dirty_players)
+
+    def start_write_behind(self) -> None:
+        """Lance la tâche de flush périodique (à appeler depuis la boucle asyncio)."""
+        if self.write_behind and self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """Écrit les joueurs modifiés à intervalle régulier."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Erreur lors de la sauvegarde groupée: {e}")
 
     def save_all(self) -> None:
         """Sauvegarde toutes les données."""
+        self._dirty_players.clear()
         self._save_players()
 
+    def close(self) -> None:
+        """Sauvegarde tout puis ferme le backend de persistance."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._catalog_watch_task is not None:
+            self._catalog_watch_task.cancel()
+            self._catalog_watch_task = None
+        self.save_all()
+        self._writer.shutdown(wait=True)
+        self._store.close()
+
     # ==================== STATISTIQUES ====================
 
-    def get_leaderboard(self, limit: int = 10) -> List[Player]:
+    async def _get_ranking(self, ranking: str, limit: int) -> List[Player]:
+        """
+        Retourne les meilleurs joueurs d'un classement.
+        Le tri est délégué au backend s'il le supporte (requête indexée),
+        sinon il est fait en mémoire. En chargement à la demande, le parcours
+        de tous les joueurs persistés est fait par le thread d'écriture : il
+        voit les écritures déjà soumises et ne bloque pas la boucle asyncio.
+
+        Le backend ne connaît que les valeurs déjà écrites : les joueurs en
+        attente d'écriture (write-behind ou écriture en file) sont ajoutés
+        aux candidats et reclassés avec leurs valeurs en mémoire.
+        """
+        key = self.RANKING_KEYS[ranking]
+        pending = self._pending_user_ids()
+        user_ids = self._store.top_user_ids(ranking, limit + len(pending))
+        if user_ids is None and self.lazy_loading:
+            residents = dict(self._players_cache)
+            user_ids = await asyncio.wrap_future(self._writer.submit(
+                lambda: [p.user_id for p in heapq.nlargest(limit, self._iter_all_players(residents), key=key)]
+            ))
+        if user_ids is None:
+            return sorted(self._players_cache.values(), key=key, reverse=True)[:limit]
+
+        candidates = dict.fromkeys(user_ids)
+        candidates.update(dict.fromkeys(pending))
+        players = [self._lookup_player(uid) for uid in candidates]
+        return heapq.nlargest(limit, (player for player in players if player is not None), key=key)
+
+    def _pending_user_ids(self) -> List[int]:
+        """IDs des joueurs modifiés dont la dernière version n'est pas encore écrite."""
+        with self._inflight_lock:
+            pending = dict.fromkeys(self._inflight_writes)
+        pending.update(dict.fromkeys(self._dirty_players))
+        return list(pending)
+
+    def _iter_all_players(self, residents: Dict[int, Player]):
+        """
+        Parcourt tous les joueurs (résidents ou seulement persistés) sans
+        les ajouter au cache. Les joueurs résidents font foi.
+
+        Args:
+            residents: Copie du cache des joueurs, prise sur la boucle asyncio
+        """
+        seen = set()
+        for record in self._store.iter_records():
+            user_id = record["user_id"]
+            seen.add(user_id)
+            yield residents.get(user_id) or Player.from_dict(record)
+        for user_id, player in residents.items():
+            if user_id not in seen:
+                yield player
+
+    async def get_leaderboard(self, limit: int = 10) -> List[Player]:
         """Retourne le classement des joueurs par richesse."""
-        sorted_players = sorted(
-            self._players_cache.values(),
-            key=lambda p: p.coins,
-            reverse=True
-        )
-        return sorted_players[:limit]
+        return await self._get_ranking("coins", limit)
 
-    def get_collection_leaderboard(self, limit: int = 10) -> List[Player]:
+    async def get_collection_leaderboard(self, limit: int = 10) -> List[Player]:
         """Retourne le classement par nombre d'objets uniques."""
-        sorted_players = sorted(
-            self._players_cache.values(),
-            key=lambda p: len(p.inventory),
-            reverse=True
-        )
-        return sorted_players[:limit]
+        return await self._get_ranking("collection", limit)
+
+    async def get_level_leaderboard(self, limit: int = 10) -> List[Player]:
+        """Retourne le classement par niveau (puis XP totale)."""
+        return await self._get_ranking("level", limit)
+
+    async def get_boss_leaderboard(self, limit: int = 10) -> List[Player]:
+        """Retourne le classement par nombre de boss vaincus."""
+        return await self._get_ranking("bosses", limit)
 
     # ==================== GESTION DES BOSS ====================
 
-    def _load_bosses(self) -> None:
-        """Charge les boss depuis le fichier JSON."""
-        if os.path.exists(self.bosses_file):
-            with open(self.bosses_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for boss_data in data.get("bosses", []):
-                    boss = Boss.from_dict(boss_data)
-                    self._bosses_cache[boss.boss_id] = boss
-
-    def get_boss(self, boss_id: str) -> Optional[Boss]:
-        """Récupère un boss par son ID."""
-        boss = self._bosses_cache.get(boss_id)
-        if boss:
-            # Retourner une copie pour ne pas modifier le cache
-            import copy
-            return copy.deepcopy(boss)
+    def get_boss(self, boss_id: str) -> Optional[BossInstance]:
+        """Crée un boss prêt à combattre à partir de son ID (template partagé, état neuf)."""
+        template = self._bosses_cache.get(boss_id)
+        if template:
+            return template.spawn()
         return None
 
-    def get_boss_by_name(self, name: str) -> Optional[Boss]:
-        """Récupère un boss par son nom (recherche partielle)."""
-        import copy
-        for boss in self._bosses_cache.values():
-            if boss.name.lower() == name.lower():
-                return copy.deepcopy(boss)
-        # Recherche partielle
-        for boss in self._bosses_cache.values():
-            if name.lower() in boss.name.lower():
-                return copy.deepcopy(boss)
+    def get_boss_by_name(self, name: str) -> Optional[BossInstance]:
+        """Crée un boss prêt à combattre par son nom (exact, puis partiel ; casse et accents ignorés)."""
+        boss_id = self.catalog.boss_names.resolve(name, partial=True)
+        if boss_id:
+            return self._bosses_cache[boss_id].spawn()
         return None
 
-    def get_all_bosses(self) -> List[Boss]:
+    def get_all_bosses(self) -> List[BossTemplate]:
         """Retourne la liste de tous les boss."""
-        return sorted(
-            self._bosses_cache.values(),
-            key=lambda b: b.level_required
-        )
+        return list(self.catalog.bosses_by_level)
 
     # ==================== GESTION DES SKILLS ====================
 
-    def _load_skills(self) -> None:
-        """Charge les skills depuis le fichier JSON."""
-        if os.path.exists(self.skills_file):
-            with open(self.skills_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for skill_data in data.get("skills", []):
-                    skill = Skill.from_dict(skill_data)
-                    self._skills_cache[skill.skill_id] = skill
-
     def get_skill(self, skill_id: str) -> Optional[Skill]:
         """Récupère un skill par son ID."""
         return self._skills_cache.get(skill_id)
 
     def get_skill_by_name(self, name: str) -> Optional[Skill]:
-        """Récupère un skill par son nom (recherche partielle)."""
-        for skill in self._skills_cache.values():
-            if skill.name.lower() == name.lower():
-                return skill
-        # Recherche partielle
-        for skill in self._skills_cache.values():
-            if name.lower() in skill.name.lower():
-                return skill
-        return None
+        """Récupère un skill par son nom (exact, puis partiel ; casse et accents ignorés)."""
+        skill_id = self.catalog.skill_names.resolve(name, partial=True)
+        return self._skills_cache.get(skill_id) if skill_id else None
 
     def get_all_skills(self) -> List[Skill]:
         """Retourne la liste de tous les skills."""
-        return sorted(
-            self._skills_cache.values(),
-            key=lambda s: s.level_required
-        )
+        return list(self.catalog.skills_by_level)
@@ -0,0 +1,101 @@
+"""
+Règles d'économie partagées par les cogs et les outils hors ligne
+(ventes, récompenses de boss). Aucune dépendance à Discord.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Iterable, List, Tuple, Union
+
+from models.item import Item
+from models.player import Player
+from models.combat import BossInstance, BossTemplate
+
+
+@dataclass(slots=True)
+class SaleResult:
+    """Résultat d'une vente."""
+    items: int = 0  # Objets vendus
+    base_coins: int = 0  # Valeur des objets
+    bonus_coins: int = 0  # Bonus de vente (sets)
+
+    @property
+    def total_coins(self) -> int:
+        return self.base_coins + self.bonus_coins
+
+
+@dataclass(slots=True)
+class VictoryRewards:
+    """Récompenses d'une victoire contre un boss."""
+    xp: int
+    coins: int
+    xp_bonus: float  # Bonus d'équipement appliqués
+    coin_bonus: float
+    levels_gained: List[int] = field(default_factory=list)
+    drops: List[Item] = field(default_factory=list)  # Objets obtenus connus du catalogue
+
+
+def sell_items(player: Player, entries: Iterable[Tuple[Item, int]], coin_bonus: float) -> SaleResult:
+    """
+    Vend des objets de l'inventaire et crédite le joueur.
+    Le bonus de vente s'applique une fois sur la valeur totale.
+
+    Args:
+        player: Vendeur
+        entries: Couples (objet, quantité)
+        coin_bonus: Bonus de pièces des sets (voir calculate_total_coin_bonus)
+    """
+    result = SaleResult()
+    for item, quantity in entries:
+        if player.remove_item(item.item_id, quantity):
+            result.items += quantity
+            result.base_coins += item.value * quantity
+    result.bonus_coins = int(result.base_coins * coin_bonus)
+    player.add_coins(result.total_coins)
+    player.total_items_sold += result.items
+    return result
+
+
+def apply_victory_rewards(
+    player: Player, boss: Union[BossInstance, BossTemplate], catalog, rng: random.Random = random
+) -> VictoryRewards:
+    """
+    Crédite XP, pièces, compteurs de kills et butin d'une victoire.
+
+    Args:
+        player: Vainqueur
+        boss: BossInstance ou BossTemplate vaincu
+        catalog: Version du catalogue du combat (stats d'équipement, objets)
+        rng: Flux aléatoire du combat (tirage du butin)
+    """
+    # Mettre à jour les stats d'équipement
+    player.update_equipment_stats(catalog)
+
+    # Calculer les récompenses avec bonus d'équipement
+    xp_bonus = player.get_xp_bonus()
+    coin_bonus = player.get_coin_bonus()
+    rewards = VictoryRewards(
+        xp=int(boss.xp_reward * (1 + xp_bonus)),
+        coins=int(boss.coins_reward * (1 + coin_bonus)),
+        xp_bonus=xp_bonus,
+        coin_bonus=coin_bonus
+    )
+
+    rewards.levels_gained = player.add_xp(rewards.xp)
+    player.add_coins(rewards.coins)
+    player.bosses_defeated += 1
+    player.bosses_kills[boss.boss_id] = player.bosses_kills.get(boss.boss_id, 0) + 1
+
+    for item_id in boss.guaranteed_drops:
+        player.add_item(item_id, 1)
+        item = catalog.get_item(item_id)
+        if item:
+            rewards.drops.append(item)
+
+    for item_id, chance in boss.drop_items.items():
+        if rng.random() < chance:
+            player.add_item(item_id, 1)
+            item = catalog.get_item(item_id)
+            if item:
+                rewards.drops.append(item)
+
+    return rewards
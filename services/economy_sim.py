@@ -0,0 +1,348 @@
+"""
+Simulateur Monte Carlo de l'économie, hors ligne.
+Fait jouer des joueurs simulés jour après jour avec le vrai code du jeu
+(Player, Chest, ventes, récompenses de boss, tirage des œufs) et mesure
+l'évolution de la masse monétaire, le temps avant le premier objet
+mythique et la concentration du classement. Les joueurs sont répartis
+par paquets sur un pool de processus ; chaque joueur a son propre flux
+aléatoire, donc les résultats ne dépendent pas du nombre de processus.
+
+Usage:
+    python -m services.economy_sim --players 20000 --days 56 --seed 1
+    python -m services.economy_sim --chest-cost 5000 --drop-rate MYTHIC=0.001
+"""
+import argparse
+import dataclasses
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from models.chest import Chest
+from models.item import Rarity
+from models.player import Player
+from services.catalog import Catalog, load_catalog
+from services.economy import apply_victory_rewards, sell_items
+from services.rng import derive_seed
+
+
+# Raretés vendues par défaut : tout ce qui est au plus Rare
+_SELL_ORDER = [Rarity.NORMAL, Rarity.RARE, Rarity.EPIC, Rarity.LEGENDARY, Rarity.MYTHIC]
+
+
+@dataclass
+class SimulationConfig:
+    """Paramètres d'une simulation (comportement des joueurs et scénario testé)."""
+    players: int = 1000
+    days: int = 28
+    seed: int = 0
+    workers: int = 0  # 0 = un processus par cœur
+    chunk_size: int = 250  # Joueurs par tâche du pool
+    data_folder: str = "data"
+
+    # Comportement des joueurs simulés
+    paid_chests: int = 0  # Coffres payants achetés par jour au maximum
+    eggs_per_day: int = 0  # Œufs achetés par jour au maximum
+    boss_fights: int = 1  # Combats de boss par jour (boss le plus fort débloqué)
+    boss_win_rate: float = 0.5
+    sell_up_to: str = "RARE"  # Vend chaque jour les objets de cette rareté et en dessous
+    reserve: int = 0  # Pièces gardées avant tout achat
+
+    # Scénario : valeurs du jeu remplacées pour la simulation
+    chest_cost: Optional[int] = None
+    egg_cost: Optional[int] = None
+    boss_coins_scale: float = 1.0
+    drop_rates: Dict[str, float] = field(default_factory=dict)  # Rareté -> taux de drop
+
+
+@dataclass
+class SimulationResult:
+    """Agrégats d'une simulation (additifs : un résultat par paquet, puis fusion)."""
+    days: int
+    supply: List[int]  # Pièces détenues par tous les joueurs en fin de journée
+    minted: List[int]  # Pièces créées dans la journée (ventes, boss)
+    spent: List[int]  # Pièces dépensées dans la journée (coffres payants, œufs)
+    mythic_days: List[int] = field(default_factory=list)  # Jour du premier mythique (-1 = jamais)
+    final_coins: List[int] = field(default_factory=list)
+
+    @classmethod
+    def empty(cls, days: int) -> "SimulationResult":
+        return cls(days, [0] * days, [0] * days, [0] * days)
+
+    def merge(self, other: "SimulationResult") -> None:
+        for mine, theirs in ((self.supply, other.supply), (self.minted, other.minted), (self.spent, other.spent)):
+            for day, value in enumerate(theirs):
+                mine[day] += value
+        self.mythic_days.extend(other.mythic_days)
+        self.final_coins.extend(other.final_coins)
+
+
+# Scénario appliqué dans ce processus du pool : (clé du scénario, catalogue)
+_WORKER_SCENARIO: Optional[Tuple[tuple, Catalog]] = None
+
+
+def _scenario_key(config: SimulationConfig) -> tuple:
+    """Champs de la configuration qui modifient les valeurs du jeu."""
+    return (
+        config.data_folder, config.chest_cost, config.egg_cost,
+        config.boss_coins_scale, tuple(sorted(config.drop_rates.items()))
+    )
+
+
+def _init_worker(config: SimulationConfig) -> None:
+    """
+    Initialise un processus du pool : applique le scénario, y compris les
+    valeurs globales du jeu (taux de drop, coût des coffres), puis charge
+    le catalogue. N'est jamais appelé dans le processus parent.
+    """
+    global _WORKER_SCENARIO
+    for rarity_name, rate in config.drop_rates.items():
+        Rarity[rarity_name].drop_rate = rate
+    if config.chest_cost is not None:
+        Player.CHEST_COST = config.chest_cost
+    catalog = load_catalog(config.data_folder)
+    if config.egg_cost is not None:
+        catalog.egg_cost = config.egg_cost
+    if config.boss_coins_scale != 1.0:
+        for template in catalog.bosses_by_level:
+            scaled = dataclasses.replace(
+                template, coins_reward=int(template.coins_reward * config.boss_coins_scale)
+            )
+            catalog.bosses[template.boss_id] = scaled
+        catalog.bosses_by_level = sorted(catalog.bosses.values(), key=lambda b: b.level_required)
+    _WORKER_SCENARIO = (_scenario_key(config), catalog)
+
+
+def simulate_players(config: SimulationConfig, first_player: int, count: int) -> SimulationResult:
+    """
+    Simule `count` joueurs (numéros first_player...) sur toute la durée.
+    À appeler dans un processus initialisé par _init_worker (voir run_simulation).
+    """
+    if _WORKER_SCENARIO is None or _WORKER_SCENARIO[0] != _scenario_key(config):
+        raise RuntimeError("Scénario non appliqué dans ce processus, passer par run_simulation")
+    catalog = _WORKER_SCENARIO[1]
+    chest = Chest(list(catalog.items.values()))
+    sold_rarities = _SELL_ORDER[:_SELL_ORDER.index(Rarity[config.sell_up_to]) + 1]
+    bosses = catalog.bosses_by_level
+    today = date.today().isoformat()
+    result = SimulationResult.empty(config.days)
+
+    for number in range(first_player, first_player + count):
+        rng = random.Random(derive_seed(config.seed, "player", number))
+        player = Player(user_id=number)
+        mythic_day = -1
+
+        for day in range(config.days):
+            # Nouvelle journée : coffres gratuits remis à zéro
+            player.daily_chests_opened = 0
+            player.last_chest_date = today
+            minted = spent = 0
+
+            # Coffres gratuits du jour en une fois (même effet que open_chest(paid=False) en boucle)
+            opened = player.get_remaining_free_chests()
+            player.daily_chests_opened += opened
+            player.total_chests_opened += opened
+            for _ in range(config.paid_chests):
+                if player.coins < player.CHEST_COST + config.reserve:
+                    break
+                player.open_chest(paid=True)
+                spent += player.CHEST_COST
+                opened += 1
+            obtained = chest.open_many(opened, catalog.derived_stats(player).drop_bonus, rng)
+            player.add_items(obtained)
+            if mythic_day < 0 and any(catalog.items[item_id].rarity is Rarity.MYTHIC for item_id in obtained):
+                mythic_day = day
+
+            for _ in range(config.eggs_per_day):
+                if catalog.egg_sampler is None or player.coins < catalog.egg_cost + config.reserve:
+                    break
+                player.coins -= catalog.egg_cost
+                player.eggs_opened += 1
+                spent += catalog.egg_cost
+                pet = catalog.egg_sampler.sample(rng)
+                player.add_pet(pet.pet_id)
+                # Garde le pet au meilleur bonus de drop
+                current = catalog.pets.get(player.equipped_pet) if player.equipped_pet else None
+                if current is None or pet.drop_bonus > current.drop_bonus:
+                    player.equip_pet(pet.pet_id)
+
+            for _ in range(config.boss_fights):
+                boss = None
+                for template in bosses:
+                    if template.level_required > player.level:
+                        break
+                    boss = template
+                if boss is None or rng.random() >= config.boss_win_rate:
+                    continue
+                rewards = apply_victory_rewards(player, boss, catalog, rng)
+                minted += rewards.coins
+                if mythic_day < 0 and any(item.rarity is Rarity.MYTHIC for item in rewards.drops):
+                    mythic_day = day
+
+            coin_bonus = catalog.derived_stats(player).coin_bonus
+            for rarity in sold_rarities:
+                entries = catalog.inventory_entries(player.inventory, rarity)
+                if entries:
+                    minted += sell_items(player, entries, coin_bonus).total_coins
+
+            result.supply[day] += player.coins
+            result.minted[day] += minted
+            result.spent[day] += spent
+
+        result.mythic_days.append(mythic_day)
+        result.final_coins.append(player.coins)
+    return result
+
+
+def _simulate_chunk(args) -> SimulationResult:
+    config, first_player, count = args
+    return simulate_players(config, first_player, count)
+
+
+def run_simulation(config: SimulationConfig) -> SimulationResult:
+    """
+    Répartit les joueurs par paquets sur un pool de processus et fusionne les résultats.
+    Le scénario n'est appliqué que dans les processus du pool (un seul si
+    workers=1) : les valeurs du jeu de l'appelant ne sont pas modifiées.
+    """
+    # Le snapshot du catalogue est écrit une fois ici plutôt que par chaque processus
+    load_catalog(config.data_folder)
+    chunks = [
+        (config, first, min(config.chunk_size, config.players - first))
+        for first in range(0, config.players, config.chunk_size)
+    ]
+    result = SimulationResult.empty(config.days)
+    workers = config.workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as pool:
+        for partial in pool.map(_simulate_chunk, chunks):
+            result.merge(partial)
+    return result
+
+
+# ==================== RAPPORT ====================
+
+def _percentile(sorted_values: Sequence[int], fraction: float) -> int:
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def gini(values: Sequence[int]) -> float:
+    """Coefficient de Gini (0 = égalité parfaite, 1 = un seul joueur détient tout)."""
+    ordered = sorted(values)
+    total = sum(ordered)
+    if not ordered or total <= 0:
+        return 0.0
+    weighted = sum((rank + 1) * value for rank, value in enumerate(ordered))
+    return (2 * weighted) / (len(ordered) * total) - (len(ordered) + 1) / len(ordered)
+
+
+def top_share(values: Sequence[int], fraction: float) -> float:
+    """Part des pièces détenue par les meilleurs `fraction` des joueurs."""
+    ordered = sorted(values, reverse=True)
+    total = sum(ordered)
+    if not ordered or total <= 0:
+        return 0.0
+    return sum(ordered[:max(1, int(len(ordered) * fraction))]) / total
+
+
+def format_report(config: SimulationConfig, result: SimulationResult, elapsed: float) -> str:
+    """Rapport texte : inflation, temps avant mythique, concentration du classement."""
+    players = max(1, config.players)
+    lines = [
+        f"📊 Simulation : {config.players} joueurs × {config.days} jours "
+        f"({config.players * config.days / max(elapsed, 1e-9):,.0f} joueurs-jours/s, {elapsed:.1f}s)",
+        "",
+        "💰 Masse monétaire",
+        f"{'Jour':>5} {'Total':>15} {'Moy./joueur':>12} {'Inflation':>10} {'Créé':>14} {'Dépensé':>14}",
+    ]
+    step = 7 if config.days > 14 else 1
+    previous = 0
+    for day in range(step - 1, config.days, step):
+        start = day - step + 1
+        supply = result.supply[day]
+        inflation = f"{(supply - previous) / previous * 100:+.1f}%" if previous else "-"
+        lines.append(
+            f"{day + 1:>5} {supply:>15,} {supply // players:>12,} {inflation:>10} "
+            f"{sum(result.minted[start:day + 1]):>14,} {sum(result.spent[start:day + 1]):>14,}"
+        )
+        previous = supply
+
+    reached = sorted(day + 1 for day in result.mythic_days if day >= 0)
+    lines += ["", "🟥 Premier objet mythique"]
+    lines.append(f"Obtenu par {len(reached) / players * 100:.1f}% des joueurs")
+    if reached:
+        lines.append(
+            f"Jour p10 {_percentile(reached, 0.1)} · médiane {_percentile(reached, 0.5)} · "
+            f"p90 {_percentile(reached, 0.9)}"
+        )
+
+    lines += [
+        "",
+        "🏆 Concentration du classement (pièces)",
+        f"Top 1% : {top_share(result.final_coins, 0.01) * 100:.1f}% · "
+        f"Top 10% : {top_share(result.final_coins, 0.10) * 100:.1f}% · "
+        f"Gini : {gini(result.final_coins):.3f}",
+    ]
+    return "\n".join(lines)
+
+
+def _parse_args(argv=None) -> Tuple[SimulationConfig, Optional[str]]:
+    parser = argparse.ArgumentParser(
+        prog="python -m services.economy_sim", description="Simulation Monte Carlo de l'économie"
+    )
+    defaults = SimulationConfig()
+    parser.add_argument("--players", type=int, default=defaults.players)
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--workers", type=int, default=defaults.workers, help="0 = un par cœur")
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size)
+    parser.add_argument("--data", dest="data_folder", default=defaults.data_folder)
+    parser.add_argument("--paid-chests", type=int, default=defaults.paid_chests)
+    parser.add_argument("--eggs-per-day", type=int, default=defaults.eggs_per_day)
+    parser.add_argument("--boss-fights", type=int, default=defaults.boss_fights)
+    parser.add_argument("--boss-win-rate", type=float, default=defaults.boss_win_rate)
+    parser.add_argument("--sell-up-to", choices=[r.name for r in _SELL_ORDER], default=defaults.sell_up_to)
+    parser.add_argument("--reserve", type=int, default=defaults.reserve)
+    parser.add_argument("--chest-cost", type=int)
+    parser.add_argument("--egg-cost", type=int)
+    parser.add_argument("--boss-coins-scale", type=float, default=defaults.boss_coins_scale)
+    parser.add_argument(
+        "--drop-rate", action="append", default=[], metavar="RARETE=TAUX",
+        help="Remplace un taux de drop des coffres (répétable), ex. MYTHIC=0.001"
+    )
+    parser.add_argument("--json", dest="json_path", help="Écrit aussi les courbes complètes en JSON")
+    args = parser.parse_args(argv)
+
+    drop_rates = {}
+    for entry in args.drop_rate:
+        name, _, rate = entry.partition("=")
+        if name.upper() not in Rarity.__members__:
+            parser.error(f"Rareté inconnue: {name}")
+        drop_rates[name.upper()] = float(rate)
+
+    config = SimulationConfig(
+        players=args.players, days=args.days, seed=args.seed, workers=args.workers,
+        chunk_size=args.chunk_size, data_folder=args.data_folder,
+        paid_chests=args.paid_chests, eggs_per_day=args.eggs_per_day,
+        boss_fights=args.boss_fights, boss_win_rate=args.boss_win_rate,
+        sell_up_to=args.sell_up_to, reserve=args.reserve,
+        chest_cost=args.chest_cost, egg_cost=args.egg_cost,
+        boss_coins_scale=args.boss_coins_scale, drop_rates=drop_rates
+    )
+    return config, args.json_path
+
+
+if __name__ == "__main__":
+    config, json_path = _parse_args()
+    started = time.perf_counter()
+    result = run_simulation(config)
+    elapsed = time.perf_counter() - started
+    print(format_report(config, result, elapsed))
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"config": dataclasses.asdict(config), "result": dataclasses.asdict(result)}, f)
+        print(f"\n✅ Courbes écrites dans {json_path}")
@@ -0,0 +1,180 @@
+"""
+Backend de persistance journalisé (write-ahead log).
+Chaque sauvegarde ajoute une ligne compacte au journal au lieu de réécrire
+tout players.json. Un compacteur en arrière-plan replie périodiquement le
+journal dans le snapshot.
+"""
+import copy
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from services.atomic_io import atomic_write_json
+from services.player_store import PlayerStore
+
+
+class JournalPlayerStore(PlayerStore):
+    """
+    Snapshot JSON + journal append-only de deltas par joueur.
+
+    Format d'une ligne du journal : {"u": user_id, "d": {champ: valeur}}
+    où "d" ne contient que les champs modifiés depuis la dernière écriture.
+    """
+
+    def __init__(self, snapshot_path: str, compact_threshold: int = 1000, fsync: bool = False):
+        """
+        Args:
+            snapshot_path: Chemin du snapshot (players.json)
+            compact_threshold: Nombre de lignes du journal déclenchant une compaction
+            fsync: Force la synchronisation disque après chaque ajout
+        """
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + ".journal"
+        self.compacting_path = self.journal_path + ".compacting"
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+
+        self._records: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self._journal = None
+        self._pending = 0
+
+        self._compact_requested = threading.Event()
+        self._stopping = False
+        self._compactor: Optional[threading.Thread] = None
+
+    # ==================== CHARGEMENT ====================
+
+    def load(self) -> List[dict]:
+        """Charge le snapshot puis rejoue la fin du journal."""
+        self._records = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for record in data.get("players", []):
+                self._records[record["user_id"]] = record
+
+        replayed = self._replay(self.compacting_path) + self._replay(self.journal_path)
+
+        # Une compaction interrompue ou un journal non vide : on repart d'un snapshot propre
+        if replayed or os.path.exists(self.compacting_path):
+            atomic_write_json(self.snapshot_path, {"players": list(self._records.values())})
+            for path in (self.compacting_path, self.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        self._open_journal()
+        self._start_compactor()
+        return [copy.deepcopy(record) for record in self._records.values()]
+
+    def _replay(self, path: str) -> int:
+        """Applique les deltas d'un fichier journal. Retourne le nombre de lignes rejouées."""
+        if not os.path.exists(path):
+            return 0
+
+        count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Dernière ligne tronquée par un crash : on l'ignore
+                    break
+                user_id = entry["u"]
+                record = self._records.get(user_id, {"user_id": user_id})
+                self._records[user_id] = {**record, **entry["d"]}
+                count += 1
+        return count
+
+    # ==================== ÉCRITURE ====================
+
+    def save(self, records: List[dict]) -> None:
+        """Ajoute un delta par joueur modifié à la fin du journal."""
+        with self._lock:
+            lines = []
+            for record in records:
+                user_id = record["user_id"]
+                previous = self._records.get(user_id, {})
+                delta = {
+                    key: value for key, value in record.items()
+                    if key not in previous or previous[key] != value
+                }
+                if not delta:
+                    continue
+
+                delta = copy.deepcopy(delta)
+                self._records[user_id] = {**previous, **delta}
+                lines.append(json.dumps(
+                    {"u": user_id, "d": delta},
+                    ensure_ascii=False, separators=(",", ":")
+                ))
+
+            if not lines:
+                return
+
+            self._journal.write("\n".join(lines) + "\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+
+            self._pending += len(lines)
+            if self._pending >= self.compact_threshold:
+                self._compact_requested.set()
+
+    def _open_journal(self) -> None:
+        """Ouvre le journal en mode ajout."""
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    # ==================== COMPACTION ====================
+
+    def _start_compactor(self) -> None:
+        """Démarre le thread de compaction en arrière-plan."""
+        if self._compactor is not None:
+            return
+        self._compactor = threading.Thread(
+            target=self._compactor_loop, name="players-journal-compactor", daemon=True
+        )
+        self._compactor.start()
+
+    def _compactor_loop(self) -> None:
+        """Attend les demandes de compaction et les exécute."""
+        while True:
+            self._compact_requested.wait()
+            self._compact_requested.clear()
+            if self._stopping:
+                return
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Replie le journal dans le snapshot.
+        Le journal courant est renommé pendant l'écriture du snapshot, de sorte
+        qu'un crash à n'importe quelle étape laisse un état rejouable.
+        """
+        with self._lock:
+            if self._pending == 0:
+                return
+            self._journal.close()
+            os.replace(self.journal_path, self.compacting_path)
+            self._open_journal()
+            self._pending = 0
+            snapshot = list(self._records.values())
+
+        atomic_write_json(self.snapshot_path, {"players": snapshot})
+        os.remove(self.compacting_path)
+
+    def close(self) -> None:
+        """Arrête le compacteur, compacte une dernière fois et ferme le journal."""
+        if self._compactor is not None:
+            self._stopping = True
+            self._compact_requested.set()
+            self._compactor.join()
+            self._compactor = None
+        if self._journal is not None:
+            self.compact()
+            self._journal.close()
+            self._journal = None
@@ -0,0 +1,82 @@
+"""
+Module définissant les backends de persistance des joueurs.
+Un backend reçoit des enregistrements (dictionnaires issus de Player.to_dict)
+et se charge de les écrire sur disque.
+"""
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Set
+
+from services.atomic_io import atomic_write_json
+
+
+class PlayerStore:
+    """Interface commune à tous les backends de persistance des joueurs."""
+
+    # Le backend sait-il lire un joueur isolé sans tout charger ?
+    supports_lazy_loading = False
+
+    def load(self) -> List[dict]:
+        """Charge tous les enregistrements de joueurs."""
+        raise NotImplementedError
+
+    def open_lazy(self) -> Optional[Set[int]]:
+        """
+        Prépare le backend pour un chargement à la demande.
+        Retourne l'index des user_id connus, ou None si le backend
+        n'en a pas besoin pour répondre à load_one.
+        """
+        raise NotImplementedError
+
+    def load_one(self, user_id: int) -> Optional[dict]:
+        """Charge un seul joueur (None s'il n'existe pas)."""
+        raise NotImplementedError
+
+    def iter_records(self) -> Iterator[dict]:
+        """Parcourt tous les joueurs persistés sans les garder en mémoire."""
+        raise NotImplementedError
+
+    def save(self, records: List[dict]) -> None:
+        """Persiste les enregistrements des joueurs modifiés."""
+        raise NotImplementedError
+
+    def top_user_ids(self, ranking: str, limit: int) -> Optional[List[int]]:
+        """
+        Retourne les IDs des meilleurs joueurs pour un classement.
+        None signifie que le backend ne sait pas trier lui-même.
+        """
+        return None
+
+    def close(self) -> None:
+        """Libère les ressources du backend."""
+
+
+class JsonPlayerStore(PlayerStore):
+    """
+    Backend historique : un seul fichier JSON réécrit à chaque sauvegarde.
+    L'écriture passe par un fichier temporaire renommé atomiquement.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Chemin du fichier players.json
+        """
+        self.path = path
+        self._records: Dict[int, dict] = {}
+
+    def load(self) -> List[dict]:
+        """Charge les joueurs depuis le fichier JSON."""
+        self._records = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for record in data.get("players", []):
+                self._records[record["user_id"]] = record
+        return list(self._records.values())
+
+    def save(self, records: List[dict]) -> None:
+        """Fusionne les enregistrements puis réécrit tout le fichier."""
+        for record in records:
+            self._records[record["user_id"]] = record
+        atomic_write_json(self.path, {"players": list(self._records.values())}, indent=2)
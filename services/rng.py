@@ -0,0 +1,62 @@
+"""
+Générateurs aléatoires reproductibles.
+Chaque action d'un joueur (coffre, œuf, combat...) tire dans un flux neuf,
+dérivé de la graine, d'un nonce propre à chaque démarrage, du sous-système,
+du joueur et du numéro du tirage. Chaque tirage est journalisé avec ces
+valeurs : action_seed les retransforme en graine pour rejouer un incident.
+"""
+import hashlib
+import logging
+import random
+import secrets
+from typing import Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+def derive_seed(*parts) -> int:
+    """Graine 64 bits déterminée par une suite de valeurs (stable entre processus)."""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def action_seed(seed: int, nonce: int, subsystem: str, player_id: int, action: int) -> int:
+    """Graine du flux d'un tirage, à partir des valeurs journalisées par RngService."""
+    return derive_seed(seed, nonce, subsystem, player_id, action)
+
+
+class RngService:
+    """
+    Fournit un flux random.Random neuf pour chaque action d'un joueur.
+
+    Le nonce est tiré à chaque démarrage : avec une graine fixe (RNG_SEED)
+    seule, un redémarrage ne reproduit donc pas les tirages précédents ; le
+    rejeu complet d'une session fixe aussi son nonce (RNG_NONCE). Le numéro
+    de tirage est compté par joueur et par sous-système : le flux d'un
+    joueur ne dépend pas de l'activité des autres. Chaque
+    tirage est journalisé (logger services.rng, niveau DEBUG) avec graine,
+    nonce, sous-système, joueur et numéro, de quoi le rejouer avec action_seed.
+    """
+
+    def __init__(self, seed: Optional[int] = None, nonce: Optional[int] = None):
+        """
+        Args:
+            seed: Graine de départ (tirée au hasard si None, voir l'attribut seed)
+            nonce: Nonce du démarrage (tiré au hasard si None, voir l'attribut nonce)
+        """
+        self.seed = secrets.randbits(64) if seed is None else seed
+        self.nonce = secrets.randbits(32) if nonce is None else nonce
+        # Numéro du prochain tirage, par (sous-système, joueur)
+        self._draws: Dict[Tuple[str, int], int] = {}
+
+    def player_stream(self, subsystem: str, player_id: int) -> random.Random:
+        """Flux neuf pour la prochaine action du joueur dans ce sous-système."""
+        key = (subsystem, player_id)
+        action = self._draws.get(key, 0)
+        self._draws[key] = action + 1
+        logger.debug(
+            "tirage seed=%d nonce=%d subsystem=%s player=%d action=%d",
+            self.seed, self.nonce, subsystem, player_id, action
+        )
+        return random.Random(action_seed(self.seed, self.nonce, subsystem, player_id, action))
@@ -0,0 +1,347 @@
+"""
+Recherche par nom dans le catalogue.
+Les noms sont normalisés (casse et accents ignorés) puis indexés au
+chargement : une recherche exacte est un accès dict, une recherche
+partielle un parcours en C d'une chaîne précalculée.
+L'autocomplétion classe les résultats (préfixe, début de mot, sous-chaîne,
+puis approximatif) sous un budget de temps strict par appel ; les choix
+calculés sont mis en cache par (commande, utilisateur, saisie).
+"""
+import functools
+import heapq
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+# Discord n'affiche que 25 choix et abandonne l'autocomplétion après 3 secondes
+AUTOCOMPLETE_LIMIT = 25
+AUTOCOMPLETE_BUDGET = 0.005  # Secondes de calcul maximum par appel
+AUTOCOMPLETE_CACHE_SIZE = 4096  # Saisies gardées en cache, tous utilisateurs confondus
+_DEADLINE_STRIDE = 32  # Entrées parcourues entre deux vérifications du budget
+
+
+def normalize_name(text: str) -> str:
+    """Normalise un nom : minuscules, sans accents, espaces simplifiés."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.split())
+
+
+class NameIndex:
+    """
+    Index nom -> identifiants d'une catégorie du catalogue.
+    Plusieurs entrées peuvent partager un nom : les identifiants sont
+    alors retournés dans l'ordre du catalogue.
+    """
+
+    # Séparateur absent des noms normalisés : une recherche ne peut pas chevaucher deux noms
+    _SEPARATOR = "\x00"
+
+    def __init__(self, entries: Iterable[Tuple[str, str]]):
+        """
+        Args:
+            entries: Couples (nom affiché, identifiant) dans l'ordre du catalogue
+        """
+        self._ids: List[str] = []
+        self._keys: List[str] = []
+        self._exact: Dict[str, List[str]] = {}
+        starts: List[int] = []
+        parts: List[str] = []
+        offset = 0
+        for name, entry_id in entries:
+            key = normalize_name(name)
+            self._ids.append(entry_id)
+            self._keys.append(key)
+            self._exact.setdefault(key, []).append(entry_id)
+            starts.append(offset)
+            parts.append(key)
+            offset += len(key) + 1
+        self._starts = starts
+        self._haystack = self._SEPARATOR.join(parts)
+
+    def find(self, name: str) -> List[str]:
+        """Identifiants dont le nom correspond exactement (casse et accents ignorés)."""
+        return list(self._exact.get(normalize_name(name), ()))
+
+    def search(self, fragment: str) -> List[str]:
+        """Identifiants dont le nom contient le fragment, dans l'ordre du catalogue."""
+        needle = normalize_name(fragment)
+        if not needle:
+            return list(self._ids)
+        return [self._ids[entry] for entry in self._substring_entries(needle)]
+
+    def _substring_entries(self, needle: str) -> Iterator[int]:
+        """Positions des entrées dont le nom normalisé contient needle."""
+        if self._SEPARATOR in needle:
+            return
+        haystack, starts = self._haystack, self._starts
+        position = haystack.find(needle)
+        while position != -1:
+            entry = bisect_right(starts, position) - 1
+            yield entry
+            # Reprendre au nom suivant : une entrée n'est comptée qu'une fois
+            next_start = starts[entry + 1] if entry + 1 < len(starts) else len(haystack)
+            position = haystack.find(needle, next_start)
+
+    def resolve(
+        self,
+        name: str,
+        accept: Optional[Callable[[str], bool]] = None,
+        partial: bool = False
+    ) -> Optional[str]:
+        """
+        Résout un nom saisi en identifiant.
+
+        Args:
+            name: Nom saisi par l'utilisateur
+            accept: Filtre optionnel sur les identifiants (ex: objets possédés)
+            partial: Se rabat sur une recherche partielle si aucun nom exact
+        """
+        for entry_id in self._exact.get(normalize_name(name), ()):
+            if accept is None or accept(entry_id):
+                return entry_id
+        if partial:
+            for entry_id in self.search(name):
+                if accept is None or accept(entry_id):
+                    return entry_id
+        return None
+
+
+class AutocompleteIndex(NameIndex):
+    """
+    NameIndex enrichi pour l'autocomplétion des commandes slash.
+
+    Les résultats sont classés par niveau de correspondance (préfixe du nom,
+    début d'un mot, sous-chaîne, puis approximatif par trigrammes), puis par
+    rang statique (rareté, niveau...) et quantité possédée. Les niveaux sont
+    explorés dans l'ordre et l'exploration s'arrête dès que la limite est
+    atteinte ou que le budget de temps est écoulé, y compris au milieu d'un
+    niveau (seules les correspondances déjà trouvées y sont alors classées).
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, int]]):
+        """
+        Args:
+            entries: Triplets (nom affiché, identifiant, rang statique ; plus petit = mieux classé)
+        """
+        entries = list(entries)
+        super().__init__((name, entry_id) for name, entry_id, _ in entries)
+        self._ranks: List[int] = [rank for _, _, rank in entries]
+        self._positions: Dict[str, List[int]] = {}
+        for position, entry_id in enumerate(self._ids):
+            self._positions.setdefault(entry_id, []).append(position)
+
+        # Ordre d'affichage sans saisie
+        self._default_order = sorted(range(len(self._ids)), key=lambda e: (self._ranks[e], self._keys[e]))
+
+        # Noms triés (préfixe) et suffixes commençant à chaque mot (début de mot)
+        by_name = sorted((key, entry) for entry, key in enumerate(self._keys))
+        self._prefix_keys = [key for key, _ in by_name]
+        self._prefix_entries = [entry for _, entry in by_name]
+        word_suffixes = []
+        for entry, key in enumerate(self._keys):
+            for index in range(1, len(key)):
+                if key[index - 1] == " ":
+                    word_suffixes.append((key[index:], entry))
+        word_suffixes.sort()
+        self._word_keys = [suffix for suffix, _ in word_suffixes]
+        self._word_entries = [entry for _, entry in word_suffixes]
+
+        # Trigrammes -> entrées, pour la correspondance approximative
+        self._trigrams: Dict[str, List[int]] = {}
+        for entry, key in enumerate(self._keys):
+            for trigram in _trigrams(key):
+                self._trigrams.setdefault(trigram, []).append(entry)
+
+    def complete(
+        self,
+        query: str,
+        owned: Optional[Mapping] = None,
+        accept: Optional[Callable[[str], bool]] = None,
+        limit: int = AUTOCOMPLETE_LIMIT,
+        budget: float = AUTOCOMPLETE_BUDGET
+    ) -> List[str]:
+        """
+        Retourne les identifiants les mieux classés pour une saisie.
+
+        Args:
+            query: Texte saisi
+            owned: Mapping identifiant -> quantité auquel restreindre les résultats
+                   (les plus grandes quantités passent devant à rang égal)
+            accept: Filtre supplémentaire sur les identifiants
+            limit: Nombre maximum de résultats
+            budget: Temps de calcul maximum (secondes) ; les résultats déjà trouvés sont retournés
+        """
+        deadline = time.perf_counter() + budget
+        ids, ranks = self._ids, self._ranks
+
+        def allowed(entry: int) -> bool:
+            entry_id = ids[entry]
+            if owned is not None and entry_id not in owned:
+                return False
+            return accept is None or accept(entry_id)
+
+        def sort_key(entry: int):
+            quantity = owned.get(ids[entry], 0) if owned is not None else 0
+            return (ranks[entry], -quantity, self._keys[entry])
+
+        needle = normalize_name(query)
+        if not needle:
+            if owned is not None and len(owned) < len(ids):
+                # Ne parcourir que les entrées possédées
+                candidates = [p for entry_id in owned for p in self._positions.get(entry_id, ())]
+                candidates = [
+                    entry for entry in _within(candidates, deadline)
+                    if accept is None or accept(ids[entry])
+                ]
+                return [ids[entry] for entry in heapq.nsmallest(limit, candidates, key=sort_key)]
+            results = []
+            for entry in self._default_order:
+                if allowed(entry):
+                    results.append(ids[entry])
+                    if len(results) >= limit or time.perf_counter() > deadline:
+                        break
+            return results
+
+        results: List[str] = []
+        seen: Set[int] = set()
+        tiers = (
+            (self._prefix_tier, True),
+            (self._word_tier, True),
+            (self._substring_tier, True),
+            (functools.partial(self._fuzzy_tier, deadline=deadline), False),  # Déjà trié par ressemblance
+        )
+        for tier, ranked in tiers:
+            remaining = limit - len(results)
+            matches = []
+            for entry in _within(tier(needle), deadline):
+                if entry not in seen and allowed(entry):
+                    matches.append(entry)
+                    if not ranked and len(matches) >= remaining:
+                        break
+            seen.update(matches)
+            best = heapq.nsmallest(remaining, matches, key=sort_key) if ranked else matches
+            results.extend(ids[entry] for entry in best)
+            if len(results) >= limit or time.perf_counter() > deadline:
+                break
+        return results
+
+    def _prefix_tier(self, needle: str) -> Iterable[int]:
+        start = bisect_left(self._prefix_keys, needle)
+        end = bisect_left(self._prefix_keys, needle + "\uffff", start)
+        return self._prefix_entries[start:end]
+
+    def _word_tier(self, needle: str) -> Iterable[int]:
+        start = bisect_left(self._word_keys, needle)
+        end = bisect_left(self._word_keys, needle + "\uffff", start)
+        return self._word_entries[start:end]
+
+    def _substring_tier(self, needle: str) -> Iterable[int]:
+        return self._substring_entries(needle)
+
+    def _fuzzy_tier(self, needle: str, deadline: float) -> Iterable[int]:
+        """Entrées partageant au moins la moitié des trigrammes de la saisie (fautes de frappe)."""
+        query_trigrams = set(_trigrams(needle))
+        if len(needle) < 3 or not query_trigrams:
+            return ()
+        shared: Dict[int, int] = {}
+        for trigram in query_trigrams:
+            if time.perf_counter() > deadline:
+                break
+            for entry in self._trigrams.get(trigram, ()):
+                shared[entry] = shared.get(entry, 0) + 1
+        threshold = (len(query_trigrams) + 1) // 2
+        matches = [entry for entry, count in shared.items() if count >= threshold]
+        matches.sort(key=lambda entry: -shared[entry])
+        return matches
+
+
+class AutocompleteCache:
+    """
+    Cache LRU borné des choix d'autocomplétion.
+    Chaque entrée garde la version avec laquelle elle a été calculée
+    (joueur et catalogue) : elle n'est servie que si la version n'a pas
+    changé, sans invalidation explicite.
+    """
+
+    def __init__(self, max_size: int = AUTOCOMPLETE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[tuple, Tuple[object, list]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, version) -> Optional[list]:
+        """Retourne les choix en cache pour cette version, ou None."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: tuple, version, choices: list) -> None:
+        """Enregistre des choix calculés pour une version."""
+        self._entries[key] = (version, choices)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def cached_autocomplete(per_player: bool = True):
+    """
+    Décorateur des callbacks d'autocomplétion des cogs (qui exposent self.data).
+    Les frappes répétées et les retours arrière vers une saisie déjà vue sont
+    servis depuis DataManager.autocomplete_cache tant que le joueur
+    (Player.version) et le catalogue n'ont pas changé.
+
+    Args:
+        per_player: False si les choix ne dépendent que du catalogue
+                    (partagés entre tous les utilisateurs)
+    """
+    def decorator(callback):
+        name = callback.__qualname__
+
+        @functools.wraps(callback)
+        async def wrapper(self, interaction, current: str):
+            data = self.data
+            if per_player:
+                user_id = interaction.user.id
+                version = (data.peek_player(user_id).version, data.catalog.version)
+            else:
+                user_id = None
+                version = data.catalog.version
+            # La saisie est normalisée comme par AutocompleteIndex.complete
+            key = (name, user_id, normalize_name(current))
+            cache = data.autocomplete_cache
+            choices = cache.get(key, version)
+            if choices is None:
+                choices = await callback(self, interaction, current)
+                cache.put(key, version, choices)
+            return choices
+        return wrapper
+    return decorator
+
+
+def _within(entries: Iterable[int], deadline: float) -> Iterator[int]:
+    """Parcourt des entrées jusqu'à l'échéance (vérifiée toutes les _DEADLINE_STRIDE entrées)."""
+    for count, entry in enumerate(entries, 1):
+        yield entry
+        if count % _DEADLINE_STRIDE == 0 and time.perf_counter() > deadline:
+            return
+
+
+def _trigrams(key: str) -> List[str]:
+    """Trigrammes d'un nom normalisé, bornés par des espaces."""
+    padded = f" {key} "
+    return [padded[index:index + 3] for index in range(len(padded) - 2)]
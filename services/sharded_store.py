@@ -0,0 +1,287 @@
+"""
+Backend de persistance partitionné.
+Les joueurs sont répartis dans N fichiers players/shard_XX.json selon un
+hash de leur user_id : une sauvegarde ne réécrit que la partition du joueur.
+"""
+import json
+import os
+import re
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from services.atomic_io import atomic_write_json, write_temp_file
+from services.player_store import PlayerStore
+
+
+# Un fichier de partition : {"players":[<joueur>,<joueur>,...]}
+_SHARD_HEAD = b'{"players":['
+_SHARD_TAIL = b']}'
+# Blancs et virgules entre deux joueurs d'une partition
+_SEPARATORS = re.compile(r'[\s,]*')
+
+
+class ShardedPlayerStore(PlayerStore):
+    """
+    Stocke les joueurs dans plusieurs fichiers JSON indexés par user_id.
+    En chargement à la demande, aucune partition n'est gardée en mémoire :
+    seule la position de chaque joueur dans le fichier de sa partition est
+    indexée, et un joueur est relu seul à cette position.
+    """
+
+    supports_lazy_loading = True
+
+    def __init__(self, folder: str, shard_count: int = 16, legacy_json_path: Optional[str] = None):
+        """
+        Args:
+            folder: Dossier contenant les partitions
+            shard_count: Nombre de partitions
+            legacy_json_path: players.json à migrer si aucune partition n'existe
+        """
+        if shard_count < 1:
+            raise ValueError("shard_count doit être supérieur ou égal à 1")
+        self.folder = folder
+        self.shard_count = shard_count
+        self.legacy_json_path = legacy_json_path
+        self.meta_path = os.path.join(folder, "meta.json")
+        self.backup_path = os.path.join(folder, "reshard_backup.json")
+        # Partitions résidentes (toutes en mode complet, aucune en mode à la demande)
+        self._shards: Dict[int, Dict[int, dict]] = {}
+        self._keep_resident = True
+        # En chargement à la demande : (octet de début, longueur) de chaque joueur
+        # dans le fichier de sa partition
+        self._offsets: Dict[int, Dict[int, Tuple[int, int]]] = {}
+        # Protège _offsets et le renommage des partitions : un lecteur ouvre
+        # toujours le fichier décrit par l'index qu'il vient de lire
+        self._offsets_lock = threading.Lock()
+
+    def shard_of(self, user_id: int) -> int:
+        """Retourne l'index de la partition d'un joueur."""
+        return zlib.crc32(str(user_id).encode()) % self.shard_count
+
+    def _shard_path(self, index: int) -> str:
+        return os.path.join(self.folder, f"shard_{index:02d}.json")
+
+    # ==================== CHARGEMENT ====================
+
+    def load(self) -> List[dict]:
+        """Charge toutes les partitions en parallèle (avec migration si besoin)."""
+        records = self._prepare_layout()
+        if records is not None:
+            return records
+
+        records = self._read_shards(self.shard_count)
+        for record in records:
+            self._shards.setdefault(self.shard_of(record["user_id"]), {})[record["user_id"]] = record
+        return records
+
+    def open_lazy(self) -> Optional[Set[int]]:
+        """
+        Prépare le disque et indexe la position de chaque joueur dans sa
+        partition, sans garder les joueurs en mémoire.
+        Retourne les user_id connus.
+        """
+        self._keep_resident = False
+        self._prepare_layout()
+        self._shards.clear()
+        with ThreadPoolExecutor(max_workers=min(8, self.shard_count)) as pool:
+            offsets = list(pool.map(self._index_shard_file, range(self.shard_count)))
+        with self._offsets_lock:
+            self._offsets = dict(enumerate(offsets))
+        return {user_id for shard in offsets for user_id in shard}
+
+    def load_one(self, user_id: int) -> Optional[dict]:
+        """Lit uniquement l'enregistrement du joueur, à sa position dans la partition."""
+        index = self.shard_of(user_id)
+        if self._keep_resident:
+            return self._get_shard(index).get(user_id)
+        with self._offsets_lock:
+            position = self._offsets.get(index, {}).get(user_id)
+            if position is None:
+                return None
+            f = open(self._shard_path(index), 'rb')
+        with f:
+            f.seek(position[0])
+            return json.loads(f.read(position[1]))
+
+    def iter_records(self) -> Iterator[dict]:
+        """Parcourt les partitions une par une (lecture complète, hors de la boucle asyncio)."""
+        for index in range(self.shard_count):
+            yield from self._get_shard(index).values()
+
+    def _prepare_layout(self) -> Optional[List[dict]]:
+        """
+        Met le disque au bon format (migration depuis players.json ou
+        re-partitionnement). Retourne les joueurs si une migration a eu lieu.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+
+        stored_count = self._read_shard_count()
+        if os.path.exists(self.backup_path):
+            # Re-partitionnement interrompu : on repart de la sauvegarde complète
+            with open(self.backup_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)["players"]
+        elif stored_count is None:
+            records = self._read_legacy()
+        elif stored_count != self.shard_count:
+            records = self._read_shards(stored_count)
+            atomic_write_json(self.backup_path, {"players": records})
+        else:
+            records = None
+
+        if records is not None:
+            # Migration depuis players.json ou changement du nombre de partitions
+            self._write_layout(records, previous_count=stored_count or 0)
+            if os.path.exists(self.backup_path):
+                os.remove(self.backup_path)
+        return records
+
+    def _read_shard_count(self) -> Optional[int]:
+        """Lit le nombre de partitions enregistré (None si pas encore partitionné)."""
+        if not os.path.exists(self.meta_path):
+            return None
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)["shard_count"]
+
+    def _read_legacy(self) -> List[dict]:
+        """Lit l'ancien fichier unique players.json."""
+        if not self.legacy_json_path or not os.path.exists(self.legacy_json_path):
+            return []
+        with open(self.legacy_json_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("players", [])
+
+    def _read_shard_file(self, index: int) -> List[dict]:
+        """Lit le fichier d'une partition."""
+        path = self._shard_path(index)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("players", [])
+
+    def _read_shards(self, count: int) -> List[dict]:
+        """Lit en parallèle les partitions d'un découpage en `count` fichiers."""
+        with ThreadPoolExecutor(max_workers=min(8, count)) as pool:
+            shards = list(pool.map(self._read_shard_file, range(count)))
+        return [record for shard in shards for record in shard]
+
+    def _index_shard_file(self, index: int) -> Dict[int, Tuple[int, int]]:
+        """Retrouve la position (octet de début, longueur) de chaque joueur d'une partition."""
+        path = self._shard_path(index)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'rb') as f:
+            data = f.read()
+        text = data.decode('utf-8')
+        ascii_only = len(text) == len(data)
+        decoder = json.JSONDecoder()
+
+        offsets = {}
+        pos = text.index('[', text.index('"players"')) + 1
+        char_pos = byte_pos = 0
+        while True:
+            pos = _SEPARATORS.match(text, pos).end()
+            if text[pos] == ']':
+                return offsets
+            record, end = decoder.raw_decode(text, pos)
+            if ascii_only:
+                offsets[record["user_id"]] = (pos, end - pos)
+            else:
+                # Caractères non ASCII : les positions en octets diffèrent
+                byte_pos += len(text[char_pos:pos].encode('utf-8'))
+                length = len(text[pos:end].encode('utf-8'))
+                offsets[record["user_id"]] = (byte_pos, length)
+                byte_pos += length
+                char_pos = end
+            pos = end
+
+    def _read_raw_records(self, index: int) -> Dict[int, bytes]:
+        """Octets JSON de chaque joueur d'une partition, sans les décoder."""
+        with self._offsets_lock:
+            offsets = self._offsets.get(index, {})
+        if not offsets:
+            return {}
+        with open(self._shard_path(index), 'rb') as f:
+            data = f.read()
+        return {user_id: data[start:start + length] for user_id, (start, length) in offsets.items()}
+
+    def _get_shard(self, index: int) -> Dict[int, dict]:
+        """Retourne une partition, depuis la mémoire ou le disque."""
+        shard = self._shards.get(index)
+        if shard is None:
+            shard = {record["user_id"]: record for record in self._read_shard_file(index)}
+            if self._keep_resident:
+                self._shards[index] = shard
+        return shard
+
+    def _write_layout(self, records: List[dict], previous_count: int) -> None:
+        """Réécrit toutes les partitions puis les métadonnées."""
+        shards: Dict[int, Dict[int, dict]] = {index: {} for index in range(self.shard_count)}
+        for record in records:
+            shards[self.shard_of(record["user_id"])][record["user_id"]] = record
+        for index, shard in shards.items():
+            self._write_shard(index, {user_id: _encode(record) for user_id, record in shard.items()})
+        if self._keep_resident:
+            self._shards = shards
+        for index in range(self.shard_count, previous_count):
+            path = self._shard_path(index)
+            if os.path.exists(path):
+                os.remove(path)
+        atomic_write_json(self.meta_path, {"shard_count": self.shard_count})
+
+    # ==================== ÉCRITURE ====================
+
+    def save(self, records: List[dict]) -> None:
+        """
+        Réécrit uniquement les partitions contenant des joueurs modifiés.
+        En chargement à la demande, les autres joueurs de la partition sont
+        recopiés tels quels depuis le fichier, sans être décodés.
+        """
+        touched: Dict[int, Dict[int, bytes]] = {}
+        for record in records:
+            user_id = record["user_id"]
+            index = self.shard_of(user_id)
+            if index not in touched:
+                touched[index] = self._encoded_shard(index)
+            touched[index][user_id] = _encode(record)
+            if self._keep_resident:
+                self._shards[index][user_id] = record
+        for index, encoded in touched.items():
+            self._write_shard(index, encoded)
+
+    def _encoded_shard(self, index: int) -> Dict[int, bytes]:
+        """Joueurs d'une partition encodés en JSON."""
+        if self._keep_resident:
+            return {user_id: _encode(record) for user_id, record in self._get_shard(index).items()}
+        return self._read_raw_records(index)
+
+    def _write_shard(self, index: int, encoded: Dict[int, bytes]) -> None:
+        """Écrit une partition de façon atomique et met à jour l'index des positions."""
+        offsets = {}
+        parts = [_SHARD_HEAD]
+        position = len(_SHARD_HEAD)
+        for user_id, raw in encoded.items():
+            if offsets:
+                parts.append(b",")
+                position += 1
+            offsets[user_id] = (position, len(raw))
+            parts.append(raw)
+            position += len(raw)
+        parts.append(_SHARD_TAIL)
+
+        path = self._shard_path(index)
+        tmp_path = write_temp_file(path, b"".join(parts))
+        try:
+            with self._offsets_lock:
+                os.replace(tmp_path, path)
+                if not self._keep_resident:
+                    self._offsets[index] = offsets
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def _encode(record: dict) -> bytes:
+    """Encode un joueur tel qu'il est écrit dans sa partition."""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
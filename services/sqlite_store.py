@@ -0,0 +1,338 @@
+"""
+Backend de persistance SQLite.
+Une ligne par joueur avec les champs scalaires en colonnes (les plus
+consultés sont indexés) et l'inventaire, les pets et les skills dans
+des tables enfants.
+
+Migration ponctuelle depuis players.json :
+    python -m services.sqlite_store data/players.json data/players.db
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+from typing import Dict, Iterator, List, Optional, Set
+
+from models.player import Player
+from services.player_store import PlayerStore
+
+
+# Champs scalaires de Player.to_dict stockés directement en colonnes
+SCALAR_COLUMNS = (
+    "coins", "daily_chests_opened", "last_chest_date", "total_chests_opened",
+    "total_items_sold", "equipped_pet", "eggs_opened", "level", "xp", "total_xp",
+    "base_hp", "base_attack", "base_defense", "base_speed", "current_hp",
+    "bosses_defeated", "last_boss_fight", "skill_points",
+)
+
+# Petites structures sans intérêt pour les requêtes, sérialisées en JSON
+JSON_COLUMNS = ("equipment", "equipped_skills", "bosses_kills")
+
+# Tables enfants : champ du dict -> (table, colonne clé, colonne valeur)
+CHILD_TABLES = {
+    "inventory": ("player_inventory", "item_id", "quantity"),
+    "pets": ("player_pets", "pet_id", "quantity"),
+    "skills": ("player_skills", "skill_id", "level"),
+}
+
+# Classements : nom -> clause ORDER BY (chacune couverte par un index)
+RANKINGS = {
+    "coins": "coins DESC",
+    "collection": "unique_items DESC",
+    "level": "level DESC, total_xp DESC",
+    "bosses": "bosses_defeated DESC",
+}
+
+# Nombre de lignes lues par fetchmany lors d'un parcours complet
+ITER_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    user_id INTEGER PRIMARY KEY,
+    coins INTEGER NOT NULL DEFAULT 0,
+    daily_chests_opened INTEGER NOT NULL DEFAULT 0,
+    last_chest_date TEXT NOT NULL DEFAULT '',
+    total_chests_opened INTEGER NOT NULL DEFAULT 0,
+    total_items_sold INTEGER NOT NULL DEFAULT 0,
+    equipped_pet TEXT,
+    eggs_opened INTEGER NOT NULL DEFAULT 0,
+    level INTEGER NOT NULL DEFAULT 1,
+    xp INTEGER NOT NULL DEFAULT 0,
+    total_xp INTEGER NOT NULL DEFAULT 0,
+    base_hp INTEGER NOT NULL DEFAULT 100,
+    base_attack INTEGER NOT NULL DEFAULT 10,
+    base_defense INTEGER NOT NULL DEFAULT 5,
+    base_speed INTEGER NOT NULL DEFAULT 10,
+    current_hp INTEGER NOT NULL DEFAULT 100,
+    bosses_defeated INTEGER NOT NULL DEFAULT 0,
+    last_boss_fight TEXT NOT NULL DEFAULT '',
+    skill_points INTEGER NOT NULL DEFAULT 0,
+    unique_items INTEGER NOT NULL DEFAULT 0,
+    equipment TEXT NOT NULL DEFAULT '{}',
+    equipped_skills TEXT NOT NULL DEFAULT '[]',
+    bosses_kills TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_players_coins ON players (coins);
+CREATE INDEX IF NOT EXISTS idx_players_unique_items ON players (unique_items);
+CREATE INDEX IF NOT EXISTS idx_players_level ON players (level, total_xp);
+CREATE INDEX IF NOT EXISTS idx_players_bosses ON players (bosses_defeated);
+
+CREATE TABLE IF NOT EXISTS player_inventory (
+    user_id INTEGER NOT NULL,
+    item_id TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (user_id, item_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS player_pets (
+    user_id INTEGER NOT NULL,
+    pet_id TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (user_id, pet_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS player_skills (
+    user_id INTEGER NOT NULL,
+    skill_id TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    PRIMARY KEY (user_id, skill_id)
+) WITHOUT ROWID;
+"""
+
+
+class SqlitePlayerStore(PlayerStore):
+    """Stocke les joueurs dans une base SQLite locale."""
+
+    supports_lazy_loading = True
+
+    def __init__(self, db_path: str, legacy_json_path: Optional[str] = None):
+        """
+        Args:
+            db_path: Chemin de la base SQLite
+            legacy_json_path: players.json à migrer si la base est vide
+        """
+        self.db_path = db_path
+        self.legacy_json_path = legacy_json_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Connexion dédiée aux lectures ponctuelles : en WAL, elles ne sont pas
+        # bloquées par les transactions du thread d'écriture (qui tient _lock)
+        self._read_lock = threading.Lock()
+        self._read_conn = sqlite3.connect(db_path, check_same_thread=False)
+
+        columns = ("user_id",) + SCALAR_COLUMNS + ("unique_items",) + JSON_COLUMNS
+        updates = ", ".join(f"{col}=excluded.{col}" for col in columns[1:])
+        self._upsert_sql = (
+            f"INSERT INTO players ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT(user_id) DO UPDATE SET {updates}"
+        )
+
+    # ==================== CHARGEMENT ====================
+
+    def load(self) -> List[dict]:
+        """Charge tous les joueurs (migre players.json si la base est vide)."""
+        self._migrate_legacy_if_empty()
+        return list(self._load_all().values())
+
+    def open_lazy(self) -> Optional[Set[int]]:
+        """Retourne l'index des user_id (clé primaire = rowid de la table)."""
+        self._migrate_legacy_if_empty()
+        with self._read_lock:
+            return {row[0] for row in self._read_conn.execute("SELECT user_id FROM players")}
+
+    def load_one(self, user_id: int) -> Optional[dict]:
+        """Charge un joueur par sa clé primaire."""
+        with self._read_lock:
+            row = self._read_conn.execute(
+                f"SELECT user_id, {', '.join(SCALAR_COLUMNS + JSON_COLUMNS)} "
+                f"FROM players WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            record = self._row_to_record(row)
+            for field_name, (table, key_col, value_col) in CHILD_TABLES.items():
+                record[field_name] = dict(self._read_conn.execute(
+                    f"SELECT {key_col}, {value_col} FROM {table} WHERE user_id = ?",
+                    (user_id,)
+                ).fetchall())
+        return record
+
+    def iter_records(self) -> Iterator[dict]:
+        """
+        Parcourt tous les joueurs persistés par lots, sur une connexion
+        dédiée. Les tables sont lues triées par user_id (ordre de leurs clés
+        primaires) et fusionnées au fil de l'eau.
+        """
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            conn.execute("BEGIN")  # Même instantané pour toutes les tables
+            child_rows = {
+                field_name: _iter_rows(conn.execute(
+                    f"SELECT user_id, {key_col}, {value_col} FROM {table} ORDER BY user_id"
+                ))
+                for field_name, (table, key_col, value_col) in CHILD_TABLES.items()
+            }
+            pending = {field_name: next(rows, None) for field_name, rows in child_rows.items()}
+            players = conn.execute(
+                f"SELECT user_id, {', '.join(SCALAR_COLUMNS + JSON_COLUMNS)} "
+                f"FROM players ORDER BY user_id"
+            )
+            for row in _iter_rows(players):
+                user_id = row[0]
+                record = self._row_to_record(row)
+                for field_name, rows in child_rows.items():
+                    child = pending[field_name]
+                    while child is not None and child[0] <= user_id:
+                        if child[0] == user_id:
+                            record[field_name][child[1]] = child[2]
+                        child = next(rows, None)
+                    pending[field_name] = child
+                yield record
+        finally:
+            conn.close()
+
+    def _migrate_legacy_if_empty(self) -> None:
+        """Migre players.json au premier démarrage sur une base vide."""
+        if self._is_empty() and self.legacy_json_path and os.path.exists(self.legacy_json_path):
+            migrate_json_to_sqlite(self.legacy_json_path, store=self)
+
+    def _load_all(self) -> Dict[int, dict]:
+        """Lit tous les joueurs et leurs tables enfants."""
+        with self._read_lock:
+            cursor = self._read_conn.execute(
+                f"SELECT user_id, {', '.join(SCALAR_COLUMNS + JSON_COLUMNS)} FROM players"
+            )
+            records: Dict[int, dict] = {}
+            for row in cursor:
+                records[row[0]] = self._row_to_record(row)
+
+            for field_name, (table, key_col, value_col) in CHILD_TABLES.items():
+                for user_id, key, value in self._read_conn.execute(
+                    f"SELECT user_id, {key_col}, {value_col} FROM {table}"
+                ):
+                    if user_id in records:
+                        records[user_id][field_name][key] = value
+
+        return records
+
+    def _is_empty(self) -> bool:
+        """Vérifie si la base ne contient encore aucun joueur."""
+        with self._read_lock:
+            return self._read_conn.execute("SELECT 1 FROM players LIMIT 1").fetchone() is None
+
+    def _row_to_record(self, row: tuple) -> dict:
+        """Reconstruit un dict Player.to_dict depuis une ligne de la table players."""
+        record = {"user_id": row[0]}
+        offset = 1
+        for col in SCALAR_COLUMNS:
+            record[col] = row[offset]
+            offset += 1
+        for col in JSON_COLUMNS:
+            record[col] = json.loads(row[offset])
+            offset += 1
+        for field_name in CHILD_TABLES:
+            record[field_name] = {}
+        return record
+
+    # ==================== ÉCRITURE ====================
+
+    def save(self, records: List[dict]) -> None:
+        """Upsert d'une ligne par joueur et remplacement de ses lignes enfants."""
+        with self._lock, self._conn:
+            for record in records:
+                self._write_record(record)
+
+    def _write_record(self, record: dict) -> None:
+        """Écrit un joueur (à appeler dans une transaction)."""
+        user_id = record["user_id"]
+        values = [user_id]
+        values.extend(record.get(col) for col in SCALAR_COLUMNS)
+        values.append(len(record.get("inventory", {})))
+        values.extend(
+            json.dumps(record.get(col), ensure_ascii=False, separators=(",", ":"))
+            for col in JSON_COLUMNS
+        )
+        self._conn.execute(self._upsert_sql, values)
+
+        for field_name, (table, key_col, value_col) in CHILD_TABLES.items():
+            self._conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+            entries = record.get(field_name) or {}
+            if entries:
+                self._conn.executemany(
+                    f"INSERT INTO {table} (user_id, {key_col}, {value_col}) VALUES (?, ?, ?)",
+                    [(user_id, key, value) for key, value in entries.items()]
+                )
+
+    # ==================== CLASSEMENTS ====================
+
+    def top_user_ids(self, ranking: str, limit: int) -> Optional[List[int]]:
+        """Retourne les IDs du classement demandé via un ORDER BY indexé."""
+        order_by = RANKINGS.get(ranking)
+        if order_by is None:
+            return None
+        with self._read_lock:
+            rows = self._read_conn.execute(
+                f"SELECT user_id FROM players ORDER BY {order_by} LIMIT ?", (limit,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        """Ferme les connexions SQLite."""
+        with self._read_lock:
+            self._read_conn.close()
+        with self._lock:
+            self._conn.close()
+
+
+def _iter_rows(cursor: sqlite3.Cursor) -> Iterator[tuple]:
+    """Lit un curseur par lots de ITER_BATCH_SIZE lignes."""
+    while True:
+        rows = cursor.fetchmany(ITER_BATCH_SIZE)
+        if not rows:
+            return
+        yield from rows
+
+
+def migrate_json_to_sqlite(
+    json_path: str,
+    db_path: Optional[str] = None,
+    store: Optional[SqlitePlayerStore] = None
+) -> int:
+    """
+    Copie tous les joueurs d'un players.json dans une base SQLite.
+
+    Args:
+        json_path: Fichier players.json source
+        db_path: Base SQLite cible (ignoré si store est fourni)
+        store: Backend SQLite déjà ouvert
+
+    Returns:
+        Le nombre de joueurs migrés
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        # Les anciens enregistrements peuvent manquer de champs : valeurs par défaut de Player
+        records = [Player.from_dict(data).to_dict() for data in json.load(f).get("players", [])]
+
+    owns_store = store is None
+    if owns_store:
+        store = SqlitePlayerStore(db_path)
+    try:
+        store.save(records)
+    finally:
+        if owns_store:
+            store.close()
+    return len(records)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m services.sqlite_store <players.json> <players.db>")
+        sys.exit(1)
+    count = migrate_json_to_sqlite(sys.argv[1], sys.argv[2])
+    print(f"✅ {count} joueurs migrés vers {sys.argv[2]}")
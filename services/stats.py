@@ -0,0 +1,118 @@
+"""
+Moteur de stats dérivées de l'équipement.
+Les stats d'un joueur (bonus des pièces, sets actifs, bonus de drop et de
+pièces) ne dépendent que de son équipement et de son pet équipé : elles
+sont calculées une fois par combinaison puis servies depuis un cache.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from models.containers import EQUIPMENT_SLOTS, ITEM_IDS
+from models.player import Player
+from models.stats import EMPTY_STATS, RARITY_STAT_MULTIPLIERS, STAT_NAMES, item_stat_vector
+
+if TYPE_CHECKING:
+    from services.catalog import Catalog
+
+
+# Combinaisons (équipement, pet) gardées en cache
+STATS_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class DerivedStats:
+    """
+    Stats dérivées d'un équipement et d'un pet.
+    Partagées entre les joueurs équipés pareil : les dicts sont en lecture seule.
+    """
+    equipment: Dict[str, float]  # stat -> bonus des pièces (voir STAT_NAMES)
+    set_pieces: Dict[str, int]  # set_id -> pièces équipées
+    set_bonuses: Dict[str, dict]  # set_id -> bonus actif (format de get_set_bonuses)
+    drop_bonus: float  # Pet équipé + sets
+    coin_bonus: float  # Sets
+
+
+class StatsEngine:
+    """
+    Calcule et mémorise les DerivedStats pour une version du catalogue.
+    Les vecteurs de stats par (rareté, slot) et l'index objet -> set sont
+    précalculés ; la clé de cache est l'empreinte de l'équipement et le pet.
+    """
+
+    def __init__(self, catalog: "Catalog", max_size: int = STATS_CACHE_SIZE):
+        self.catalog = catalog
+        self.max_size = max_size
+        # Vecteur de stats de chaque (rareté, slot)
+        rarity_names = set(RARITY_STAT_MULTIPLIERS) | {item.rarity.name for item in catalog.items.values()}
+        self._vectors: Dict[Tuple[str, str], Tuple[float, ...]] = {
+            (rarity_name, slot): item_stat_vector(rarity_name, slot)
+            for rarity_name in rarity_names for slot in EQUIPMENT_SLOTS
+        }
+        # Index dense de l'objet -> rareté et set (les objets hors catalogue n'y sont pas)
+        self._item_rarities: Dict[int, str] = {}
+        self._item_sets: Dict[int, str] = {}
+        for item_id, item in catalog.items.items():
+            index = ITEM_IDS.intern(item_id)
+            self._item_rarities[index] = item.rarity.name
+            if item.set_id:
+                self._item_sets[index] = item.set_id
+        self._cache: "OrderedDict[tuple, DerivedStats]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def derive(self, player: Player) -> DerivedStats:
+        """Retourne les stats dérivées du joueur (calculées seulement si l'équipement a changé)."""
+        key = (player.equipment.fingerprint(), player.equipped_pet)
+        stats = self._cache.get(key)
+        if stats is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return stats
+        self.misses += 1
+        stats = self._compute(*key)
+        self._cache[key] = stats
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return stats
+
+    def _compute(self, fingerprint: Tuple[Optional[int], ...], pet_id: Optional[str]) -> DerivedStats:
+        totals = list(EMPTY_STATS)
+        set_pieces: Dict[str, int] = {}
+        for slot, index in zip(EQUIPMENT_SLOTS, fingerprint):
+            rarity_name = self._item_rarities.get(index)
+            if rarity_name is None:
+                continue
+            for position, value in enumerate(self._vectors[(rarity_name, slot)]):
+                totals[position] += value
+            set_id = self._item_sets.get(index)
+            if set_id:
+                set_pieces[set_id] = set_pieces.get(set_id, 0) + 1
+
+        set_bonuses: Dict[str, dict] = {}
+        for set_id, count in set_pieces.items():
+            equipment_set = self.catalog.sets.get(set_id)
+            if equipment_set and count >= 2:
+                set_bonuses[set_id] = {
+                    "set_name": equipment_set.name,
+                    "pieces": count,
+                    "bonus": equipment_set.bonus_4 if count >= 4 else equipment_set.bonus_2
+                }
+
+        drop_bonus = 0.0
+        pet = self.catalog.pets.get(pet_id) if pet_id else None
+        if pet:
+            drop_bonus += pet.drop_bonus
+        coin_bonus = 0.0
+        for bonus_info in set_bonuses.values():
+            bonus = bonus_info.get("bonus", {})
+            drop_bonus += bonus.get("drop_bonus", 0.0)
+            coin_bonus += bonus.get("coin_bonus", 0.0)
+
+        return DerivedStats(
+            equipment=dict(zip(STAT_NAMES, totals)),
+            set_pieces=set_pieces,
+            set_bonuses=set_bonuses,
+            drop_bonus=drop_bonus,
+            coin_bonus=coin_bonus
+        )